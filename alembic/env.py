@@ -18,7 +18,10 @@ from lib.models.player import Player
 from lib.models.team import Team
 from lib.models.stat import Stat
 from lib.models.boot_color import BootColor
+from lib.models.player_total import PlayerTotal
 from lib.models.player_team import player_teams 
+from lib.models.change_log import change_log
+from lib.models.search import SEARCH_TABLES
 
 
 config = context.config
@@ -31,6 +34,12 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_name(name, type_, parent_names):
+    """Leave the FTS5 search tables and their shadow tables out of autogenerate."""
+    if type_ == 'table':
+        return not name.startswith(SEARCH_TABLES)
+    return True
+
 
 def run_migrations_offline():
     """Run migrations in 'offline' mode."""
@@ -40,6 +49,7 @@ def run_migrations_offline():
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -57,7 +67,8 @@ def run_migrations_online():
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
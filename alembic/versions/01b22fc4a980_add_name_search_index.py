@@ -0,0 +1,47 @@
+"""Add name search index
+
+Revision ID: 01b22fc4a980
+Revises: fe6dc02f9613
+Create Date: 2026-10-18 15:53:37.105135
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '01b22fc4a980'
+down_revision: Union[str, None] = 'fe6dc02f9613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_TABLES = ('name_search', 'name_trigrams')
+# Players are indexed at rowid 2 * id, teams at 2 * id + 1.
+SOURCES = (('players', 0), ('teams', 1))
+
+
+def upgrade() -> None:
+    op.execute("CREATE VIRTUAL TABLE name_search USING fts5(name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')")
+    op.execute("CREATE VIRTUAL TABLE name_trigrams USING fts5(name, tokenize = 'trigram')")
+    for table, offset in SOURCES:
+        insert = "".join(
+            f" INSERT INTO {fts} (rowid, name) VALUES (2 * new.id + {offset}, new.name);" for fts in SEARCH_TABLES
+        )
+        delete = "".join(
+            f" DELETE FROM {fts} WHERE rowid = 2 * old.id + {offset};" for fts in SEARCH_TABLES
+        )
+        op.execute(f"CREATE TRIGGER {table}_search_insert AFTER INSERT ON {table} BEGIN{insert} END")
+        op.execute(f"CREATE TRIGGER {table}_search_delete AFTER DELETE ON {table} BEGIN{delete} END")
+        op.execute(f"CREATE TRIGGER {table}_search_update AFTER UPDATE OF id, name ON {table} BEGIN{delete}{insert} END")
+        for fts in SEARCH_TABLES:
+            op.execute(f"INSERT INTO {fts} (rowid, name) SELECT 2 * id + {offset}, name FROM {table}")
+
+
+def downgrade() -> None:
+    for table, _ in SOURCES:
+        for event in ('insert', 'delete', 'update'):
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_search_{event}")
+    for fts in SEARCH_TABLES:
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
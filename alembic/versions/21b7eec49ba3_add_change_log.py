@@ -0,0 +1,49 @@
+"""Add change log
+
+Revision ID: 21b7eec49ba3
+Revises: 01b22fc4a980
+Create Date: 2026-10-18 15:57:33.848744
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '21b7eec49ba3'
+down_revision: Union[str, None] = '01b22fc4a980'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOGGED_TABLES = ('players', 'teams', 'player_teams', 'stats', 'boot_colors')
+OPERATIONS = (('insert', 'INSERT', 'new'), ('update', 'UPDATE', 'new'), ('delete', 'DELETE', 'old'))
+
+
+def upgrade() -> None:
+    op.create_table('change_log',
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('row_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(length=1), nullable=False),
+    sa.PrimaryKeyConstraint('seq'),
+    sqlite_autoincrement=True
+    )
+    op.create_index('ix_change_log_table_name_seq', 'change_log', ['table_name', 'seq'], unique=False)
+    # Existing rows are picked up by the first (full) export; only changes
+    # from here on are logged.
+    for table in LOGGED_TABLES:
+        for name, op_name, row in OPERATIONS:
+            op.execute(
+                f"CREATE TRIGGER {table}_log_{name} AFTER {op_name} ON {table} BEGIN "
+                f"INSERT INTO change_log (table_name, row_id, op) VALUES ('{table}', {row}.rowid, '{op_name[0]}'); END"
+            )
+
+
+def downgrade() -> None:
+    for table in LOGGED_TABLES:
+        for name, _, _ in OPERATIONS:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_log_{name}")
+    op.drop_index('ix_change_log_table_name_seq', table_name='change_log')
+    op.drop_table('change_log')
@@ -0,0 +1,45 @@
+"""Add lookup indexes
+
+Revision ID: 3791334ac27c
+Revises: bb31873ea167
+Create Date: 2026-10-18 10:03:55.217640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3791334ac27c'
+down_revision: Union[str, None] = 'bb31873ea167'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _check_unique_names(table):
+    duplicates = op.get_bind().execute(sa.text(
+        f"SELECT name FROM {table} GROUP BY name HAVING COUNT(*) > 1"
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            f"Cannot add unique index on {table}.name; rename or merge duplicates first: "
+            + ", ".join(duplicates)
+        )
+
+
+def upgrade() -> None:
+    _check_unique_names('players')
+    _check_unique_names('teams')
+    op.create_index(op.f('ix_players_name'), 'players', ['name'], unique=True)
+    op.create_index(op.f('ix_teams_name'), 'teams', ['name'], unique=True)
+    op.create_index('ix_stats_player_id_goals_assists', 'stats', ['player_id', 'goals', 'assists'], unique=False)
+    op.create_index('ix_player_teams_team_id_player_id', 'player_teams', ['team_id', 'player_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_player_teams_team_id_player_id', table_name='player_teams')
+    op.drop_index('ix_stats_player_id_goals_assists', table_name='stats')
+    op.drop_index(op.f('ix_teams_name'), table_name='teams')
+    op.drop_index(op.f('ix_players_name'), table_name='players')
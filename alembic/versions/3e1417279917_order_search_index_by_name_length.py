@@ -0,0 +1,51 @@
+"""Order search index by name length
+
+Revision ID: 3e1417279917
+Revises: 21b7eec49ba3
+Create Date: 2026-10-18 18:12:05.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e1417279917'
+down_revision: Union[str, None] = '21b7eec49ba3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_TABLES = ('name_search', 'name_trigrams')
+SOURCES = (('players', 0), ('teams', 1))
+# The name's length goes above the id, so FTS5 returns the shortest names first.
+LENGTH_PREFIXED = "(length({row}name) << 32) + 2 * {row}id + {offset}"
+UNPREFIXED = "2 * {row}id + {offset}"
+
+
+def _reindex(rowid) -> None:
+    for table, offset in SOURCES:
+        def key(row):
+            return rowid.format(row=row, offset=offset)
+        insert = "".join(
+            f" INSERT INTO {fts} (rowid, name) VALUES ({key('new.')}, new.name);" for fts in SEARCH_TABLES
+        )
+        delete = "".join(f" DELETE FROM {fts} WHERE rowid = {key('old.')};" for fts in SEARCH_TABLES)
+        for event in ('insert', 'delete', 'update'):
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_search_{event}")
+        op.execute(f"CREATE TRIGGER {table}_search_insert AFTER INSERT ON {table} BEGIN{insert} END")
+        op.execute(f"CREATE TRIGGER {table}_search_delete AFTER DELETE ON {table} BEGIN{delete} END")
+        op.execute(f"CREATE TRIGGER {table}_search_update AFTER UPDATE OF id, name ON {table} BEGIN{delete}{insert} END")
+    for fts in SEARCH_TABLES:
+        op.execute(f"DELETE FROM {fts}")
+        for table, offset in SOURCES:
+            op.execute(f"INSERT INTO {fts} (rowid, name) SELECT {rowid.format(row='', offset=offset)}, name FROM {table}")
+
+
+def upgrade() -> None:
+    _reindex(LENGTH_PREFIXED)
+
+
+def downgrade() -> None:
+    _reindex(UNPREFIXED)
@@ -0,0 +1,42 @@
+"""Add player_totals aggregate
+
+Revision ID: bb31873ea167
+Revises: 355b8d3146b4
+Create Date: 2026-10-18 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bb31873ea167'
+down_revision: Union[str, None] = '355b8d3146b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('player_totals',
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('goals', sa.Integer(), nullable=False),
+    sa.Column('assists', sa.Integer(), nullable=False),
+    sa.Column('appearances', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+    sa.PrimaryKeyConstraint('player_id')
+    )
+    op.create_index(op.f('ix_player_totals_goals'), 'player_totals', ['goals'], unique=False)
+    # Backfill from existing stats; rows whose player no longer exists are skipped.
+    op.execute(
+        "INSERT INTO player_totals (player_id, goals, assists, appearances) "
+        "SELECT s.player_id, COALESCE(SUM(s.goals), 0), COALESCE(SUM(s.assists), 0), COUNT(*) "
+        "FROM stats s JOIN players p ON p.id = s.player_id "
+        "GROUP BY s.player_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_player_totals_goals'), table_name='player_totals')
+    op.drop_table('player_totals')
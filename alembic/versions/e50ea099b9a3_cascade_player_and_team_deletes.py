@@ -0,0 +1,56 @@
+"""Cascade player and team deletes
+
+Revision ID: e50ea099b9a3
+Revises: 3791334ac27c
+Create Date: 2026-10-18 15:49:02.793901
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e50ea099b9a3'
+down_revision: Union[str, None] = '3791334ac27c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The initial foreign keys are unnamed; SQLite can't alter them in place, so
+# each table is recreated in batch mode with reflected names from this
+# convention, and the new constraints are created with the same names.
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+# (table, column, referred table)
+FOREIGN_KEYS = [
+    ('stats', 'player_id', 'players'),
+    ('boot_colors', 'player_id', 'players'),
+    ('player_teams', 'player_id', 'players'),
+    ('player_teams', 'team_id', 'teams'),
+    ('player_totals', 'player_id', 'players'),
+]
+
+
+def _replace_foreign_keys(ondelete):
+    for table in dict.fromkeys(t for t, _, _ in FOREIGN_KEYS):
+        with op.batch_alter_table(table, recreate='always', naming_convention=NAMING_CONVENTION) as batch_op:
+            for _, column, referred in (fk for fk in FOREIGN_KEYS if fk[0] == table):
+                name = f"fk_{table}_{column}_{referred}"
+                batch_op.drop_constraint(name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    # Rows already orphaned by earlier player deletes would make the new
+    # constraints fail once foreign keys are enforced.
+    for table, column, referred in FOREIGN_KEYS:
+        op.execute(
+            f"DELETE FROM {table} WHERE {column} IS NOT NULL "
+            f"AND {column} NOT IN (SELECT id FROM {referred})"
+        )
+    _replace_foreign_keys('CASCADE')
+
+
+def downgrade() -> None:
+    _replace_foreign_keys(None)
@@ -0,0 +1,36 @@
+"""Add match date and season to stats
+
+Revision ID: fe6dc02f9613
+Revises: e50ea099b9a3
+Create Date: 2026-10-18 15:50:55.728490
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fe6dc02f9613'
+down_revision: Union[str, None] = 'e50ea099b9a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows have no recorded date, so both columns stay NULL for them.
+    op.add_column('stats', sa.Column('match_date', sa.Date(), nullable=True))
+    op.add_column('stats', sa.Column('season', sa.Integer(), nullable=True))
+    op.create_index('ix_stats_season_player_id_goals_assists', 'stats', ['season', 'player_id', 'goals', 'assists'], unique=False)
+    op.create_index('ix_stats_player_id_match_date', 'stats', ['player_id', 'match_date'], unique=False)
+    op.create_index('ix_stats_match_date', 'stats', ['match_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stats_match_date', table_name='stats')
+    op.drop_index('ix_stats_player_id_match_date', table_name='stats')
+    op.drop_index('ix_stats_season_player_id_goals_assists', table_name='stats')
+    with op.batch_alter_table('stats') as batch_op:
+        batch_op.drop_column('season')
+        batch_op.drop_column('match_date')
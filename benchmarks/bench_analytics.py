@@ -0,0 +1,109 @@
+"""Per-player and per-team analytics: NumPy columns versus iterating ORM objects.
+
+Both sides compute the same thing — per-player matches, goal and assist
+totals, per-match averages, goal medians and 90th percentiles, then per-team
+goal distribution — and the results are checked against each other.
+
+    python -m benchmarks.bench_analytics --stats 10000000
+    python -m benchmarks.bench_analytics --db bench.db
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import tempfile
+import time
+from collections import defaultdict
+
+import numpy
+
+from lib import analytics
+from lib.models import Session, Stat, player_teams
+from lib.models.database import make_engine
+from benchmarks.dataset import create_database
+
+
+def _percentile(ordered, q):
+    """numpy.percentile's default linear interpolation on a sorted list."""
+    position = (len(ordered) - 1) * q / 100.0
+    low, high = math.floor(position), math.ceil(position)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def orm_analytics(engine):
+    """The same aggregates by loading Stat objects and grouping in Python dicts."""
+    goals_by_player = defaultdict(list)
+    assists = defaultdict(int)
+    with Session(bind=engine) as session:
+        for stat in session.query(Stat).yield_per(50000):
+            goals_by_player[stat.player_id].append(stat.goals or 0)
+            assists[stat.player_id] += stat.assists or 0
+        memberships = session.execute(player_teams.select()).all()
+    players = {}
+    for player_id, goals in goals_by_player.items():
+        goals.sort()
+        total = sum(goals)
+        players[player_id] = (len(goals), total, total / len(goals), (total + assists[player_id]) / len(goals),
+                               _percentile(goals, 50), _percentile(goals, 90))
+    teams = defaultdict(list)
+    for player_id, team_id in memberships:
+        teams[team_id].append(players[player_id][1] if player_id in players else 0)
+    team_stats = {team_id: (sum(g), sum(g) / len(g), max(g)) for team_id, g in teams.items()}
+    return players, team_stats
+
+
+def numpy_analytics(engine):
+    stats = analytics.load_stats(engine)
+    loaded = time.perf_counter()
+    players = analytics.player_analytics(stats)
+    teams = analytics.team_analytics(stats, analytics.load_memberships(engine))
+    return loaded, players, teams
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help="Existing database to read instead of generating one.")
+    parser.add_argument('--players', type=int, default=100000)
+    parser.add_argument('--teams', type=int, default=5000)
+    parser.add_argument('--stats', type=int, default=1000000)
+    parser.add_argument('--skip-orm', action='store_true', help="Only time the NumPy path.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db
+        if path is None:
+            path = os.path.join(tmp, 'bench.db')
+            create_database(path, players=args.players, teams=args.teams, stats=args.stats).dispose()
+        engine = make_engine(f"sqlite:///{path}")
+
+        start = time.perf_counter()
+        loaded, players, teams = numpy_analytics(engine)
+        end = time.perf_counter()
+        result = {
+            'stats': int(players.matches.sum()),
+            'players': len(players.player_id),
+            'teams': len(teams.team_id),
+            'numpy_load_s': round(loaded - start, 2),
+            'numpy_compute_s': round(end - loaded, 2),
+            'numpy_total_s': round(end - start, 2),
+        }
+        if not args.skip_orm:
+            start = time.perf_counter()
+            orm_players, orm_teams = orm_analytics(engine)
+            result['orm_total_s'] = round(time.perf_counter() - start, 2)
+            result['speedup'] = round(result['orm_total_s'] / max(result['numpy_total_s'], 1e-9), 1)
+            for i in numpy.linspace(0, len(players.player_id) - 1, 100).astype(int):
+                expected = orm_players[int(players.player_id[i])]
+                actual = (players.matches[i], players.goals[i], players.goals_per_match[i],
+                          players.contributions_per_match[i], players.goals_p50[i], players.goals_p90[i])
+                assert numpy.allclose(actual, expected), (players.player_id[i], actual, expected)
+            for i in range(len(teams.team_id)):
+                assert numpy.allclose((teams.goals[i], teams.mean[i], teams.max[i]), orm_teams[int(teams.team_id[i])])
+        result['peak_rss_mib'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+        engine.dispose()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
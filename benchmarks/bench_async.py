@@ -0,0 +1,105 @@
+"""Requests/sec through lib.async_api at 1, 10 and 100 concurrent callers.
+
+Each caller awaits a random mix of player profiles, team rosters, boot color
+pages and leaderboards until the run's requests are used up. A heartbeat
+task sleeping 1 ms records the worst event loop lag, which stays small if
+no query blocks the loop.
+
+    python -m benchmarks.bench_async --callers 1 10 100 --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from lib.async_api import AsyncStore
+from lib.models.cache import query_cache
+from benchmarks.dataset import create_database
+
+
+def request(store, rng, players, teams):
+    kind = rng.random()
+    if kind < 0.5:
+        return store.player_profile(rng.randint(1, players))
+    if kind < 0.75:
+        return store.team_roster(rng.randint(1, teams), limit=50)
+    if kind < 0.9:
+        return store.boot_colors(after_id=rng.randint(0, players // 2), limit=50)
+    return store.leaderboard(metric=rng.choice(['goals', 'assists', 'contributions']), limit=10)
+
+
+async def run(store, callers, requests, players, teams):
+    remaining = [requests]
+    latencies = []
+    lag = [0.0]
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag[0] = max(lag[0], time.perf_counter() - start - 0.001)
+
+    async def caller(seed):
+        rng = random.Random(seed)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            await request(store, rng, players, teams)
+            latencies.append(time.perf_counter() - start)
+
+    beat = asyncio.ensure_future(heartbeat())
+    start = time.perf_counter()
+    await asyncio.gather(*(caller(i) for i in range(callers)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await beat
+    latencies.sort()
+    return {
+        'callers': callers,
+        'requests': len(latencies),
+        'requests_per_s': round(len(latencies) / elapsed),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+        'max_loop_lag_ms': round(lag[0] * 1000, 2),
+    }
+
+
+async def main_async(args, url):
+    results = []
+    async with AsyncStore(url, backend=args.backend, workers=args.workers) as store:
+        await run(store, 10, 200, args.players, args.teams)  # warm up connections
+        for callers in args.callers:
+            query_cache.clear()
+            results.append(await run(store, callers, args.requests, args.players, args.teams))
+        backend = store.backend
+    return backend, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--callers', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--requests', type=int, default=5000, help="Requests per concurrency level.")
+    parser.add_argument('--players', type=int, default=50000)
+    parser.add_argument('--teams', type=int, default=2000)
+    parser.add_argument('--stats', type=int, default=500000)
+    parser.add_argument('--backend', choices=['auto', 'aiosqlite', 'threads'], default='auto')
+    parser.add_argument('--workers', type=int, default=8, help="Threads for the thread-pool backend.")
+    parser.add_argument('--no-cache', action='store_true', help="Disable the read cache.")
+    args = parser.parse_args()
+    if args.no_cache:
+        query_cache.maxsize = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        create_database(path, players=args.players, teams=args.teams, stats=args.stats).dispose()
+        backend, results = asyncio.run(main_async(args, f"sqlite:///{path}"))
+    print(json.dumps({'backend': backend, 'cache': not args.no_cache, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
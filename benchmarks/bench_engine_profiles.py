@@ -0,0 +1,68 @@
+"""Insert and read throughput for each engine profile in lib/models/database.py.
+
+    python -m benchmarks.bench_engine_profiles --commits 2000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import insert, select
+
+from benchmarks.dataset import populate
+from lib.models import Stat
+from lib.models.base import Base
+from lib.models.database import make_engine, PROFILES
+
+
+def bench_profile(path, profile, args):
+    engine = make_engine(f"sqlite:///{path}", profile=profile)
+    Base.metadata.create_all(engine)
+    populate(engine, players=args.players, teams=50, stats=0)
+    rng = random.Random(0)
+    result = {}
+
+    # One commit per row, the way the interactive handlers write.
+    start = time.perf_counter()
+    for _ in range(args.commits):
+        with engine.begin() as conn:
+            conn.execute(insert(Stat), {'player_id': rng.randint(1, args.players), 'goals': 1, 'assists': 0})
+    result['single_commits_per_sec'] = args.commits / (time.perf_counter() - start)
+
+    rows = [{'player_id': rng.randint(1, args.players), 'goals': 1, 'assists': 1} for _ in range(args.bulk_rows)]
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(Stat), rows)
+    result['bulk_rows_per_sec'] = args.bulk_rows / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        for _ in range(args.reads):
+            conn.execute(select(Stat.goals, Stat.assists).where(
+                Stat.player_id == rng.randint(1, args.players))).all()
+    result['reads_per_sec'] = args.reads / (time.perf_counter() - start)
+
+    engine.dispose()
+    return {name: round(value) for name, value in result.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=1000)
+    parser.add_argument('--commits', type=int, default=1000)
+    parser.add_argument('--bulk-rows', type=int, default=200000)
+    parser.add_argument('--reads', type=int, default=5000)
+    parser.add_argument('--profiles', nargs='*', default=list(PROFILES))
+    args = parser.parse_args()
+
+    results = {}
+    for profile in args.profiles:
+        with tempfile.TemporaryDirectory() as tmp:
+            results[profile] = bench_profile(os.path.join(tmp, 'bench.db'), profile, args)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
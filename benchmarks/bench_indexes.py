@@ -0,0 +1,82 @@
+"""Lookup latency with and without the indexes added in revision 3791334ac27c.
+
+    python -m benchmarks.bench_indexes --stats 1000000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from benchmarks.dataset import create_database
+
+
+INDEXES = {
+    'ix_players_name': "CREATE UNIQUE INDEX ix_players_name ON players (name)",
+    'ix_teams_name': "CREATE UNIQUE INDEX ix_teams_name ON teams (name)",
+    'ix_stats_player_id_goals_assists':
+        "CREATE INDEX ix_stats_player_id_goals_assists ON stats (player_id, goals, assists)",
+    'ix_player_teams_team_id_player_id':
+        "CREATE INDEX ix_player_teams_team_id_player_id ON player_teams (team_id, player_id)",
+}
+
+LOOKUPS = {
+    'player_stats': (
+        "SELECT SUM(goals), SUM(assists) FROM stats WHERE player_id = :id", 'players'),
+    'team_roster': (
+        "SELECT p.name FROM players p JOIN player_teams pt ON pt.player_id = p.id "
+        "WHERE pt.team_id = :id", 'teams'),
+    'player_by_name': (
+        "SELECT id FROM players WHERE name = 'Player ' || :id", 'players'),
+}
+
+
+def time_lookups(connection, scale, repeat, seed=1):
+    rng = random.Random(seed)
+    results = {}
+    for name, (sql, key) in LOOKUPS.items():
+        statement = text(sql)
+        ids = [rng.randint(1, scale[key]) for _ in range(repeat)]
+        start = time.perf_counter()
+        for i in ids:
+            connection.execute(statement, {'id': i}).all()
+        results[name] = (time.perf_counter() - start) / repeat * 1000
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=10000)
+    parser.add_argument('--teams', type=int, default=500)
+    parser.add_argument('--stats', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    scale = {'players': args.players, 'teams': args.teams}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_database(os.path.join(tmp, 'bench.db'), stats=args.stats, **scale)
+        with engine.begin() as connection:
+            for name in INDEXES:
+                connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        with engine.connect() as connection:
+            before = time_lookups(connection, scale, args.repeat)
+        with engine.begin() as connection:
+            for ddl in INDEXES.values():
+                connection.execute(text(ddl))
+            connection.execute(text("ANALYZE"))
+        with engine.connect() as connection:
+            after = time_lookups(connection, scale, args.repeat)
+        engine.dispose()
+
+    print(json.dumps({
+        'scale': dict(scale, stats=args.stats),
+        'ms_per_lookup': {name: {'before': round(before[name], 3), 'after': round(after[name], 3)}
+                          for name in LOOKUPS},
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
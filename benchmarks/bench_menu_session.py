@@ -0,0 +1,73 @@
+"""Per-command latency of a scripted menu run, with and without the shared session.
+
+    python -m benchmarks.bench_menu_session --rounds 200
+"""
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.dataset import create_database
+from lib.models import Session
+from lib.models.database import make_engine
+
+# (menu choice, answers to its prompts)
+SCRIPT = [
+    ('6', ['17']),
+    ('7', ['3']),
+    ('8', []),
+    ('9', []),
+    ('4', ['17', '1', '0']),
+]
+
+
+def run_script(cli, rounds, shared):
+    answers = []
+    builtins.input = lambda prompt='': answers.pop(0)
+    handlers = {
+        '4': cli.add_stat_func, '6': cli.list_player_stats_func, '7': cli.list_team_players_func,
+        '8': cli.list_all_boot_colors_func, '9': cli.show_top_scorers_func,
+    }
+    timings = {choice: 0.0 for choice, _ in SCRIPT}
+    scope = cli.UnitOfWork() if shared else contextlib.nullcontext()
+    with scope, contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(rounds):
+            for choice, prompts in SCRIPT:
+                answers[:] = prompts
+                start = time.perf_counter()
+                handlers[choice]()
+                timings[choice] += time.perf_counter() - start
+    return {handlers[c].__name__: round(t / rounds * 1000, 3) for c, t in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3, help="Alternating runs; the best is kept.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        create_database(path, players=2000, teams=100, stats=50000).dispose()
+        engine = make_engine(f"sqlite:///{path}")
+        Session.configure(bind=engine)
+        from lib import cli
+
+        run_script(cli, 10, shared=False)  # warm up imports and the pool
+        results = {'ms_per_command': {}}
+        for _ in range(args.repeat):
+            for label, shared in (('session_per_command', False), ('shared_session', True)):
+                timings = run_script(cli, args.rounds, shared=shared)
+                best = results['ms_per_command'].setdefault(label, timings)
+                for name, value in timings.items():
+                    best[name] = min(best[name], value)
+        engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""List and report reads: Core select() tuples versus loading ORM instances.
+
+"orm" is how these commands used to read (mapped BootColor/Team/Player
+objects with their relationships, as in the original list commands and the
+eager-loading profile query); "core" is the current lib.models.queries path.
+Each run uses a fresh session and an empty query cache. Memory is the
+tracemalloc peak while the rows are read and held.
+
+    python -m benchmarks.bench_read_path --players 100000 --teams 25
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from lib.models import BootColor, Player, PlayerTotal, Session, Team
+from lib.models.cache import query_cache
+from lib.models.database import make_engine
+from lib.models.queries import get_player_profile, iter_team_players, list_boot_colors
+from benchmarks.dataset import create_database
+
+PROFILES = 1000
+
+
+def orm_boot_colors(session):
+    return [(bc.id, bc.color, bc.player.name if bc.player else None)
+            for bc in session.query(BootColor).options(joinedload(BootColor.player)).order_by(BootColor.id)]
+
+
+def orm_team_players(session, team_id):
+    return [(p.id, p.name) for p in session.get(Team, team_id).players]
+
+
+def orm_profiles(session, ids):
+    profiles = []
+    for player_id in ids:
+        player, totals = (
+            session.query(Player, PlayerTotal)
+            .outerjoin(PlayerTotal, PlayerTotal.player_id == Player.id)
+            .options(joinedload(Player.boot_color), selectinload(Player.teams))
+            .filter(Player.id == player_id)
+            .one()
+        )
+        profiles.append((player.id, player.name, totals.goals if totals else 0,
+                         player.boot_color.color if player.boot_color else None, [t.name for t in player.teams]))
+    return profiles
+
+
+def measure(fn, repeat):
+    """Best wall time over repeat runs, then the tracemalloc peak of one more."""
+    timings = []
+    for _ in range(repeat):
+        query_cache.clear()
+        with Session() as session:
+            start = time.perf_counter()
+            rows = fn(session)
+            timings.append(time.perf_counter() - start)
+    query_cache.clear()
+    with Session() as session:
+        tracemalloc.start()
+        fn(session)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    best = min(timings)
+    return {'rows': len(rows), 'ms': round(best * 1000, 1), 'rows_per_s': round(len(rows) / best),
+            'peak_kib': peak // 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, default=100000)
+    parser.add_argument('--teams', type=int, default=25)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        create_database(path, players=args.players, teams=args.teams, stats=args.players).dispose()
+        engine = make_engine(f"sqlite:///{path}")
+        Session.configure(bind=engine)
+        ids = random.Random(0).sample(range(1, args.players + 1), min(PROFILES, args.players))
+        scenarios = {
+            'list_boot_colors': (orm_boot_colors, list_boot_colors),
+            'list_team_players': (lambda s: orm_team_players(s, 1), lambda s: list(iter_team_players(s, 1))),
+            'player_profiles': (lambda s: orm_profiles(s, ids),
+                                lambda s: [get_player_profile.uncached(s, i) for i in ids]),
+        }
+        results = {}
+        for name, (orm, core) in scenarios.items():
+            results[name] = {'orm': measure(orm, args.repeat), 'core': measure(core, args.repeat)}
+            results[name]['speedup'] = round(results[name]['orm']['ms'] / results[name]['core']['ms'], 1)
+            results[name]['memory_ratio'] = round(
+                results[name]['orm']['peak_kib'] / max(results[name]['core']['peak_kib'], 1), 1)
+        engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Parallel team report: wall time against the number of worker processes.
+
+Every run computes the same per-team totals and goal spread; the results of
+each worker count are checked against the single-process run.
+
+    python -m benchmarks.bench_reports --stats 5000000 --workers 1,2,4,8
+    python -m benchmarks.bench_reports --db bench.db
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from lib import reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help="Existing database to read instead of generating one.")
+    parser.add_argument('--players', type=int, default=100000)
+    parser.add_argument('--teams', type=int, default=5000)
+    parser.add_argument('--stats', type=int, default=2000000)
+    parser.add_argument('--workers', default=None,
+                        help="Comma-separated worker counts (default: 1, 2, 4, ... up to the CPU count).")
+    parser.add_argument('--season', type=int)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        counts = [int(count) for count in args.workers.split(',')]
+    else:
+        counts = sorted({1, cpus} | {2 ** i for i in range(1, cpus.bit_length()) if 2 ** i <= cpus})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db
+        if path is None:
+            # Imported here so spawned workers, which re-import this module, don't load SQLAlchemy.
+            from benchmarks.dataset import create_database
+            path = os.path.join(tmp, 'bench.db')
+            create_database(path, players=args.players, teams=args.teams, stats=args.stats).dispose()
+
+        result = {'cpus': cpus, 'runs': []}
+        expected = None
+        for workers in counts:
+            runs = [reports.team_report(path, workers, args.season) for _ in range(args.repeat)]
+            best = min(run.elapsed for run in runs)
+            if expected is None:
+                expected, single = runs[0].teams, best
+            assert runs[0].teams == expected, workers
+            result['runs'].append({'workers': workers, 'ranges': runs[0].ranges, 'best_s': round(best, 3),
+                                   'speedup': round(single / best, 2)})
+        result['teams'] = len(expected)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Name search latency: FTS5 prefix/trigram search versus a LIKE '%...%' scan.
+
+The LIKE column is what `run-sql` users did before: scan every name and
+return all that contain the query's first word, unranked.
+
+    python -m benchmarks.bench_search --players 1000000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import insert, text
+
+from lib.models import Player, Session
+from lib.models.base import Base
+from lib.models.cache import query_cache
+from lib.models.database import make_engine
+from lib.models.search import search_names
+
+SYLLABLES = ["ka", "li", "mo", "ne", "ro", "sa", "vi", "de", "ba", "lu", "ma", "to", "gre", "ber", "chi", "fe"]
+QUERIES = ["lukamo", "ma", "sa vi", "kalimo robe", "kalimq"]
+
+
+def names(count, seed=0):
+    """Yield count distinct two-word names built from random syllables."""
+    rng = random.Random(seed)
+    seen = set()
+    while len(seen) < count:
+        first = "".join(rng.choices(SYLLABLES, k=rng.randint(2, 3))).title()
+        last = "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))).title()
+        name = f"{first} {last}"
+        if name in seen:
+            name = f"{name} {len(seen)}"
+        seen.add(name)
+        yield name
+
+
+def best_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        query_cache.clear()
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return round(min(timings) * 1000, 2), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", profile='bulk')
+        Base.metadata.create_all(engine)
+        start = time.perf_counter()
+        with engine.begin() as connection:
+            batch = []
+            for name in names(args.players):
+                batch.append({'name': name})
+                if len(batch) == 50000:
+                    connection.execute(insert(Player), batch)
+                    batch = []
+            if batch:
+                connection.execute(insert(Player), batch)
+        load_s = round(time.perf_counter() - start, 1)
+
+        results = {}
+        with Session(bind=engine) as session:
+            for query in QUERIES:
+                fts_ms, found = best_ms(lambda: search_names(session, query), args.repeat)
+                like_ms, _ = best_ms(lambda: session.execute(text(
+                    "SELECT id, name FROM players WHERE name LIKE :pattern"
+                ), {'pattern': f"%{query.split()[0]}%"}).all(), args.repeat)
+                results[query] = {
+                    'search_ms': fts_ms,
+                    'like_scan_ms': like_ms,
+                    'top': [f"{r.name} ({r.match})" for r in found[:3]],
+                }
+        engine.dispose()
+    print(json.dumps({'players': args.players, 'load_with_triggers_s': load_s, 'queries': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Read query latency: the in-memory snapshot versus SQLite (read cache off).
+
+Runs each menu read query against both and checks that they agree, then
+times saving the snapshot to a file and mapping it back.
+
+    python -m benchmarks.bench_snapshot --stats 10000000
+    python -m benchmarks.bench_snapshot --db bench.db
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+
+from lib.models import Session
+from lib.models.cache import query_cache
+from lib.models.database import make_engine
+from lib.models.leaderboard import leaderboard
+from lib.models.queries import get_player_profile, iter_boot_colors, iter_team_players
+from lib.models.season import player_seasons, totals_between
+from lib.snapshot import Snapshot, open_snapshot
+from benchmarks.dataset import create_database
+
+QUERIES = {
+    'player_profile': lambda q, rng: q(get_player_profile, rng.randint(1, 1000)),
+    'team_players': lambda q, rng: list(q(iter_team_players, rng.randint(1, 100), limit=50)),
+    'boot_colors_page': lambda q, rng: list(q(iter_boot_colors, after_id=rng.randint(0, 1000), limit=50)),
+    'player_seasons': lambda q, rng: q(player_seasons, rng.randint(1, 1000)),
+    'top_scorers': lambda q, rng: q(leaderboard, metric='goals', limit=10),
+    'top_scorers_team': lambda q, rng: q(leaderboard, metric='goals', limit=3, team_id=rng.randint(1, 100)),
+    'top_scorers_season': lambda q, rng: q(leaderboard, metric='contributions', limit=10, season=2023),
+    'stats_between_week': lambda q, rng: q(totals_between, datetime.date(2023, 3, 1), datetime.date(2023, 3, 7)),
+}
+
+
+def timed(query, repeat):
+    """Median milliseconds of repeat calls, with the same random arguments on every backend."""
+    timings, results = [], []
+    rng = random.Random(0)
+    for _ in range(repeat):
+        query_cache.clear()
+        start = time.perf_counter()
+        results.append(query(rng))
+        timings.append(time.perf_counter() - start)
+    return round(sorted(timings)[len(timings) // 2] * 1000, 3), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help="Existing database to read instead of generating one.")
+    parser.add_argument('--players', type=int, default=100000)
+    parser.add_argument('--teams', type=int, default=5000)
+    parser.add_argument('--stats', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db
+        if path is None:
+            path = os.path.join(tmp, 'bench.db')
+            create_database(path, players=args.players, teams=args.teams, stats=args.stats).dispose()
+        engine = make_engine(f"sqlite:///{path}")
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        snapshot = Snapshot.load(engine)
+        rows = snapshot.row_counts()
+        usage = snapshot.memory_usage()
+        result = {
+            'rows': rows,
+            'load_s': round(snapshot.load_time, 2),
+            'snapshot_mib': round(sum(usage.values()) / 2 ** 20, 1),
+            'bytes_per_stat': round(usage['stats'] / max(rows['stats'], 1), 1),
+            'load_peak_rss_mib': round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) / 1024),
+            'queries_ms': {},
+        }
+        with Session(bind=engine) as session:
+            for name, query in QUERIES.items():
+                memory_ms, expected = timed(lambda rng: query(
+                    lambda fn, *a, **k: getattr(snapshot, fn.__name__)(*a, **k), rng), args.repeat)
+                sqlite_ms, actual = timed(lambda rng: query(lambda fn, *a, **k: fn(session, *a, **k), rng),
+                                          args.repeat)
+                assert actual == expected, name
+                result['queries_ms'][name] = {'snapshot': memory_ms, 'sqlite': sqlite_ms}
+
+        snapshot_path = os.path.join(tmp, 'bench.snapshot')
+        start = time.perf_counter()
+        open_snapshot(snapshot_path, engine)
+        result['file_build_s'] = round(time.perf_counter() - start, 2)
+        result['file_mib'] = round(os.path.getsize(snapshot_path) / 2 ** 20, 1)
+        mapped, rebuilt = open_snapshot(snapshot_path, engine)
+        assert not rebuilt
+        result['file_open_ms'] = round(mapped.load_time * 1000, 3)
+        start = time.perf_counter()
+        first = mapped.leaderboard(metric='goals', limit=10)
+        result['file_first_top_scorers_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        assert first == snapshot.leaderboard(metric='goals', limit=10)
+        engine.dispose()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
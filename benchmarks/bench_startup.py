@@ -0,0 +1,64 @@
+"""CLI startup cost: import time of lib.cli and wall time of short-lived runs.
+
+Exits with status 1 if the median import time of lib.cli is over the
+budget, which is well below the ~300ms it takes just to import
+sqlalchemy.orm, so a regression that loads it eagerly is caught.
+
+    python -m benchmarks.bench_startup --runs 10 --budget-ms 150
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CLI = os.path.join(PROJECT_ROOT, 'lib', 'cli.py')
+
+# Generous so slow machines pass; see the module docstring.
+IMPORT_BUDGET_MS = 150
+
+
+def import_time_ms(module):
+    """Cumulative import time of module in a fresh interpreter, from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    for line in reversed(result.stderr.splitlines()):
+        fields = [f.strip() for f in line.split('|')]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def wall_time_ms(args, stdin=None):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, CLI] + args, cwd=PROJECT_ROOT, input=stdin,
+                   capture_output=True, text=True, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS,
+                        help="Fail if lib.cli's median import time is above this.")
+    args = parser.parse_args()
+
+    samples = {
+        'import_lib_cli': [import_time_ms('lib.cli') for _ in range(args.runs)],
+        'import_sqlalchemy_orm': [import_time_ms('sqlalchemy.orm') for _ in range(args.runs)],
+        'wall_help': [wall_time_ms(['--help']) for _ in range(args.runs)],
+        'wall_menu_exit': [wall_time_ms([], stdin='0\n') for _ in range(args.runs)],
+    }
+    medians = {name: round(statistics.median(values), 1) for name, values in samples.items()}
+    print(json.dumps(medians, indent=2))
+    if medians['import_lib_cli'] > args.budget_ms:
+        sys.exit(f"lib.cli took {medians['import_lib_cli']}ms to import, over the {args.budget_ms:g}ms budget")
+
+
+if __name__ == '__main__':
+    main()
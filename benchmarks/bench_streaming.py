@@ -0,0 +1,82 @@
+"""Peak memory and time to first row for run-sql, streamed versus fetchall().
+
+    python -m benchmarks.bench_streaming --stats 1000000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import text
+
+from benchmarks.dataset import create_database
+from lib.models import Session
+from lib.models.database import make_engine
+
+QUERY = "SELECT * FROM stats"
+
+
+class FirstLineTimer(io.StringIO):
+    """Discards output but records when the first result row was written."""
+
+    def __init__(self):
+        super().__init__()
+        self.first_row_at = None
+
+    def write(self, s):
+        if self.first_row_at is None and '|' in s:
+            self.first_row_at = time.perf_counter()
+        return len(s)
+
+
+def measure(run):
+    out = FirstLineTimer()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(out):
+        run()
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'first_row_ms': round((out.first_row_at - start) * 1000, 1),
+        'total_s': round(total, 2),
+        'peak_mb': round(peak / 2 ** 20, 1),
+    }
+
+
+def fetchall_run_sql():
+    """The previous implementation: materialise every row, then print."""
+    with Session() as session:
+        result = session.execute(text(QUERY)).fetchall()
+        print(" | ".join(result[0]._fields))
+        for row in result:
+            print(" | ".join(str(col) for col in row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--stats', type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        create_database(path, players=10000, teams=500, stats=args.stats).dispose()
+        engine = make_engine(f"sqlite:///{path}")
+        Session.configure(bind=engine)
+        from lib import cli
+
+        results = {
+            'fetchall': measure(fetchall_run_sql),
+            'streamed': measure(lambda: cli.run_custom_sql_func(QUERY)),
+        }
+        engine.dispose()
+    print(json.dumps(dict(results, stats=args.stats), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Write throughput with several CLI processes adding stats to one database.
+
+Each process runs add-stat's handler --writes times (a read of the player,
+then an insert and totals update, committed); every run checks that no
+write was lost and no command printed an error.
+
+    python -m benchmarks.bench_writers --processes 1 2 4 8 --writes 200
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from sqlalchemy import func
+
+from lib import cli
+from lib.models import Player, Session, Stat
+from lib.models.base import Base
+from lib.models.database import make_engine
+
+
+def write_stats(url, player_id, count):
+    """Runs in a child process: add count stats through the CLI handler; return its error lines."""
+    Session.configure(bind=make_engine(url))
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        for _ in range(count):
+            cli.add_stat_func(player_id, 1, 0)
+    return [line for line in out.getvalue().splitlines() if 'rror' in line]
+
+
+def run(path, processes, writes):
+    url = f"sqlite:///{path}"
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(bind=engine) as session:
+        session.add_all([Player(name=f"Player {i}") for i in range(processes)])
+        session.commit()
+
+    with multiprocessing.get_context('spawn').Pool(processes) as pool:
+        pool.apply(time.sleep, (0,))  # workers started before timing
+        start = time.perf_counter()
+        errors = pool.starmap(write_stats, [(url, i + 1, writes) for i in range(processes)])
+        elapsed = time.perf_counter() - start
+
+    with Session(bind=engine) as session:
+        stored = session.query(func.count(Stat.id)).scalar()
+    engine.dispose()
+    return {
+        'processes': processes,
+        'writes': processes * writes,
+        'stored': stored,
+        'errors': sum(len(e) for e in errors),
+        'seconds': round(elapsed, 2),
+        'writes_per_s': round(stored / elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--writes', type=int, default=200, help="Writes per process.")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for processes in args.processes:
+            results.append(run(os.path.join(tmp, f"writers-{processes}.db"), processes, args.writes))
+    print(json.dumps(results, indent=2))
+    if any(r['stored'] != r['writes'] or r['errors'] for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Deterministic synthetic data for the benchmark scripts.
+
+    python -m benchmarks.dataset bench.db --scale large
+    python -m benchmarks.dataset bench.db --players 50000 --stats 2000000
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import time
+
+from sqlalchemy import create_engine, insert
+
+from lib.models import Player, Team, Stat, BootColor, PlayerTotal, player_teams
+from lib.models.base import Base
+from lib.models.stat import season_for
+
+
+CHUNK = 50000
+# Stats are spread over five seasons, 2020/21 to 2024/25.
+FIRST_MATCH_DAY = datetime.date(2020, 8, 1)
+MATCH_DAYS = 5 * 365
+SCALES = {
+    'small': dict(players=10000, teams=500, stats=100000),
+    'medium': dict(players=50000, teams=2000, stats=1000000),
+    'large': dict(players=100000, teams=5000, stats=10000000),
+}
+COLORS = ["Gold", "Blue", "Red", "White", "Black"]
+
+
+def _insert_chunked(connection, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= CHUNK:
+            connection.execute(insert(table), batch)
+            batch = []
+    if batch:
+        connection.execute(insert(table), batch)
+
+
+def populate(engine, players=10000, teams=500, stats=100000, teams_per_player=2, seed=0):
+    """Fill an empty schema with players, teams, memberships, boot colors, stats and totals."""
+    rng = random.Random(seed)
+    totals = [[0, 0, 0] for _ in range(players + 1)]
+
+    def stat_rows():
+        for _ in range(stats):
+            player_id = rng.randint(1, players)
+            goals = rng.choices((0, 1, 2, 3), weights=(60, 28, 9, 3))[0]
+            assists = rng.choices((0, 1, 2), weights=(70, 25, 5))[0]
+            total = totals[player_id]
+            total[0] += goals
+            total[1] += assists
+            total[2] += 1
+            match_date = FIRST_MATCH_DAY + datetime.timedelta(days=rng.randrange(MATCH_DAYS))
+            yield {'player_id': player_id, 'goals': goals, 'assists': assists,
+                   'match_date': match_date, 'season': season_for(match_date)}
+
+    def membership_rows():
+        for player_id in range(1, players + 1):
+            for team_id in rng.sample(range(1, teams + 1), min(teams_per_player, teams)):
+                yield {'player_id': player_id, 'team_id': team_id}
+
+    with engine.begin() as connection:
+        _insert_chunked(connection, Player.__table__,
+                        ({'id': i, 'name': f"Player {i}"} for i in range(1, players + 1)))
+        _insert_chunked(connection, Team.__table__,
+                        ({'id': i, 'name': f"Team {i}"} for i in range(1, teams + 1)))
+        _insert_chunked(connection, player_teams, membership_rows())
+        _insert_chunked(connection, BootColor.__table__, (
+            {'player_id': i, 'color': COLORS[i % len(COLORS)]} for i in range(1, players + 1, 2)
+        ))
+        _insert_chunked(connection, Stat.__table__, stat_rows())
+        _insert_chunked(connection, PlayerTotal.__table__, (
+            {'player_id': i, 'goals': t[0], 'assists': t[1], 'appearances': t[2]}
+            for i, t in enumerate(totals) if t[2]
+        ))
+
+
+def create_database(path, **scale):
+    """Create a fresh database file at path from the model metadata and populate it."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    populate(engine, **scale)
+    return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', help="Database file to create; must not exist yet.")
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--players', type=int)
+    parser.add_argument('--teams', type=int)
+    parser.add_argument('--stats', type=int)
+    parser.add_argument('--teams-per-player', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} already exists")
+    scale = dict(SCALES[args.scale], teams_per_player=args.teams_per_player, seed=args.seed)
+    scale.update({k: v for k, v in vars(args).items() if k in ('players', 'teams', 'stats') and v is not None})
+    start = time.perf_counter()
+    create_database(args.path, **scale).dispose()
+    print(json.dumps(dict(scale, path=args.path, seconds=round(time.perf_counter() - start, 1)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
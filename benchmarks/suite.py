@@ -0,0 +1,185 @@
+"""Timed scenarios for every CLI operation, reported as JSON.
+
+    python -m benchmarks.suite --scale small --output results.json
+    python -m benchmarks.suite --db large.db --baseline results.json --tolerance 0.2
+
+Each scenario calls the command's handler the way the CLI does, with the read
+cache cleared before every call so reads hit the database. Writes and deletes
+use a distinct row per call, so the database is copied (or generated) into a
+temporary directory first and never modified in place.
+With --baseline, any scenario whose median is more than --tolerance slower
+than the baseline's is reported and the exit status is 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import sqlalchemy
+
+from benchmarks.dataset import SCALES, create_database
+from lib.models import Session
+from lib.models.cache import query_cache
+from lib.models.database import make_engine
+
+IMPORT_ROWS = 10000
+
+
+class Dataset:
+    """Row counts of the benchmark database and the targets each scenario works through."""
+
+    def __init__(self, connection):
+        def scalar(sql):
+            return connection.exec_driver_sql(sql).scalar()
+
+        self.players = scalar("SELECT max(id) FROM players")
+        self.teams = scalar("SELECT max(id) FROM teams")
+        self.stats = scalar("SELECT max(id) FROM stats")
+        self.memberships = connection.exec_driver_sql(
+            "SELECT player_id, team_id FROM player_teams WHERE player_id > ? ORDER BY player_id LIMIT 10000",
+            (self.players // 2,),
+        ).fetchall()
+        self.boot_color_players = [row[0] for row in connection.exec_driver_sql(
+            "SELECT player_id FROM boot_colors WHERE player_id <= ? ORDER BY player_id LIMIT 10000",
+            (self.players // 2,),
+        )]
+
+
+def scenarios(cli, data, import_path):
+    """Map scenario name to a callable taking the call number."""
+    def spread(i, n):
+        return 1 + (i * 7919) % n
+
+    return {
+        'add_player': lambda i: cli.add_player_func(f"Bench Player {i}"),
+        'add_team': lambda i: cli.add_team_func(f"Bench Team {i}"),
+        'add_player_to_team': lambda i: cli.add_player_to_team_func(spread(i, data.players), data.teams - i % data.teams),
+        'add_stat': lambda i: cli.add_stat_func(spread(i, data.players), 1, 1),
+        'add_boot_color': lambda i: cli.add_boot_color_func(2 + 2 * (i % (data.players // 2)), "Gold"),
+        'list_player_stats': lambda i: cli.list_player_stats_func(spread(i, data.players)),
+        'list_team_players': lambda i: cli.list_team_players_func(spread(i, data.teams)),
+        'list_boot_colors_page': lambda i: cli.list_all_boot_colors_func(limit=500, after_id=spread(i, data.players // 2)),
+        'list_boot_colors_all': lambda i: cli.list_all_boot_colors_func(),
+        'top_scorers': lambda i: cli.show_top_scorers_func(),
+        'top_scorers_team': lambda i: cli.show_top_scorers_func(team_id=spread(i, data.teams)),
+        'top_scorers_per_team': lambda i: cli.show_top_scorers_func(per_team=True),
+        'run_sql': lambda i: cli.run_custom_sql_func(
+            f"SELECT * FROM stats WHERE player_id = {spread(i, data.players)}"),
+        'import_stats': lambda i: cli.import_stats_func(import_path),
+        'delete_stat': lambda i: cli.delete_stat_func(data.stats - i, confirm=True),
+        'delete_boot_color': lambda i: cli.delete_boot_color_func(data.boot_color_players[i], confirm=True),
+        'remove_player_from_team': lambda i: cli.remove_player_from_team_func(*data.memberships[i]),
+        'delete_team': lambda i: cli.delete_team_func(data.teams - i, confirm=True),
+        'delete_player': lambda i: cli.delete_player_func(data.players - i, confirm=True),
+    }
+
+
+def time_scenario(run, repeat, warm_cache):
+    timings = []
+    for i in range(repeat):
+        if not warm_cache:
+            query_cache.clear()
+        out = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(out):
+            run(i)
+        timings.append((time.perf_counter() - start) * 1000)
+        output = out.getvalue()
+        if 'Error' in output or 'error occurred' in output:
+            raise RuntimeError(f"call {i} failed: {output.strip()}")
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(timings[0], 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'runs': repeat,
+    }
+
+
+def write_import_file(path, data):
+    with open(path, 'w') as f:
+        f.write("player_id,goals,assists\n")
+        for i in range(IMPORT_ROWS):
+            f.write(f"{1 + (i * 104729) % data.players},{i % 3},{i % 2}\n")
+
+
+def compare(results, baseline, tolerance):
+    """Return (name, baseline_ms, current_ms) for every scenario slower than tolerance allows."""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if before and current['median_ms'] > before['median_ms'] * (1 + tolerance):
+            regressions.append((name, before['median_ms'], current['median_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='small', help="Dataset to generate when --db is not given.")
+    parser.add_argument('--db', help="Existing database (e.g. from benchmarks.dataset) to copy and benchmark.")
+    parser.add_argument('--repeat', type=int, default=20, help="Calls per scenario.")
+    parser.add_argument('--only', action='append', metavar='SCENARIO', help="Run just this scenario (repeatable).")
+    parser.add_argument('--warm-cache', action='store_true', help="Keep the read cache between calls.")
+    parser.add_argument('--output', help="Also write the JSON results to this file.")
+    parser.add_argument('--baseline', help="Results file to compare against.")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed median slowdown against the baseline.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        if args.db:
+            shutil.copyfile(args.db, path)
+            scale = {'db': args.db}
+        else:
+            create_database(path, **SCALES[args.scale]).dispose()
+            scale = dict(SCALES[args.scale], name=args.scale)
+        engine = make_engine(f"sqlite:///{path}")
+        Session.configure(bind=engine)
+        from lib import cli
+
+        with engine.connect() as connection:
+            data = Dataset(connection)
+        scale.update(players=data.players, teams=data.teams, stats=data.stats)
+        import_path = os.path.join(tmp, 'import.csv')
+        write_import_file(import_path, data)
+
+        available = scenarios(cli, data, import_path)
+        names = args.only or list(available)
+        unknown = set(names) - set(available)
+        if unknown:
+            parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+        results = {
+            'scale': scale,
+            'repeat': args.repeat,
+            'warm_cache': args.warm_cache,
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'sqlite': sqlite3.sqlite_version,
+            'scenarios': {name: time_scenario(available[name], args.repeat, args.warm_cache) for name in names},
+        }
+        engine.dispose()
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + "\n")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before} ms -> {after} ms", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
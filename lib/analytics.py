@@ -0,0 +1,133 @@
+import itertools
+from collections import namedtuple
+
+import numpy
+
+StatColumns = namedtuple('StatColumns', 'player_id goals assists')
+Memberships = namedtuple('Memberships', 'player_id team_id')
+PlayerAnalytics = namedtuple(
+    'PlayerAnalytics',
+    'player_id matches goals assists goals_per_match assists_per_match contributions_per_match goals_p50 goals_p90',
+)
+TeamAnalytics = namedtuple('TeamAnalytics', 'team_id players goals mean std max top_share')
+
+
+def _load(engine, count_sql, select_sql, params, width):
+    """Run select_sql on a raw DBAPI cursor and return its integer columns as one (rows, width) array.
+
+    The rows' values are streamed straight into a preallocated array with
+    numpy.fromiter, so no per-row objects beyond the driver's tuples exist.
+    """
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        # One read transaction so the count and the rows agree.
+        cursor.execute("BEGIN")
+        try:
+            count = cursor.execute(count_sql, params).fetchone()[0]
+            cursor.execute(select_sql, params)
+            values = itertools.chain.from_iterable(cursor)
+            data = numpy.fromiter(values, dtype=numpy.int64, count=count * width).reshape(count, width)
+        finally:
+            cursor.execute("COMMIT")
+    finally:
+        raw.close()
+    return data
+
+
+def load_stats(engine, season=None):
+    """Load every stat row's player_id, goals and assists into NumPy arrays, bypassing the ORM."""
+    where = "WHERE player_id IS NOT NULL"
+    params = ()
+    if season is not None:
+        where += " AND season = ?"
+        params = (season,)
+    data = _load(engine, f"SELECT count(*) FROM stats {where}",
+                 f"SELECT player_id, coalesce(goals, 0), coalesce(assists, 0) FROM stats {where}", params, 3)
+    return StatColumns(*(numpy.ascontiguousarray(column) for column in data.T))
+
+
+def load_memberships(engine):
+    """Load the player_teams pairs into NumPy arrays."""
+    data = _load(engine, "SELECT count(*) FROM player_teams", "SELECT player_id, team_id FROM player_teams", (), 2)
+    return Memberships(*(numpy.ascontiguousarray(column) for column in data.T))
+
+
+def grouped_percentiles(groups, values, percentiles, size):
+    """Return a (len(percentiles), size) array of per-group percentiles of non-negative integer values.
+
+    Rows are sorted once by a combined (group, value) key, so each group's
+    values sit in order between its start offset and the next group's; a
+    percentile is then a linear interpolation between two positions, done for
+    every group at once. Groups with no rows get NaN.
+    """
+    counts = numpy.bincount(groups, minlength=size)
+    starts = numpy.cumsum(counts) - counts
+    span = int(values.max()) + 1 if len(values) else 1
+    ordered = numpy.sort(groups * span + values) % span
+    result = numpy.full((len(percentiles), size), numpy.nan)
+    present = counts > 0
+    for i, q in enumerate(percentiles):
+        position = starts[present] + (counts[present] - 1) * (q / 100.0)
+        low = numpy.floor(position).astype(numpy.int64)
+        high = numpy.ceil(position).astype(numpy.int64)
+        result[i, present] = ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+    return result
+
+
+def player_analytics(stats, min_matches=1):
+    """Per-player totals, per-match averages and goal percentiles for players with at least min_matches."""
+    size = int(stats.player_id.max()) + 1 if len(stats.player_id) else 0
+    matches = numpy.bincount(stats.player_id, minlength=size)
+    goals = numpy.bincount(stats.player_id, weights=stats.goals, minlength=size).astype(numpy.int64)
+    assists = numpy.bincount(stats.player_id, weights=stats.assists, minlength=size).astype(numpy.int64)
+    p50, p90 = grouped_percentiles(stats.player_id, stats.goals, (50, 90), size)
+    ids = numpy.flatnonzero(matches >= max(min_matches, 1))
+    played = matches[ids]
+    return PlayerAnalytics(
+        player_id=ids,
+        matches=played,
+        goals=goals[ids],
+        assists=assists[ids],
+        goals_per_match=goals[ids] / played,
+        assists_per_match=assists[ids] / played,
+        contributions_per_match=(goals[ids] + assists[ids]) / played,
+        goals_p50=p50[ids],
+        goals_p90=p90[ids],
+    )
+
+
+def team_analytics(stats, memberships):
+    """How each team's goals are spread across its players: total, mean, spread, best and their share."""
+    size = int(stats.player_id.max()) + 1 if len(stats.player_id) else 0
+    goals_by_player = numpy.bincount(stats.player_id, weights=stats.goals, minlength=size).astype(numpy.int64)
+    known = memberships.player_id < size
+    member_goals = numpy.zeros(len(memberships.player_id), dtype=numpy.int64)
+    member_goals[known] = goals_by_player[memberships.player_id[known]]
+
+    teams = int(memberships.team_id.max()) + 1 if len(memberships.team_id) else 0
+    players = numpy.bincount(memberships.team_id, minlength=teams)
+    goals = numpy.bincount(memberships.team_id, weights=member_goals, minlength=teams)
+    squares = numpy.bincount(memberships.team_id, weights=member_goals.astype(numpy.float64) ** 2, minlength=teams)
+    best = grouped_percentiles(memberships.team_id, member_goals, (100,), teams)[0]
+
+    ids = numpy.flatnonzero(players)
+    mean = goals[ids] / players[ids]
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        top_share = numpy.where(goals[ids] > 0, best[ids] / goals[ids], 0.0)
+    return TeamAnalytics(
+        team_id=ids,
+        players=players[ids],
+        goals=goals[ids].astype(numpy.int64),
+        mean=mean,
+        std=numpy.sqrt(numpy.maximum(squares[ids] / players[ids] - mean ** 2, 0.0)),
+        max=best[ids].astype(numpy.int64),
+        top_share=top_share,
+    )
+
+
+def top(analytics, column, limit):
+    """Indexes of the limit largest values of column, largest first (ties by id)."""
+    values = getattr(analytics, column)
+    order = numpy.lexsort((analytics[0], -values))
+    return order[:limit]
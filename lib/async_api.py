@@ -0,0 +1,116 @@
+import asyncio
+import functools
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import Session
+
+from lib.models import load_models
+from lib.models.database import DEFAULT_URL, make_engine, tune_engine
+from lib.models.leaderboard import leaderboard
+from lib.models.queries import get_player_profile, get_team_name, iter_boot_colors, iter_team_players
+
+# Optional: with aiosqlite installed, queries run on SQLAlchemy's asyncio
+# engine. Without it they run on a pool of threads, each call with its own
+# session and pooled connection, so the event loop is never blocked either way.
+# SQLAlchemy's asyncio extension also needs greenlet (pip install
+# "sqlalchemy[asyncio]"); the ImportError saying what is missing is kept.
+try:
+    import aiosqlite  # noqa: F401
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+except ImportError as e:
+    aiosqlite = None
+    _aiosqlite_error = e
+else:
+    _aiosqlite_error = None
+
+# Threads used by the fallback; below the engine's default pool of 5 + 10
+# connections, so a call never waits for a connection behind the others.
+DEFAULT_WORKERS = 8
+
+
+def _team_roster(session, team_id, after_id, limit):
+    name = get_team_name(session, team_id)
+    if name is None:
+        return None
+    return name, list(iter_team_players(session, team_id, after_id=after_id, limit=limit))
+
+
+def _boot_colors(session, after_id, limit):
+    return list(iter_boot_colors(session, after_id=after_id, limit=limit))
+
+
+class AsyncStore:
+    """The CLI's read queries as coroutines, for asyncio services.
+
+    Every method runs the same query function the CLI uses (and shares the
+    read cache), so results are the same namedtuples. Cached results are
+    checked against the change log before they are served, so writes made by
+    the CLI or any other process are seen by the next call. Use it as an
+    async context manager, or call close() when done.
+    """
+
+    def __init__(self, url=None, profile=None, workers=DEFAULT_WORKERS, backend='auto'):
+        url = url or os.environ.get('FOOTBALL_DB_URL', DEFAULT_URL)
+        if backend == 'auto':
+            backend = 'aiosqlite' if aiosqlite is not None and url.startswith('sqlite:') else 'threads'
+            # Without aiosqlite, threads are the expected fallback; aiosqlite
+            # installed but unusable (e.g. no greenlet) is worth saying.
+            if aiosqlite is None and _aiosqlite_error.name != 'aiosqlite':
+                warnings.warn(f"Using the threads backend: {_aiosqlite_error}")
+        if backend not in ('aiosqlite', 'threads'):
+            raise ValueError("Backend must be one of: auto, aiosqlite, threads")
+        if backend == 'aiosqlite' and aiosqlite is None:
+            raise ValueError(f"The aiosqlite backend can't be used: {_aiosqlite_error}") from _aiosqlite_error
+        load_models()
+        self.backend = backend
+        if backend == 'aiosqlite':
+            self.engine = create_async_engine(url.replace('sqlite:', 'sqlite+aiosqlite:', 1))
+            tune_engine(self.engine.sync_engine, profile)
+            self._executor = None
+        else:
+            self.engine = make_engine(url, profile)
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='football-db')
+
+    async def _run(self, fn, *args):
+        """Call fn(session, *args) without blocking the event loop and return its result."""
+        if self.backend == 'aiosqlite':
+            async with AsyncSession(self.engine) as session:
+                return await session.run_sync(fn, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self._call, fn, *args))
+
+    def _call(self, fn, *args):
+        with Session(bind=self.engine) as session:
+            return fn(session, *args)
+
+    async def player_profile(self, player_id):
+        """A PlayerProfile with totals, boot color and teams, or None."""
+        return await self._run(get_player_profile, player_id)
+
+    async def team_roster(self, team_id, after_id=0, limit=None):
+        """(team name, [TeamPlayer, ...]) in player id order, or None if there is no such team."""
+        return await self._run(_team_roster, team_id, after_id, limit)
+
+    async def boot_colors(self, after_id=0, limit=None):
+        """[BootColorEntry, ...] in id order."""
+        return await self._run(_boot_colors, after_id, limit)
+
+    async def leaderboard(self, metric='goals', limit=3, team_id=None, per_team=False, season=None):
+        """[LeaderboardEntry, ...], as for the top-scorers command."""
+        return await self._run(functools.partial(leaderboard, metric=metric, limit=limit, team_id=team_id,
+                                                 per_team=per_team, season=season))
+
+    async def close(self):
+        if self.backend == 'aiosqlite':
+            await self.engine.dispose()
+        else:
+            self._executor.shutdown(wait=True)
+            self.engine.dispose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
@@ -0,0 +1,74 @@
+import time
+
+from sqlalchemy import bindparam, text
+
+
+# Deleted explicitly before the players themselves, so the result is the same
+# whether or not the connection enforces the ON DELETE CASCADE foreign keys.
+DEPENDENT_TABLES = ('stats', 'boot_colors', 'player_teams', 'player_totals')
+
+
+class DeleteResult:
+    """Rows removed by a bulk player delete, per table."""
+
+    def __init__(self, counts=None, elapsed=0.0):
+        self.counts = counts or {}
+        self.elapsed = elapsed
+
+    @property
+    def players(self):
+        return self.counts.get('players', 0)
+
+    def __repr__(self):
+        return f"<DeleteResult(counts={self.counts}, elapsed={self.elapsed:.3f})>"
+
+
+def count_players(session, ids=None, where=None):
+    """Count the rows delete_players would remove, per table, without writing anything.
+
+    Lets a caller ask for confirmation under a read transaction before taking
+    the write lock.
+    """
+    if (ids is None) == (where is None):
+        raise ValueError("Give either player IDs or a where clause")
+    if where is not None:
+        chosen, params = f"SELECT id FROM players WHERE {where}", {}
+    else:
+        chosen, params = "SELECT id FROM players WHERE id IN :ids", {'ids': list(ids)}
+    counts = {}
+    for table in DEPENDENT_TABLES + ('players',):
+        column = 'id' if table == 'players' else 'player_id'
+        query = text(f"SELECT count(*) FROM {table} WHERE {column} IN ({chosen})")
+        if where is None:
+            query = query.bindparams(bindparam('ids', expanding=True))
+        counts[table] = session.execute(query, params).scalar()
+    return DeleteResult(counts)
+
+
+def delete_players(session, ids=None, where=None):
+    """Delete players chosen by id or by a SQL condition on players, with all their rows.
+
+    The matching ids are collected into a temporary table first, then each
+    dependent table and players are cleared with one statement apiece. Nothing
+    is committed; the caller decides whether to keep the result.
+    """
+    if (ids is None) == (where is None):
+        raise ValueError("Give either player IDs or a where clause")
+    start = time.perf_counter()
+    session.execute(text("DROP TABLE IF EXISTS temp.doomed_players"))
+    session.execute(text("CREATE TEMP TABLE doomed_players (id INTEGER PRIMARY KEY)"))
+    if where is not None:
+        session.execute(text(f"INSERT INTO doomed_players (id) SELECT id FROM players WHERE {where}"))
+    elif ids:
+        session.execute(text("INSERT OR IGNORE INTO doomed_players (id) VALUES (:id)"),
+                        [{'id': player_id} for player_id in ids])
+
+    counts = {}
+    for table in DEPENDENT_TABLES + ('players',):
+        column = 'id' if table == 'players' else 'player_id'
+        result = session.execute(text(
+            f"DELETE FROM {table} WHERE {column} IN (SELECT id FROM doomed_players)"
+        ))
+        counts[table] = result.rowcount
+    session.execute(text("DROP TABLE temp.doomed_players"))
+    return DeleteResult(counts, time.perf_counter() - start)
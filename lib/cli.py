@@ -1,7 +1,9 @@
+import itertools
 import os
+import shlex
 import sys
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.sql import text
+import time
+import click
 
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -9,405 +11,1016 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 
-from lib.models import Session, Player, Stat, BootColor, Team
+# Handlers import SQLAlchemy and the models themselves, so starting the CLI
+# (or running --help) doesn't load them until a command touches the database.
+from lib.models.unit_of_work import UnitOfWork, in_single_transaction, session_scope, single_transaction
 
+# Rows fetched from the database cursor at a time when streaming query results.
+SQL_FETCH_SIZE = 500
 
-def add_player_func():
+# Set by --profile / FOOTBALL_PROFILE (see lib/profiling.py).
+_profiler = None
+
+# Set by --snapshot / FOOTBALL_SNAPSHOT (see lib/snapshot.py): read commands
+# are then answered from this in-memory copy instead of the database.
+_snapshot = None
+# True when a snapshot was asked for but hasn't been loaded yet: the first
+# read loads it, so commands that only write never pay for it.
+_snapshot_pending = False
+# Set by --snapshot-file / FOOTBALL_SNAPSHOT_FILE: the snapshot is mapped
+# from this file, which is rebuilt whenever the database has changed.
+_snapshot_file = None
+
+
+class PromptInBatch(ValueError):
+    """Raised instead of prompting inside a batch, where the user can't answer
+    and waiting would hold the batch's write lock."""
+
+def _no_prompts_in_batch():
+    if in_single_transaction():
+        raise PromptInBatch("commands in a batch can't prompt; pass all arguments and --yes")
+
+def _ask(value, prompt):
+    """Returns a value given on the command line, or prompts the user for it."""
+    if value is None:
+        _no_prompts_in_batch()
+        return input(prompt)
+    return str(value)
+
+def _load_pending_snapshot():
+    """Loads the snapshot asked for at startup, if that hasn't been done yet."""
+    global _snapshot_pending
+    if _snapshot_pending:
+        _snapshot_pending = False
+        refresh_snapshot_func()
+
+def _read(query, session, *args, **kwargs):
+    """Runs a read query from lib.models, or the snapshot's method of the same name in --snapshot mode."""
+    _load_pending_snapshot()
+    if _snapshot is not None:
+        return getattr(_snapshot, query.__name__)(*args, **kwargs)
+    return query(session, *args, **kwargs)
+
+def _refuse_in_batch(command):
+    """Prints an error and returns True if command, which uses its own database
+    connection, was run inside a batch's single transaction."""
+    if in_single_transaction():
+        print(f"Error: {command} commits on its own connection and can't run inside a batch. "
+              f"Run it on its own.")
+        return True
+    return False
+
+def _report_unexpected(error):
+    """Prints an error a handler didn't expect. A database lock that outlasted
+    the busy timeout and retries (e.g. at COMMIT) gets its own message, since
+    running the command again later will work."""
+    from lib.models.database import is_lock_error
+    if is_lock_error(error):
+        print("Error: the database is busy (another process is writing to it). Try again.")
+    else:
+        print(f"An unexpected error occurred: {error}")
+
+def _confirm(session, question):
+    """Asks a yes/no question with the session's transaction ended first, so a
+    write transaction doesn't hold the database lock while the user decides."""
+    _no_prompts_in_batch()
+    session.rollback()
+    return input(f"{question} (yes/no): ").strip().lower() == 'yes'
+
+def add_player_func(name=None):
     """Adds a football player to the database."""
-    session = Session()
-    try:
-        name = input("Enter player name: ").strip()
-        player = Player(name=name) 
-        session.add(player)
-        session.commit()
-        print(f"Added player: {name}")
-    except ValueError as e:
-        print(f"Error: {e}")
-    except IntegrityError:
-        print("Error: Player with this name already exists. Please use a unique name.")
-        session.rollback()
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        session.rollback()
-    finally:
-        session.close()
+    from lib.models import Player
+    from sqlalchemy.exc import IntegrityError
+    with session_scope(write=True) as session:
+        try:
+            name = _ask(name, "Enter player name: ").strip()
+            player = Player(name=name) 
+            session.add(player)
+            session.commit()
+            print(f"Added player: {name}")
+        except ValueError as e:
+            print(f"Error: {e}")
+            return False
+        except IntegrityError:
+            print("Error: Player with this name already exists. Please use a unique name.")
+            session.rollback()
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            session.rollback()
+            return False
 
-def add_team_func():
+def add_team_func(name=None):
     """Adds a football team to the database."""
-    session = Session()
-    try:
-        name = input("Enter team name: ").strip()
-        team = Team(name=name) 
-        session.add(team)
-        session.commit()
-        print(f"Added team: {name}")
-    except ValueError as e:
-        print(f"Error: {e}")
-    except IntegrityError:
-        print("Error: Team with this name already exists. Please use a unique name.")
-        session.rollback()
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        session.rollback()
-    finally:
-        session.close()
+    from lib.models import Team
+    from sqlalchemy.exc import IntegrityError
+    with session_scope(write=True) as session:
+        try:
+            name = _ask(name, "Enter team name: ").strip()
+            team = Team(name=name) 
+            session.add(team)
+            session.commit()
+            print(f"Added team: {name}")
+        except ValueError as e:
+            print(f"Error: {e}")
+            return False
+        except IntegrityError:
+            print("Error: Team with this name already exists. Please use a unique name.")
+            session.rollback()
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            session.rollback()
+            return False
 
-def add_player_to_team_func():
+def add_player_to_team_func(player_id=None, team_id=None):
     """Adds an existing player to an existing team."""
-    session = Session()
-    try:
-        player_id = int(input("Enter player ID: "))
-        team_id = int(input("Enter team ID: "))
+    from lib.models import Player, Team
+    with session_scope(write=True) as session:
+        try:
+            player_id = int(_ask(player_id, "Enter player ID: "))
+            team_id = int(_ask(team_id, "Enter team ID: "))
 
-        player = session.query(Player).get(player_id)
-        team = session.query(Team).get(team_id)
+            player = session.query(Player).get(player_id)
+            team = session.query(Team).get(team_id)
 
-        if not player or not team:
-            print("Error: Player or team not found. Please check IDs.")
-            return
+            if not player or not team:
+                print("Error: Player or team not found. Please check IDs.")
+                return False
 
-        if team in player.teams:
-            print(f"Error: {player.name} is already in {team.name}.")
-            return
+            if team in player.teams:
+                print(f"Error: {player.name} is already in {team.name}.")
+                return False
 
-        player.teams.append(team)
-        session.commit()
-        print(f"Added {player.name} to {team.name}")
-    except ValueError:
-        print("Error: Invalid ID. Please enter a number.")
-        session.rollback()
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        session.rollback()
-    finally:
-        session.close()
-
-def add_stat_func():
-    """Adds stats for a player."""
-    session = Session()
-    try:
-        player_id = int(input("Enter player ID: "))
-        goals = int(input("Enter goals: "))
-        assists = int(input("Enter assists: "))
+            player.teams.append(team)
+            session.commit()
+            print(f"Added {player.name} to {team.name}")
+        except ValueError:
+            print("Error: Invalid ID. Please enter a number.")
+            session.rollback()
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            session.rollback()
+            return False
 
-        player = session.query(Player).get(player_id)
-        if not player:
-            print("Error: Player not found.")
-            return
+def add_stat_func(player_id=None, goals=None, assists=None, match_date=None):
+    """Adds stats for a player, optionally for a match on a given date."""
+    from lib.models import Player, Stat
+    with session_scope(write=True) as session:
+        try:
+            player_id = int(_ask(player_id, "Enter player ID: "))
+            goals = int(_ask(goals, "Enter goals: "))
+            assists = int(_ask(assists, "Enter assists: "))
 
-        stat = Stat(player_id=player_id, goals=goals, assists=assists) # Validation handled in Stat's __init__
-        session.add(stat)
-        session.commit()
-        print(f"Added stat for {player.name}: {goals} goals, {assists} assists")
-    except ValueError as e:
-        print(f"Error: {e}. Please enter non-negative numbers for goals/assists and a valid player ID.")
-        session.rollback()
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        session.rollback()
-    finally:
-        session.close()
+            player = session.query(Player).get(player_id)
+            if not player:
+                print("Error: Player not found.")
+                return False
 
-def add_boot_color_func():
+            stat = Stat(player_id=player_id, goals=goals, assists=assists, match_date=match_date) # Validation handled in Stat's __init__
+            session.add(stat)
+            session.commit()
+            when = f" on {match_date}" if match_date else ""
+            print(f"Added stat for {player.name}{when}: {goals} goals, {assists} assists")
+        except ValueError as e:
+            print(f"Error: {e}. Please enter non-negative numbers for goals/assists and a valid player ID.")
+            session.rollback()
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            session.rollback()
+            return False
+
+def add_boot_color_func(player_id=None, color=None):
     """Adds a boot color for a player."""
-    session = Session()
-    try:
-        player_id = int(input("Enter player ID: "))
+    from lib.models import Player, BootColor
+    from sqlalchemy.exc import IntegrityError
+    with session_scope(write=True) as session:
+        try:
+            player_id = int(_ask(player_id, "Enter player ID: "))
         
-        player = session.query(Player).get(player_id)
-        if not player:
-            print("Error: Player not found.")
-            return
+            player = session.query(Player).get(player_id)
+            if not player:
+                print("Error: Player not found.")
+                return False
 
-        if player.boot_color:
-            print(f"Error: {player.name} already has boot color {player.boot_color.color}.")
-            print("To change it, you would need an update feature (not implemented in this menu).")
-            return
+            if player.boot_color:
+                print(f"Error: {player.name} already has boot color {player.boot_color.color}.")
+                print("To change it, you would need an update feature (not implemented in this menu).")
+                return False
         
-        valid_colors = ["Gold", "Blue", "Red", "White", "Black"]
-        color = input(f"Enter boot color ({', '.join(valid_colors)}): ").strip()
+            valid_colors = ["Gold", "Blue", "Red", "White", "Black"]
+            color = _ask(color, f"Enter boot color ({', '.join(valid_colors)}): ").strip()
 
-        boot_color = BootColor(player_id=player_id, color=color) 
-        session.add(boot_color)
-        session.commit()
-        print(f"Added boot color {color} for {player.name}")
-    except ValueError as e:
-        print(f"Error: {e}. Please enter a valid player ID and color.")
-        session.rollback()
-    except IntegrityError:
-        print("Error: A unique boot color already exists for this player (or player ID is invalid).")
-        session.rollback()
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        session.rollback()
-    finally:
-        session.close()
+            boot_color = BootColor(player_id=player_id, color=color) 
+            session.add(boot_color)
+            session.commit()
+            print(f"Added boot color {color} for {player.name}")
+        except ValueError as e:
+            print(f"Error: {e}. Please enter a valid player ID and color.")
+            session.rollback()
+            return False
+        except IntegrityError:
+            print("Error: A unique boot color already exists for this player (or player ID is invalid).")
+            session.rollback()
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            session.rollback()
+            return False
 
-def list_player_stats_func():
+def list_player_stats_func(player_id=None):
     """Lists stats, boot color, and teams for a specific player."""
-    session = Session()
-    try:
-        player_id = int(input("Enter player ID: "))
-        player = session.query(Player).get(player_id)
-        if not player:
-            print("Error: Player not found.")
-            return
-        
-        stats = player.stats
-        total_goals = sum(s.goals for s in stats)
-        total_assists = sum(s.assists for s in stats)
-        
-        boot_color_info = player.boot_color.color if player.boot_color else "None"
-        teams = [t.name for t in player.teams] if player.teams else ["None"]
-        
-        print(f"\n--- Details for {player.name} ---")
-        print(f"  Total Goals: {total_goals}")
-        print(f"  Total Assists: {total_assists}")
-        print(f"  Boot Color: {boot_color_info}")
-        print(f"  Teams: {', '.join(teams)}")
-        print("-------------------------------")
-    except ValueError:
-        print("Error: Invalid player ID. Please enter a number.")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-    finally:
-        session.close()
+    from lib.models.queries import get_player_profile
+    with session_scope() as session:
+        try:
+            player_id = int(_ask(player_id, "Enter player ID: "))
+            profile = _read(get_player_profile, session, player_id)
+            if not profile:
+                print("Error: Player not found.")
+                return False
+
+            boot_color_info = profile.boot_color or "None"
+            teams = list(profile.teams) or ["None"]
+
+            print(f"\n--- Details for {profile.name} ---")
+            print(f"  Total Goals: {profile.goals}")
+            print(f"  Total Assists: {profile.assists}")
+            print(f"  Boot Color: {boot_color_info}")
+            print(f"  Teams: {', '.join(teams)}")
+            print("-------------------------------")
+        except ValueError:
+            print("Error: Invalid player ID. Please enter a number.")
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            return False
 
-def list_all_boot_colors_func():
+def list_all_boot_colors_func(limit=None, after_id=0):
     """Lists all player boot colors."""
-    session = Session()
-    try:
-        boot_colors = session.query(BootColor).all()
-        if not boot_colors:
-            print("No boot colors found.")
-            return
-        print("\n--- Football Player Boot Colors ---")
-        for bc in boot_colors:
-            if bc.player: 
-                print(f"  {bc.player.name}: {bc.color}")
-            else:
-                print(f"  Boot Color ID {bc.id}: {bc.color} (Player not found)")
-        print("-----------------------------------")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-    finally:
-        session.close()
+    from lib.models.queries import iter_boot_colors
+    with session_scope() as session:
+        try:
+            boot_colors = _read(iter_boot_colors, session, after_id=after_id, limit=limit)
+            first = next(boot_colors, None)
+            if first is None:
+                print("No boot colors found.")
+                return
+            print("\n--- Football Player Boot Colors ---")
+            shown = 0
+            for bc in itertools.chain([first], boot_colors):
+                if bc.player_name:
+                    print(f"  {bc.player_name}: {bc.color}")
+                else:
+                    print(f"  Boot Color ID {bc.id}: {bc.color} (Player not found)")
+                shown += 1
+            print("-----------------------------------")
+            _print_next_page_hint(limit, shown, bc.id)
+        except Exception as e:
+            _report_unexpected(e)
+            return False
 
-def list_team_players_func():
+def list_team_players_func(team_id=None, limit=None, after_id=0):
     """Lists all players in a specific team."""
-    session = Session()
+    from lib.models.queries import get_team_name, iter_team_players
+    with session_scope() as session:
+        try:
+            team_id = int(_ask(team_id, "Enter team ID: "))
+            team_name = _read(get_team_name, session, team_id)
+            if team_name is None:
+                print("Error: Team not found.")
+                return False
+            players = _read(iter_team_players, session, team_id, after_id=after_id, limit=limit)
+            first = next(players, None)
+            if first is None:
+                print(f"No players found for {team_name}.")
+                return
+            print(f"\n--- Players in {team_name} ---")
+            shown = 0
+            for player in itertools.chain([first], players):
+                print(f"  - {player.name}")
+                shown += 1
+            print("------------------------------")
+            _print_next_page_hint(limit, shown, player.id)
+        except ValueError:
+            print("Error: Invalid team ID. Please enter a number.")
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            return False
+
+LEADERBOARD_LABELS = {
+    'goals': ("Goal Scorers", "goals"),
+    'assists': ("Assist Providers", "assists"),
+    'contributions': ("Goal Contributors", "goal contributions"),
+}
+
+def show_top_scorers_func(metric='goals', limit=3, team_id=None, per_team=False, season=None):
+    """Lists the top players by goals, assists or goal contributions, overall or per team."""
+    from lib.models.leaderboard import leaderboard
+    from lib.models.stat import season_label
+    with session_scope() as session:
+        try:
+            entries = _read(leaderboard, session, metric=metric, limit=limit, team_id=team_id, per_team=per_team,
+                            season=season)
+            if not entries:
+                print("No top scorers found.")
+                return
+            title, unit = LEADERBOARD_LABELS[metric]
+            if season is not None:
+                title += f" of {season_label(season)}"
+            print(f"\n--- Top {limit} {title} ---")
+            team_name = None
+            for entry in entries:
+                if entry.team_name is not None and entry.team_name != team_name:
+                    team_name = entry.team_name
+                    print(f"  [{team_name}]")
+                indent = "    " if team_name else "  "
+                print(f"{indent}{entry.rank}. {entry.name}: {entry.value} {unit}")
+            print("--------------------------")
+        except ValueError as e:
+            print(f"Error: {e}")
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            return False
+
+def show_leaderboard_func():
+    """Prompts for a leaderboard metric, size and team, then shows it."""
+    metric = input(f"Metric ({', '.join(LEADERBOARD_LABELS)}) [goals]: ").strip() or 'goals'
+    limit = input("How many players [3]: ").strip() or '3'
+    team = input("Team ID (blank for overall, 'all' for every team): ").strip().lower()
     try:
-        team_id = int(input("Enter team ID: "))
-        team = session.query(Team).get(team_id)
-        if not team:
-            print("Error: Team not found.")
-            return
-        players = [p.name for p in team.players]
-        if not players:
-            print(f"No players found for {team.name}.")
-            return
-        print(f"\n--- Players in {team.name} ---")
-        for player_name in players:
-            print(f"  - {player_name}")
-        print("------------------------------")
+        limit = int(limit)
+        team_id = int(team) if team and team != 'all' else None
     except ValueError:
-        print("Error: Invalid team ID. Please enter a number.")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-    finally:
-        session.close()
+        print("Error: Invalid number. Please enter a number.")
+        return False
+    show_top_scorers_func(metric, limit, team_id, per_team=(team == 'all'))
+
+def list_player_seasons_func(player_id=None, archive=None):
+    """Lists a player's totals per season, including archived seasons if an archive file is given."""
+    from lib.models.queries import get_player_name
+    from lib.models.season import archived_player_seasons, player_seasons
+    from lib.models.stat import season_label
+    with session_scope() as session:
+        try:
+            player_id = int(_ask(player_id, "Enter player ID: "))
+            name = _read(get_player_name, session, player_id)
+            if name is None:
+                print("Error: Player not found.")
+                return False
+            seasons = _read(player_seasons, session, player_id)
+            if archive:
+                seasons = sorted(archived_player_seasons(archive, player_id) + seasons)
+            if not seasons:
+                print(f"No dated stats found for {name}.")
+                return
+            print(f"\n--- {name} by Season ---")
+            for row in seasons:
+                print(f"  {season_label(row.season)}: {row.goals} goals, {row.assists} assists "
+                      f"in {row.appearances} matches")
+            print("-------------------------------")
+        except ValueError:
+            print("Error: Invalid ID. Please enter a number.")
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            return False
+
+def list_stats_between_func(start, end, player_id=None, limit=10):
+    """Lists goal and assist totals for matches between two dates, top scorers first."""
+    from lib.models.season import totals_between
+    with session_scope() as session:
+        try:
+            if start > end:
+                raise ValueError("Start date must not be after end date")
+            rows = _read(totals_between, session, start, end, player_id=player_id, limit=limit)
+            if not rows:
+                print(f"No stats recorded between {start} and {end}.")
+                return
+            print(f"\n--- Stats from {start} to {end} ---")
+            for row in rows:
+                print(f"  {row.name} (ID: {row.player_id}): {row.goals} goals, {row.assists} assists "
+                      f"in {row.appearances} matches")
+            print("----------------------------------")
+        except ValueError as e:
+            print(f"Error: {e}")
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            return False
 
-def show_top_scorers_func():
-    """Lists the top 3 goal scorers."""
-    session = Session()
+def archive_season_func(season, path):
+    """Moves a closed season's stats into an archive database file."""
+    from lib.models import Session
+    from lib.models.season import archive_season
+    from lib.models.stat import season_label
+    if _refuse_in_batch('archive-season'):
+        return False
     try:
-        from sqlalchemy.sql import func
-        top_scorers_data = (
-            session.query(Player.name, func.sum(Stat.goals).label('total_goals'))
-            .join(Stat)
-            .group_by(Player.id)
-            .order_by(func.sum(Stat.goals).desc())
-            .limit(3)
-            .all()
-        )
-        if not top_scorers_data:
-            print("No top scorers found.")
-            return
-        print("\n--- Top 3 Goal Scorers ---")
-        for name, goals in top_scorers_data:
-            print(f"  {name}: {goals} goals")
-        print("--------------------------")
+        moved = archive_season(Session.kw['bind'], season, path)
+        print(f"Archived {moved} stats from {season_label(season)} to {path}")
+    except ValueError as e:
+        print(f"Error: {e}")
+        return False
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-    finally:
-        session.close()
+        _report_unexpected(e)
+        return False
 
-def run_custom_sql_func():
-    """Runs a custom SQL query."""
-    session = Session()
+def search_func(query=None, kind=None, limit=10):
+    """Finds players and teams by name, so their IDs can be used with other commands."""
+    from lib.models.search import search_names
+    with session_scope() as session:
+        try:
+            query = _ask(query, "Search for a player or team name: ")
+            results = _read(search_names, session, query, kind=kind, limit=limit)
+            if not results:
+                print(f"No players or teams match '{query}'.")
+                return
+            print(f"\n--- Search Results for '{query}' ---")
+            for result in results:
+                note = " (close match)" if result.match == 'fuzzy' else ""
+                print(f"  {result.kind.title()} ID {result.id}: {result.name}{note}")
+            print("----------------------------------")
+        except ValueError as e:
+            print(f"Error: {e}")
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            return False
+
+def show_cache_stats_func():
+    """Shows the read cache's size and hit/miss/eviction counters."""
+    from lib.models.cache import query_cache
+    stats = query_cache.stats()
+    print("\n--- Query Cache ---")
+    print(f"  Entries: {stats['size']} of {stats['maxsize']}")
+    print(f"  Hits: {stats['hits']}")
+    print(f"  Misses: {stats['misses']}")
+    print(f"  Evictions: {stats['evictions']}")
+    print(f"  Invalidations: {stats['invalidations']}")
+    print("-------------------")
+
+def refresh_snapshot_func():
+    """Loads the dataset into memory, replacing any snapshot already loaded, and answers reads from it.
+
+    With a snapshot file, the file is mapped instead, after rebuilding it if the database has changed.
+    """
+    global _snapshot
     try:
-        query = input("Enter SQL query: ").strip()
-        result = session.execute(text(query)).fetchall()
-        if not result:
-            print("Query returned no results.")
-            return
-        
-        print("\n--- SQL Query Results ---")
-        if hasattr(result[0], '_fields'):
-            print(" | ".join(str(f) for f in result[0]._fields))
-            print("-" * (sum(len(str(f)) for f in result[0]._fields) + (len(result[0]._fields) - 1) * 3))
-        
-        for row in result:
-            print(" | ".join(str(col) for col in row))
-        print("-------------------------")
+        from lib.snapshot import Snapshot, open_snapshot
+    except ImportError:
+        print("Error: snapshots need numpy (pip install numpy).")
+        return False
+    from lib.models import Session
+    try:
+        if _snapshot_file:
+            _snapshot = None
+            start = time.perf_counter()
+            _snapshot, rebuilt = open_snapshot(_snapshot_file, Session.kw['bind'])
+            how = f"rebuilt in {time.perf_counter() - start:.2f}s" if rebuilt else "up to date"
+            source = f"mapped from {_snapshot_file} ({how})"
+        else:
+            _snapshot = Snapshot.load(Session.kw['bind'])
+            source = f"loaded in {_snapshot.load_time:.2f}s"
+        rows = _snapshot.row_counts()
+        total = sum(_snapshot.memory_usage().values())
+        print(f"Snapshot {source}: {rows['players']} players, {rows['teams']} teams, "
+              f"{rows['stats']} stats in {total / 2 ** 20:.1f} MiB")
+    except ValueError as e:
+        print(f"Error: {e}")
+        return False
     except Exception as e:
-        print(f"Error executing SQL: {e}")
-    finally:
-        session.close()
+        _report_unexpected(e)
+        return False
 
-def delete_player_func():
-    """Deletes a player from the database by ID."""
-    session = Session()
+def save_snapshot_func(path):
+    """Writes the dataset to a snapshot file that --snapshot-file maps at startup."""
     try:
-        player_id = int(input("Enter player ID to delete: "))
-        player = session.query(Player).get(player_id)
+        from lib.snapshot import Snapshot
+    except ImportError:
+        print("Error: snapshots need numpy (pip install numpy).")
+        return False
+    from lib.models import Session
+    from lib.reports import database_path
+    try:
+        engine = Session.kw['bind']
+        start = time.perf_counter()
+        snapshot = Snapshot.load(engine)
+        snapshot.save(path, os.path.abspath(database_path(engine)))
+        print(f"Snapshot of change {snapshot.change} written to {path} "
+              f"({os.path.getsize(path) / 2 ** 20:.1f} MiB) in {time.perf_counter() - start:.2f}s")
+    except ValueError as e:
+        print(f"Error: {e}")
+        return False
+    except Exception as e:
+        _report_unexpected(e)
+        return False
 
-        if not player:
-            print("Error: Player not found.")
-            return
+def show_snapshot_stats_func():
+    """Shows the rows and memory held by each part of the in-memory snapshot."""
+    _load_pending_snapshot()
+    if _snapshot is None:
+        print("No snapshot loaded. Start with --snapshot or run snapshot-refresh.")
+        return
+    from lib.models import Session
+    rows = _snapshot.row_counts()
+    usage = _snapshot.memory_usage()
+    print("\n--- Snapshot Memory ---")
+    for part, size in usage.items():
+        count = f" ({rows[part]} rows)" if part in rows else ""
+        print(f"  {part}: {size / 1024:.1f} KiB{count}")
+    print(f"  Total: {sum(usage.values()) / 2 ** 20:.2f} MiB")
+    if rows['stats']:
+        print(f"  Per stat row: {usage['stats'] / rows['stats']:.1f} bytes")
+    if _snapshot.path:
+        print(f"  Mapped from: {_snapshot.path} in {_snapshot.load_time * 1000:.2f} ms (change {_snapshot.change})")
+    else:
+        print(f"  Loaded in: {_snapshot.load_time:.2f}s (change {_snapshot.change})")
+    if _snapshot.is_stale(Session.kw['bind']):
+        print("  The database has changed since; run snapshot-refresh to reload it.")
+    print("-----------------------")
 
-        confirm = input(f"Are you sure you want to delete player '{player.name}' (ID: {player.id}) and all associated data (stats, boot color, team associations)? (yes/no): ").strip().lower()
-        if confirm == 'yes':
+def _warn_if_snapshot_stale():
+    """Tells the menu user when writes have made the snapshot out of date."""
+    from lib.models import Session
+    if _snapshot is not None and _snapshot.is_stale(Session.kw['bind']):
+        print("Note: the database has changed since the snapshot was loaded. Choose 19 to refresh it.")
 
-            player.teams.clear() # This removes associations in the player_teams table
+def _print_next_page_hint(limit, shown, last_id):
+    """Tells the user how to fetch the next page of a listing cut off at --limit."""
+    if limit is not None and shown == limit:
+        print(f"Showing {shown} rows. Run again with --after {last_id} for the next page.")
 
-            session.delete(player)
-            session.commit()
-            print(f"Deleted player: {player.name}")
-        else:
-            print("Player deletion cancelled.")
-    except ValueError:
-        print("Error: Invalid ID. Please enter a number.")
-        session.rollback()
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        session.rollback()
-    finally:
-        session.close()
+def _sql_result_lines(fields, rows):
+    """Yields the formatted lines of a query result one at a time."""
+    yield "\n--- SQL Query Results ---"
+    yield " | ".join(str(f) for f in fields)
+    yield "-" * (sum(len(str(f)) for f in fields) + (len(fields) - 1) * 3)
+    for row in rows:
+        yield " | ".join(str(col) for col in row)
+    yield "-------------------------"
 
-def delete_team_func():
-    """Deletes a team from the database by ID."""
-    session = Session()
-    try:
-        team_id = int(input("Enter team ID to delete: "))
-        team = session.query(Team).get(team_id)
+def run_custom_sql_func(query=None, limit=None, offset=0, pager=False):
+    """Runs a custom SQL query, streaming rows instead of loading them all first."""
+    from sqlalchemy.sql import text
+    with session_scope() as session:
+        try:
+            query = _ask(query, "Enter SQL query: ").strip()
+            result = session.execute(text(query))
+            if not result.returns_rows:
+                print("Query returned no results.")
+                return
+            stop = None if limit is None else offset + limit
+            rows = itertools.islice(result.yield_per(SQL_FETCH_SIZE), offset, stop)
+            first = next(rows, None)
+            if first is None:
+                print("Query returned no results.")
+                return
 
-        if not team:
-            print("Error: Team not found.")
-            return
+            lines = _sql_result_lines(list(result.keys()), itertools.chain([first], rows))
+            if pager:
+                click.echo_via_pager(line + "\n" for line in lines)
+            else:
+                for line in lines:
+                    print(line)
+        except Exception as e:
+            print(f"Error executing SQL: {e}")
+            return False
+
+def delete_player_func(player_id=None, confirm=False):
+    """Deletes a player from the database by ID."""
+    from lib.models import Player
+    with session_scope(write=True) as session:
+        try:
+            player_id = int(_ask(player_id, "Enter player ID to delete: "))
+            player = session.query(Player).get(player_id)
 
-        confirm = input(f"Are you sure you want to delete team '{team.name}' (ID: {team.id}) and all its player associations? (yes/no): ").strip().lower()
-        if confirm == 'yes':
-            # Remove all players from this team's association
-            team.players.clear() # This removes associations in the player_teams table
+            if not player:
+                print("Error: Player not found.")
+                return False
 
-            session.delete(team)
+            if not confirm:
+                confirm = _confirm(session, f"Are you sure you want to delete player '{player.name}' (ID: {player.id}) and all associated data (stats, boot color, team associations)?")
+            if confirm:
+                from lib.bulk_delete import delete_players
+                name = player.name
+                delete_players(session, ids=[player_id])
+                session.commit()
+                print(f"Deleted player: {name}")
+            else:
+                print("Player deletion cancelled.")
+        except PromptInBatch as e:
+            print(f"Error: {e}")
+            return False
+        except ValueError:
+            print("Error: Invalid ID. Please enter a number.")
+            session.rollback()
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            session.rollback()
+            return False
+
+def delete_players_func(ids=None, where=None, confirm=False):
+    """Deletes many players, and their stats, boot colors and team associations, in one transaction."""
+    from lib.bulk_delete import count_players, delete_players
+    if not confirm:
+        # Count and ask under a read transaction, so the write lock isn't held while the user decides.
+        with session_scope() as session:
+            try:
+                matched = count_players(session, ids=ids, where=where)
+                if not matched.players:
+                    print("No matching players found.")
+                    return
+                dependents = ", ".join(f"{n} {table}" for table, n in matched.counts.items() if table != 'players')
+                confirm = _confirm(session, f"Delete {matched.players} players ({dependents})?")
+            except ValueError as e:
+                print(f"Error: {e}")
+                return False
+            except Exception as e:
+                _report_unexpected(e)
+                return False
+        if not confirm:
+            print("Player deletion cancelled.")
+            return
+    with session_scope(write=True) as session:
+        try:
+            result = delete_players(session, ids=ids, where=where)
+            if not result.players:
+                session.rollback()
+                print("No matching players found.")
+                return
             session.commit()
-            print(f"Deleted team: {team.name}")
-        else:
-            print("Team deletion cancelled.")
-    except ValueError:
-        print("Error: Invalid ID. Please enter a number.")
-        session.rollback()
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        session.rollback()
-    finally:
-        session.close()
+            dependents = ", ".join(f"{n} {table}" for table, n in result.counts.items() if table != 'players')
+            print(f"Deleted {result.players} players ({dependents}) in {result.elapsed:.2f}s")
+        except ValueError as e:
+            print(f"Error: {e}")
+            session.rollback()
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            session.rollback()
+            return False
+
+def delete_team_func(team_id=None, confirm=False):
+    """Deletes a team from the database by ID."""
+    from lib.models import Team, player_teams
+    with session_scope(write=True) as session:
+        try:
+            team_id = int(_ask(team_id, "Enter team ID to delete: "))
+            team = session.query(Team).get(team_id)
+
+            if not team:
+                print("Error: Team not found.")
+                return False
+
+            if not confirm:
+                confirm = _confirm(session, f"Are you sure you want to delete team '{team.name}' (ID: {team.id}) and all its player associations?")
+            if confirm:
+                # Remove all of the team's associations in one statement
+                # rather than loading its roster.
+                session.execute(player_teams.delete().where(player_teams.c.team_id == team.id))
+                session.delete(team)
+                session.commit()
+                print(f"Deleted team: {team.name}")
+            else:
+                print("Team deletion cancelled.")
+        except PromptInBatch as e:
+            print(f"Error: {e}")
+            return False
+        except ValueError:
+            print("Error: Invalid ID. Please enter a number.")
+            session.rollback()
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            session.rollback()
+            return False
 
-def delete_stat_func():
+def delete_stat_func(stat_id=None, confirm=False):
     """Deletes a player's stat entry by ID."""
-    session = Session()
-    try:
-        stat_id = int(input("Enter stat ID to delete: "))
-        stat = session.query(Stat).get(stat_id)
+    from lib.models import Stat
+    with session_scope(write=True) as session:
+        try:
+            stat_id = int(_ask(stat_id, "Enter stat ID to delete: "))
+            stat = session.query(Stat).get(stat_id)
 
-        if not stat:
-            print("Error: Stat entry not found.")
-            return
+            if not stat:
+                print("Error: Stat entry not found.")
+                return False
 
-        confirm = input(f"Are you sure you want to delete stat entry for player ID {stat.player_id} (Goals: {stat.goals}, Assists: {stat.assists})? (yes/no): ").strip().lower()
-        if confirm == 'yes':
-            session.delete(stat)
-            session.commit()
-            print(f"Deleted stat entry with ID: {stat_id}")
-        else:
-            print("Stat deletion cancelled.")
-    except ValueError:
-        print("Error: Invalid ID. Please enter a number.")
-        session.rollback()
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        session.rollback()
-    finally:
-        session.close()
+            if not confirm:
+                confirm = _confirm(session, f"Are you sure you want to delete stat entry for player ID {stat.player_id} (Goals: {stat.goals}, Assists: {stat.assists})?")
+            if confirm:
+                session.delete(stat)
+                session.commit()
+                print(f"Deleted stat entry with ID: {stat_id}")
+            else:
+                print("Stat deletion cancelled.")
+        except PromptInBatch as e:
+            print(f"Error: {e}")
+            return False
+        except ValueError:
+            print("Error: Invalid ID. Please enter a number.")
+            session.rollback()
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            session.rollback()
+            return False
 
-def delete_boot_color_func():
+def delete_boot_color_func(player_id=None, confirm=False):
     """Deletes a player's boot color by player ID."""
-    session = Session()
-    try:
-        player_id = int(input("Enter player ID whose boot color you want to delete: "))
-        boot_color = session.query(BootColor).filter_by(player_id=player_id).first()
+    from lib.models import BootColor
+    with session_scope(write=True) as session:
+        try:
+            player_id = int(_ask(player_id, "Enter player ID whose boot color you want to delete: "))
+            boot_color = session.query(BootColor).filter_by(player_id=player_id).first()
 
-        if not boot_color:
-            print(f"Error: No boot color found for player ID {player_id}.")
-            return
+            if not boot_color:
+                print(f"Error: No boot color found for player ID {player_id}.")
+                return False
+
+            if not confirm:
+                confirm = _confirm(session, f"Are you sure you want to delete boot color '{boot_color.color}' for player ID {player_id}?")
+            if confirm:
+                session.delete(boot_color)
+                session.commit()
+                print(f"Deleted boot color for player ID: {player_id}")
+            else:
+                print("Boot color deletion cancelled.")
+        except PromptInBatch as e:
+            print(f"Error: {e}")
+            return False
+        except ValueError:
+            print("Error: Invalid ID. Please enter a number.")
+            session.rollback()
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            session.rollback()
+            return False
 
-        confirm = input(f"Are you sure you want to delete boot color '{boot_color.color}' for player ID {player_id}? (yes/no): ").strip().lower()
-        if confirm == 'yes':
-            session.delete(boot_color)
+def remove_player_from_team_func(player_id=None, team_id=None):
+    """Removes a player from a specific team."""
+    from lib.models import Player, Team
+    with session_scope(write=True) as session:
+        try:
+            player_id = int(_ask(player_id, "Enter player ID to remove from a team: "))
+            team_id = int(_ask(team_id, "Enter team ID to remove the player from: "))
+
+            player = session.query(Player).get(player_id)
+            team = session.query(Team).get(team_id)
+
+            if not player or not team:
+                print("Error: Player or team not found. Please check IDs.")
+                return False
+
+            if team not in player.teams:
+                print(f"Error: {player.name} is not currently in {team.name}.")
+                return False
+
+            player.teams.remove(team)
             session.commit()
-            print(f"Deleted boot color for player ID: {player_id}")
-        else:
-            print("Boot color deletion cancelled.")
-    except ValueError:
-        print("Error: Invalid ID. Please enter a number.")
-        session.rollback()
+            print(f"Removed {player.name} from {team.name}")
+        except ValueError:
+            print("Error: Invalid ID. Please enter a number.")
+            session.rollback()
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            session.rollback()
+            return False
+
+def import_stats_func(path, batch_size=1000):
+    """Bulk imports stats from a CSV or JSONL file."""
+    from lib.importer import import_stats
+    with session_scope(write=True) as session:
+        try:
+            result = import_stats(session, path, batch_size=batch_size)
+            print(f"Imported {result.inserted} stats ({result.rejected} rejected) "
+                  f"in {result.elapsed:.2f}s ({result.rows_per_sec:.0f} rows/sec)")
+        except ValueError as e:
+            print(f"Error: {e}")
+            session.rollback()
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            session.rollback()
+            return False
+
+def assign_roster_func(path):
+    """Adds players to teams from a file of (player_id, team_id) pairs in one transaction."""
+    from lib.rosters import assign_roster, read_pairs
+    with session_scope(write=True) as session:
+        try:
+            pairs, invalid = read_pairs(path)
+            result = assign_roster(session, pairs)
+            session.commit()
+            print(f"Assigned {result.added} players to teams ({result.skipped} already on the team, "
+                  f"{result.rejected + invalid} rejected) in {result.elapsed:.2f}s")
+        except ValueError as e:
+            print(f"Error: {e}")
+            session.rollback()
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            session.rollback()
+            return False
+
+def transfer_func(path):
+    """Moves players to new teams from a file of (player_id, team_id[, from_team_id]) rows in one transaction."""
+    from lib.rosters import read_pairs, transfer_players
+    with session_scope(write=True) as session:
+        try:
+            pairs, invalid = read_pairs(path)
+            result = transfer_players(session, pairs)
+            session.commit()
+            print(f"Transferred players: {result.added} joined a team, {result.removed} left one "
+                  f"({result.skipped} already on the team, {result.rejected + invalid} rejected) "
+                  f"in {result.elapsed:.2f}s")
+        except ValueError as e:
+            print(f"Error: {e}")
+            session.rollback()
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            session.rollback()
+            return False
+
+def export_func(out_dir, fmt='auto', incremental=False, chunk_size=50000, prune=False):
+    """Exports the tables to columnar files, optionally only what changed since the last export."""
+    from lib.exporter import export_tables
+    from lib.models import Session
+    if _refuse_in_batch('export'):
+        return False
+    try:
+        result = export_tables(Session.kw['bind'], out_dir, fmt=fmt, incremental=incremental,
+                               chunk_size=chunk_size, prune=prune)
+        if result.incremental and not result.rows:
+            print(f"No changes since the last export (change {result.since}).")
+            return
+        kind = f"Changes {result.since}-{result.upto}" if result.incremental else "Full export"
+        print(f"{kind} written to {result.path} as {result.format} in {result.elapsed:.2f}s")
+        for table, rows in result.rows.items():
+            deleted = f", {result.deleted[table]} deleted" if result.incremental else ""
+            print(f"  {table}: {rows} rows{deleted}")
+    except ValueError as e:
+        print(f"Error: {e}")
+        return False
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        session.rollback()
-    finally:
-        session.close()
+        _report_unexpected(e)
+        return False
 
-def remove_player_from_team_func():
-    """Removes a player from a specific team."""
-    session = Session()
+PLAYER_ANALYTICS_METRICS = ('goals_per_match', 'assists_per_match', 'contributions_per_match', 'goals', 'matches')
+TEAM_ANALYTICS_METRICS = ('goals', 'mean', 'std', 'top_share')
+
+def player_analytics_func(metric='goals_per_match', limit=10, min_matches=1, season=None):
+    """Ranks players by per-match averages computed over every stat row, with goal percentiles."""
     try:
-        player_id = int(input("Enter player ID to remove from a team: "))
-        team_id = int(input("Enter team ID to remove the player from: "))
+        from lib import analytics
+    except ImportError:
+        print("Error: player-analytics needs numpy (pip install numpy).")
+        return False
+    from lib.models import Session
+    from lib.models.queries import player_names
+    from lib.models.stat import season_label
+    with session_scope() as session:
+        try:
+            if metric not in PLAYER_ANALYTICS_METRICS:
+                raise ValueError(f"Metric must be one of: {', '.join(PLAYER_ANALYTICS_METRICS)}")
+            result = analytics.player_analytics(analytics.load_stats(Session.kw['bind'], season), min_matches)
+            rows = analytics.top(result, metric, limit)
+            if not len(rows):
+                print("No stats found.")
+                return
+            ids = [int(result.player_id[i]) for i in rows]
+            names = player_names(session, ids)
+            title = f" in {season_label(season)}" if season is not None else ""
+            print(f"\n--- Player Analytics by {metric.replace('_', ' ')}{title} "
+                  f"({len(result.player_id)} players, {min_matches}+ matches) ---")
+            for rank, (i, player_id) in enumerate(zip(rows, ids), 1):
+                print(f"  {rank}. {names.get(player_id, '?')} (ID: {player_id}): "
+                      f"{result.matches[i]} matches, {result.goals[i]} goals, {result.assists[i]} assists | "
+                      f"per match {result.goals_per_match[i]:.2f} G, {result.assists_per_match[i]:.2f} A, "
+                      f"{result.contributions_per_match[i]:.2f} G+A | "
+                      f"goals median {result.goals_p50[i]:g}, 90th pct {result.goals_p90[i]:g}")
+            print("--------------------------------")
+        except ValueError as e:
+            print(f"Error: {e}")
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            return False
 
-        player = session.query(Player).get(player_id)
-        team = session.query(Team).get(team_id)
+def team_analytics_func(metric='goals', limit=10):
+    """Shows how each team's goals are distributed across its players."""
+    try:
+        from lib import analytics
+    except ImportError:
+        print("Error: team-analytics needs numpy (pip install numpy).")
+        return False
+    from lib.models import Session
+    from lib.models.queries import team_names
+    with session_scope() as session:
+        try:
+            if metric not in TEAM_ANALYTICS_METRICS:
+                raise ValueError(f"Metric must be one of: {', '.join(TEAM_ANALYTICS_METRICS)}")
+            engine = Session.kw['bind']
+            result = analytics.team_analytics(analytics.load_stats(engine), analytics.load_memberships(engine))
+            rows = analytics.top(result, metric, limit)
+            if not len(rows):
+                print("No teams with players found.")
+                return
+            ids = [int(result.team_id[i]) for i in rows]
+            names = team_names(session, ids)
+            print(f"\n--- Team Goal Distribution by {metric.replace('_', ' ')} ---")
+            for rank, (i, team_id) in enumerate(zip(rows, ids), 1):
+                print(f"  {rank}. {names.get(team_id, '?')} (ID: {team_id}): "
+                      f"{result.goals[i]} goals from {result.players[i]} players | "
+                      f"mean {result.mean[i]:.1f}, std {result.std[i]:.1f}, best {result.max[i]} "
+                      f"({result.top_share[i]:.0%} of the team's goals)")
+            print("--------------------------------")
+        except ValueError as e:
+            print(f"Error: {e}")
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            return False
 
-        if not player or not team:
-            print("Error: Player or team not found. Please check IDs.")
-            return
+TEAM_REPORT_ORDERS = ('goals', 'assists', 'matches', 'players', 'mean', 'std')
 
-        if team not in player.teams:
-            print(f"Error: {player.name} is not currently in {team.name}.")
-            return
+def team_report_func(order='goals', limit=10, workers=None, season=None):
+    """Shows per-team totals and goal spread, read by a pool of worker processes over player id ranges."""
+    from lib.models import Session
+    from lib.models.queries import team_names
+    from lib.models.stat import season_label
+    from lib.reports import database_path, team_report
+    with session_scope() as session:
+        try:
+            if order not in TEAM_REPORT_ORDERS:
+                raise ValueError(f"Order must be one of: {', '.join(TEAM_REPORT_ORDERS)}")
+            result = team_report(database_path(Session.kw['bind']), workers, season)
+            teams = sorted(result.teams, key=lambda team: (-getattr(team, order), team.team_id))[:limit]
+            if not teams:
+                print("No teams with players found.")
+                return
+            names = team_names(session, [team.team_id for team in teams])
+            title = f" in {season_label(season)}" if season is not None else ""
+            print(f"\n--- Team Report by {order}{title} ({len(result.teams)} teams, "
+                  f"{result.ranges} ranges on {result.workers} workers, {result.elapsed:.2f}s) ---")
+            for rank, team in enumerate(teams, 1):
+                print(f"  {rank}. {names.get(team.team_id, '?')} (ID: {team.team_id}): "
+                      f"{team.players} players, {team.matches} matches, {team.goals} goals, {team.assists} assists | "
+                      f"goals per player mean {team.mean:.1f}, std {team.std:.1f}, min {team.min}, max {team.max}")
+            print("--------------------------------")
+        except ValueError as e:
+            print(f"Error: {e}")
+            return False
+        except Exception as e:
+            _report_unexpected(e)
+            return False
 
-        player.teams.remove(team)
-        session.commit()
-        print(f"Removed {player.name} from {team.name}")
-    except ValueError:
-        print("Error: Invalid ID. Please enter a number.")
-        session.rollback()
+def run_batch_func(lines):
+    """Runs CLI commands, one per line, inside a single transaction.
+
+    A command that fails has its own savepoint rolled back and the rest of the
+    batch carries on; the failed lines are listed when the batch commits.
+    """
+    executed = 0
+    failed = []
+    start = time.perf_counter()
+    try:
+        with single_transaction():
+            for number, line in enumerate(lines, 1):
+                try:
+                    args = shlex.split(line, comments=True)
+                    if not args:
+                        continue
+                    if args[0] == 'batch':
+                        raise click.UsageError("batch files cannot run other batch files")
+                    # Group options alone (e.g. --profile) would start the interactive menu.
+                    if args[0] not in cli.commands:
+                        raise click.UsageError(f"each line must start with a command, not '{args[0]}'")
+                    if cli.main(args=args, prog_name='batch', standalone_mode=False):
+                        raise click.ClickException(f"'{line.strip()}' failed")
+                    executed += 1
+                except (click.ClickException, ValueError) as e:
+                    message = e.format_message() if isinstance(e, click.ClickException) else str(e)
+                    print(f"Error on line {number}: {message}")
+                    failed.append(number)
+        lines_failed = f" (line{'s' if len(failed) > 1 else ''} {', '.join(map(str, failed))})" if failed else ""
+        print(f"Batch committed: {executed} commands run, {len(failed)} failed{lines_failed} "
+              f"in {time.perf_counter() - start:.2f}s")
+        if failed:
+            return False
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        session.rollback()
-    finally:
-        session.close()
+        _report_unexpected(e)
+        print("The batch was rolled back.")
+        return False
 
 # --- Main Menu Loop ---
 
@@ -415,68 +1028,361 @@ def remove_player_from_team_func():
 
 def display_main_menu():
     """Displays the interactive menu and handles user choices."""
-    while True:
-        print("\n--- Football Player Stats CLI Menu ---")
-        print("1. Add Player")
-        print("2. Add Team")
-        print("3. Add Player to Team")
-        print("4. Add Player Stats")
-        print("5. Add Player Boot Color")
-        print("6. List Player Stats (by ID)")
-        print("7. List Players in Team (by ID)")
-        print("8. List All Boot Colors")
-        print("9. Show Top Scorers")
-        # print("10. Run Custom SQL Query")
-        print("--- Delete Options ---") # New section for clarity
-        print("11. Delete Player (by ID)")
-        print("12. Delete Team (by ID)")
-        print("13. Delete Stat Entry (by ID)")
-        print("14. Delete Boot Color (by Player ID)")
-        print("15. Remove Player From Team") # New option for many-to-many relationship
-        print("0. Exit")
-        print("------------------------------------")
-
-        choice = input("Enter your choice: ").strip()
-
-        if choice == '1':
-            add_player_func()
-        elif choice == '2':
-            add_team_func()
-        elif choice == '3':
-            add_player_to_team_func()
-        elif choice == '4':
-            add_stat_func()
-        elif choice == '5':
-            add_boot_color_func()
-        elif choice == '6':
-            list_player_stats_func()
-        elif choice == '7':
-            list_team_players_func()
-        elif choice == '8':
-            list_all_boot_colors_func()
-        elif choice == '9':
-            show_top_scorers_func()
-        elif choice == '10':
-            run_custom_sql_func()
-        elif choice == '11': # New case for deleting player
-            delete_player_func()
-        elif choice == '12': # New case for deleting team
-            delete_team_func()
-        elif choice == '13': # New case for deleting stat
-            delete_stat_func()
-        elif choice == '14': # New case for deleting boot color
-            delete_boot_color_func()
-        elif choice == '15': # New case for removing player from team
-            remove_player_from_team_func()
-        elif choice == '0':
-            print("Exiting CLI. Goodbye!")
-            break
-        else:
-            print("Invalid choice. Please try again.")
+    with UnitOfWork():
+        while True:
+            print("\n--- Football Player Stats CLI Menu ---")
+            print("1. Add Player")
+            print("2. Add Team")
+            print("3. Add Player to Team")
+            print("4. Add Player Stats")
+            print("5. Add Player Boot Color")
+            print("6. List Player Stats (by ID)")
+            print("7. List Players in Team (by ID)")
+            print("8. List All Boot Colors")
+            print("9. Show Top Scorers")
+            print("16. Show Leaderboard (goals, assists, contributions; per team)")
+            print("17. Show Cache Statistics")
+            print("18. Search Players and Teams (by name)")
+            print("19. Load / Refresh In-Memory Snapshot")
+            print("20. Show Snapshot Memory Usage")
+            # print("10. Run Custom SQL Query")
+            print("--- Delete Options ---") # New section for clarity
+            print("11. Delete Player (by ID)")
+            print("12. Delete Team (by ID)")
+            print("13. Delete Stat Entry (by ID)")
+            print("14. Delete Boot Color (by Player ID)")
+            print("15. Remove Player From Team") # New option for many-to-many relationship
+            print("0. Exit")
+            print("------------------------------------")
+
+            choice = input("Enter your choice: ").strip()
+
+            if choice == '1':
+                add_player_func()
+            elif choice == '2':
+                add_team_func()
+            elif choice == '3':
+                add_player_to_team_func()
+            elif choice == '4':
+                add_stat_func()
+            elif choice == '5':
+                add_boot_color_func()
+            elif choice == '6':
+                list_player_stats_func()
+            elif choice == '7':
+                list_team_players_func()
+            elif choice == '8':
+                list_all_boot_colors_func()
+            elif choice == '9':
+                show_top_scorers_func()
+            elif choice == '10':
+                run_custom_sql_func()
+            elif choice == '11': # New case for deleting player
+                delete_player_func()
+            elif choice == '12': # New case for deleting team
+                delete_team_func()
+            elif choice == '13': # New case for deleting stat
+                delete_stat_func()
+            elif choice == '14': # New case for deleting boot color
+                delete_boot_color_func()
+            elif choice == '15': # New case for removing player from team
+                remove_player_from_team_func()
+            elif choice == '16':
+                show_leaderboard_func()
+            elif choice == '17':
+                show_cache_stats_func()
+            elif choice == '18':
+                search_func()
+            elif choice == '19':
+                refresh_snapshot_func()
+            elif choice == '20':
+                show_snapshot_stats_func()
+            elif choice == '0':
+                print("Exiting CLI. Goodbye!")
+                break
+            else:
+                print("Invalid choice. Please try again.")
+            _warn_if_snapshot_stale()
+
+# --- Command Line Interface ---
+
+@click.group(invoke_without_command=True)
+@click.option('--profile', is_flag=True, envvar='FOOTBALL_PROFILE',
+              help="Print wall time, SQL statements and rows for each command to stderr.")
+@click.option('--profile-log', type=click.Path(dir_okay=False), envvar='FOOTBALL_PROFILE_LOG',
+              help="Append each command's profile to this JSON lines file (implies --profile).")
+@click.option('--snapshot', is_flag=True, envvar='FOOTBALL_SNAPSHOT',
+              help="Load the dataset into memory once and answer read commands from it (needs numpy).")
+@click.option('--snapshot-file', type=click.Path(dir_okay=False), envvar='FOOTBALL_SNAPSHOT_FILE',
+              help="Like --snapshot, but map the snapshot from this file, rebuilding it if the database changed.")
+@click.pass_context
+def cli(ctx, profile, profile_log, snapshot, snapshot_file):
+    """Football Player Stats CLI. Runs the interactive menu when no command is given."""
+    global _snapshot_file, _snapshot_pending
+    if profile or profile_log:
+        from lib import profiling
+        profiling.instrument(globals(), profile_log)
+    if snapshot_file:
+        _snapshot_file = snapshot_file
+    if (snapshot or snapshot_file) and _snapshot is None:
+        _snapshot_pending = True
+    if ctx.invoked_subcommand is None:
+        display_main_menu()
+
+@cli.result_callback()
+@click.pass_context
+def exit_on_failure(ctx, result, **options):
+    """Handlers print their own errors and return False; the command then exits with status 1."""
+    if result is False:
+        ctx.exit(1)
+
+@cli.command('add-player')
+@click.argument('name')
+def add_player_command(name):
+    """Add a football player."""
+    return add_player_func(name)
+
+@cli.command('add-team')
+@click.argument('name')
+def add_team_command(name):
+    """Add a football team."""
+    return add_team_func(name)
+
+@cli.command('add-player-to-team')
+@click.argument('player_id', type=int)
+@click.argument('team_id', type=int)
+def add_player_to_team_command(player_id, team_id):
+    """Add a player to a team."""
+    return add_player_to_team_func(player_id, team_id)
+
+@cli.command('add-stat')
+@click.argument('player_id', type=int)
+@click.argument('goals', type=int)
+@click.argument('assists', type=int)
+@click.option('--date', 'match_date', type=click.DateTime(formats=['%Y-%m-%d']), help="Match date (YYYY-MM-DD); sets the season.")
+def add_stat_command(player_id, goals, assists, match_date):
+    """Add a stat for a player."""
+    return add_stat_func(player_id, goals, assists, match_date.date() if match_date else None)
+
+@cli.command('add-boot-color')
+@click.argument('player_id', type=int)
+@click.argument('color')
+def add_boot_color_command(player_id, color):
+    """Add a boot color (Gold, Blue, Red, White, Black)."""
+    return add_boot_color_func(player_id, color)
+
+@cli.command('list-player-stats')
+@click.argument('player_id', type=int)
+def list_player_stats_command(player_id):
+    """List stats, boot color and teams for a player."""
+    return list_player_stats_func(player_id)
+
+@cli.command('list-boot-colors')
+@click.option('--limit', type=click.IntRange(min=1), help="Show at most this many rows.")
+@click.option('--after', 'after_id', default=0, help="Start after this boot color ID.")
+def list_boot_colors_command(limit, after_id):
+    """List all player boot colors."""
+    return list_all_boot_colors_func(limit, after_id)
+
+@cli.command('list-team-players')
+@click.argument('team_id', type=int)
+@click.option('--limit', type=click.IntRange(min=1), help="Show at most this many players.")
+@click.option('--after', 'after_id', default=0, help="Start after this player ID.")
+def list_team_players_command(team_id, limit, after_id):
+    """List all players in a team."""
+    return list_team_players_func(team_id, limit, after_id)
+
+@cli.command('top-scorers')
+@click.option('--metric', type=click.Choice(list(LEADERBOARD_LABELS)), default='goals', show_default=True)
+@click.option('-n', '--limit', type=click.IntRange(min=1), default=3, show_default=True, help="Players per ranking (ties included).")
+@click.option('--team', 'team_id', type=int, help="Rank only this team's players.")
+@click.option('--per-team', is_flag=True, help="Rank players within every team.")
+@click.option('--season', type=int, help="Rank one season only, by its starting year (2024 for 2024/25).")
+def top_scorers_command(metric, limit, team_id, per_team, season):
+    """List the top players by goals, assists or goal contributions."""
+    return show_top_scorers_func(metric, limit, team_id, per_team, season)
+
+@cli.command('season-stats')
+@click.argument('player_id', type=int)
+@click.option('--archive', type=click.Path(exists=True, dir_okay=False), help="Also include seasons archived to this file.")
+def season_stats_command(player_id, archive):
+    """Show a player's goals, assists and matches per season."""
+    return list_player_seasons_func(player_id, archive)
+
+@cli.command('stats-between')
+@click.argument('start', type=click.DateTime(formats=['%Y-%m-%d']))
+@click.argument('end', type=click.DateTime(formats=['%Y-%m-%d']))
+@click.option('--player', 'player_id', type=int, help="Only this player's matches.")
+@click.option('-n', '--limit', type=click.IntRange(min=1), default=10, show_default=True)
+def stats_between_command(start, end, player_id, limit):
+    """Sum goals and assists for matches between two dates (inclusive)."""
+    return list_stats_between_func(start.date(), end.date(), player_id, limit)
+
+@cli.command('archive-season')
+@click.argument('season', type=int)
+@click.option('--to', 'path', default='football_archive.db', show_default=True, type=click.Path(dir_okay=False),
+              help="SQLite file the season's stats are moved to.")
+def archive_season_command(season, path):
+    """Move a closed season's stats (by starting year) out of the main database."""
+    return archive_season_func(season, path)
+
+@cli.command('run-sql')
+@click.argument('query')
+@click.option('--limit', type=click.IntRange(min=1), help="Show at most this many rows.")
+@click.option('--offset', type=click.IntRange(min=0), default=0, help="Skip this many rows first.")
+@click.option('--pager', is_flag=True, help="Page the output through $PAGER.")
+def run_sql_command(query, limit, offset, pager):
+    """Run a custom SQL query."""
+    return run_custom_sql_func(query, limit, offset, pager)
+
+@cli.command('delete-player')
+@click.argument('player_id', type=int)
+@click.option('--yes', is_flag=True, help="Skip the confirmation prompt.")
+def delete_player_command(player_id, yes):
+    """Delete a player and their associated data."""
+    return delete_player_func(player_id, confirm=yes)
+
+def _parse_ids(ctx, param, value):
+    if value is None:
+        return None
+    try:
+        return [int(v) for v in value.replace(',', ' ').split()]
+    except ValueError:
+        raise click.BadParameter("must be a comma-separated list of IDs")
+
+@cli.command('delete-players')
+@click.option('--ids', callback=_parse_ids, help="Comma-separated player IDs, e.g. 3,17,42.")
+@click.option('--where', help="SQL condition on the players table, e.g. \"name LIKE 'Test %'\".")
+@click.option('--yes', is_flag=True, help="Skip the confirmation prompt.")
+def delete_players_command(ids, where, yes):
+    """Delete many players and all their data in one transaction."""
+    if (ids is None) == (where is None):
+        raise click.UsageError("Give exactly one of --ids or --where.")
+    return delete_players_func(ids=ids, where=where, confirm=yes)
+
+@cli.command('delete-team')
+@click.argument('team_id', type=int)
+@click.option('--yes', is_flag=True, help="Skip the confirmation prompt.")
+def delete_team_command(team_id, yes):
+    """Delete a team and its player associations."""
+    return delete_team_func(team_id, confirm=yes)
+
+@cli.command('delete-stat')
+@click.argument('stat_id', type=int)
+@click.option('--yes', is_flag=True, help="Skip the confirmation prompt.")
+def delete_stat_command(stat_id, yes):
+    """Delete a stat entry."""
+    return delete_stat_func(stat_id, confirm=yes)
+
+@cli.command('delete-boot-color')
+@click.argument('player_id', type=int)
+@click.option('--yes', is_flag=True, help="Skip the confirmation prompt.")
+def delete_boot_color_command(player_id, yes):
+    """Delete a player's boot color."""
+    return delete_boot_color_func(player_id, confirm=yes)
+
+@cli.command('remove-player-from-team')
+@click.argument('player_id', type=int)
+@click.argument('team_id', type=int)
+def remove_player_from_team_command(player_id, team_id):
+    """Remove a player from a team."""
+    return remove_player_from_team_func(player_id, team_id)
+
+@cli.command('search')
+@click.argument('query')
+@click.option('--players', 'kind', flag_value='player', help="Only search players.")
+@click.option('--teams', 'kind', flag_value='team', help="Only search teams.")
+@click.option('-n', '--limit', type=click.IntRange(min=1), default=10, show_default=True)
+def search_command(query, kind, limit):
+    """Find players and teams by name (prefixes and close matches), with their IDs."""
+    return search_func(query, kind, limit)
+
+@cli.command('cache-stats')
+def cache_stats_command():
+    """Show read cache hit/miss/eviction counters (useful at the end of a batch)."""
+    return show_cache_stats_func()
+
+@cli.command('snapshot-refresh')
+def snapshot_refresh_command():
+    """Load the dataset into memory (again) and answer read commands from it."""
+    return refresh_snapshot_func()
+
+@cli.command('snapshot-save')
+@click.argument('path', type=click.Path(dir_okay=False))
+def snapshot_save_command(path):
+    """Write the dataset to a snapshot file for --snapshot-file."""
+    return save_snapshot_func(path)
+
+@cli.command('snapshot-stats')
+def snapshot_stats_command():
+    """Show the rows and memory held by the in-memory snapshot."""
+    return show_snapshot_stats_func()
+
+@cli.command('import-stats')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=1000, show_default=True, help="Rows written per transaction.")
+def import_stats_command(path, batch_size):
+    """Import stats from a CSV or JSONL file with player_id, goals, assists."""
+    return import_stats_func(path, batch_size)
+
+@cli.command('assign-roster')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def assign_roster_command(path):
+    """Add players to teams from a CSV or JSONL file with player_id, team_id."""
+    return assign_roster_func(path)
+
+@cli.command('transfer')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def transfer_command(path):
+    """Move players to new teams from a CSV or JSONL file with player_id, team_id and optional from_team_id."""
+    return transfer_func(path)
+
+@cli.command('export')
+@click.argument('out_dir', type=click.Path(file_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['auto', 'parquet', 'npy', 'csv']), default='auto', show_default=True,
+              help="auto picks parquet if pyarrow is installed, else npy if numpy is, else csv.")
+@click.option('--incremental', is_flag=True, help="Only rows changed since the last export to OUT_DIR.")
+@click.option('--chunk-size', type=click.IntRange(min=1), default=50000, show_default=True)
+@click.option('--prune', is_flag=True, help="Delete change log entries this export has covered.")
+def export_command(out_dir, fmt, incremental, chunk_size, prune):
+    """Export players, teams, rosters, stats and boot colors to columnar files."""
+    return export_func(out_dir, fmt, incremental, chunk_size, prune)
+
+@cli.command('player-analytics')
+@click.option('--metric', type=click.Choice(PLAYER_ANALYTICS_METRICS), default='goals_per_match', show_default=True)
+@click.option('-n', '--limit', type=click.IntRange(min=1), default=10, show_default=True)
+@click.option('--min-matches', type=click.IntRange(min=1), default=1, show_default=True,
+              help="Leave out players with fewer matches.")
+@click.option('--season', type=int, help="One season only, by its starting year (2024 for 2024/25).")
+def player_analytics_command(metric, limit, min_matches, season):
+    """Rank players by per-match averages, with goal medians and 90th percentiles (needs numpy)."""
+    return player_analytics_func(metric, limit, min_matches, season)
+
+@cli.command('team-analytics')
+@click.option('--metric', type=click.Choice(TEAM_ANALYTICS_METRICS), default='goals', show_default=True)
+@click.option('-n', '--limit', type=click.IntRange(min=1), default=10, show_default=True)
+def team_analytics_command(metric, limit):
+    """Show how each team's goals are spread across its players (needs numpy)."""
+    return team_analytics_func(metric, limit)
+
+@cli.command('team-report')
+@click.option('--order', type=click.Choice(TEAM_REPORT_ORDERS), default='goals', show_default=True)
+@click.option('-n', '--limit', type=click.IntRange(min=1), default=10, show_default=True)
+@click.option('-j', '--workers', type=click.IntRange(min=1), help="Worker processes (default: one per CPU).")
+@click.option('--season', type=int, help="One season only, by its starting year (2024 for 2024/25).")
+def team_report_command(order, limit, workers, season):
+    """Per-team totals and goal spread, read in parallel by worker processes."""
+    return team_report_func(order, limit, workers, season)
+
+@cli.command('batch')
+@click.argument('commands', type=click.File('r'))
+def batch_command(commands):
+    """Run a file of commands (one per line, '-' for stdin) in one transaction."""
+    return run_batch_func(commands)
 
 # --- Script Entry Point ---
 if __name__ == '__main__':
-    display_main_menu()
+    cli()
 
 # Add these functions to lib/cli.py alongside your existing functions
 
@@ -0,0 +1,275 @@
+import csv
+import datetime
+import json
+import os
+import time
+
+from sqlalchemy import Date, Integer, text
+
+from lib.models import Base
+from lib.models.change_log import LOGGED_TABLES, change_log, last_change
+
+# Optional: Parquet output needs pyarrow, per-column .npy output needs numpy.
+# CSV always works.
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+try:
+    import numpy
+    from numpy.lib.format import open_memmap
+except ImportError:
+    numpy = None
+
+
+EXPORT_TABLES = LOGGED_TABLES
+CHUNK_SIZE = 50000
+WATERMARK_FILE = 'watermark.json'
+
+
+class ExportResult:
+    """Summary of one export run."""
+
+    def __init__(self, fmt, path, since, upto):
+        self.format = fmt
+        self.path = path
+        self.since = since
+        self.upto = upto
+        self.rows = {}
+        self.deleted = {}
+        self.elapsed = 0.0
+
+    @property
+    def incremental(self):
+        return self.since is not None
+
+    def __repr__(self):
+        return (f"<ExportResult(format={self.format}, rows={self.rows}, deleted={self.deleted}, "
+                f"since={self.since}, upto={self.upto})>")
+
+
+def _column_kinds(table):
+    """(name, kind) for the rowid and every column of table; kind is int, date or str."""
+    kinds = [('rowid', 'int')]
+    for column in Base.metadata.tables[table].columns:
+        if isinstance(column.type, Integer):
+            kinds.append((column.name, 'int'))
+        elif isinstance(column.type, Date):
+            kinds.append((column.name, 'date'))
+        else:
+            kinds.append((column.name, 'str'))
+    return kinds
+
+
+class CsvWriter:
+    """One CSV file per table, written row by row."""
+    extension = '.csv'
+    needs_profile = False
+
+    def __init__(self, path, kinds, profile=None):
+        self.file = open(path + self.extension, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([name for name, _ in kinds])
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """One Parquet file per table, with a row group per chunk."""
+    extension = '.parquet'
+    needs_profile = False
+
+    def __init__(self, path, kinds, profile=None):
+        types = {'int': pyarrow.int64(), 'date': pyarrow.date32(), 'str': pyarrow.string()}
+        self.kinds = kinds
+        self.schema = pyarrow.schema([(name, types[kind]) for name, kind in kinds])
+        self.writer = pyarrow.parquet.ParquetWriter(path + self.extension, self.schema)
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        arrays = []
+        for (name, kind), values in zip(self.kinds, columns):
+            if kind == 'date':
+                values = [datetime.date.fromisoformat(v) if v else None for v in values]
+            arrays.append(pyarrow.array(values, type=self.schema.field(name).type))
+        self.writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class NpyWriter:
+    """A directory per table holding one .npy array per column.
+
+    The arrays are preallocated from a counting pass and filled chunk by chunk
+    through a memory map. Integer columns with NULLs are stored as float64
+    with NaN, dates as datetime64[D] with NaT, and text as fixed-width
+    unicode sized to the longest value.
+    """
+    extension = ''
+    needs_profile = True
+
+    def __init__(self, path, kinds, profile):
+        count, nullable, widths = profile
+        os.makedirs(path, exist_ok=True)
+        self.arrays = []
+        for name, kind in kinds:
+            if kind == 'int':
+                dtype = 'float64' if name in nullable else 'int64'
+            elif kind == 'date':
+                dtype = 'datetime64[D]'
+            else:
+                dtype = f"U{max(widths.get(name, 0), 1)}"
+            self.arrays.append(open_memmap(os.path.join(path, name + '.npy'), mode='w+', dtype=dtype, shape=(count,)))
+        self.offset = 0
+
+    def write(self, rows):
+        end = self.offset + len(rows)
+        for array, values in zip(self.arrays, zip(*rows)):
+            if array.dtype.kind == 'f':
+                values = [numpy.nan if v is None else v for v in values]
+            elif array.dtype.kind == 'U':
+                values = ['' if v is None else v for v in values]
+            array[self.offset:end] = numpy.array(values, dtype=array.dtype)
+        self.offset = end
+
+    def close(self):
+        for array in self.arrays:
+            array.flush()
+        self.arrays = []
+
+
+WRITERS = {'parquet': ParquetWriter, 'npy': NpyWriter, 'csv': CsvWriter}
+
+
+def resolve_format(fmt='auto'):
+    """Pick the export format: Parquet if pyarrow is installed, else npy if numpy is, else CSV."""
+    if fmt == 'auto':
+        return 'parquet' if pyarrow is not None else 'npy' if numpy is not None else 'csv'
+    if fmt not in WRITERS:
+        raise ValueError(f"Format must be one of: auto, {', '.join(WRITERS)}")
+    if (fmt == 'parquet' and pyarrow is None) or (fmt == 'npy' and numpy is None):
+        raise ValueError(f"The {fmt} format needs {'pyarrow' if fmt == 'parquet' else 'numpy'} installed")
+    return fmt
+
+
+def read_watermark(out_dir):
+    """Return the state saved by the last export into out_dir, or None."""
+    try:
+        with open(os.path.join(out_dir, WATERMARK_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_watermark(out_dir, state):
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def _profile(connection, source, kinds):
+    """Row count, nullable columns and text widths for the rows in source."""
+    names = [name for name, _ in kinds]
+    text_names = [name for name, kind in kinds if kind == 'str']
+    expressions = ["count(*)"] + [f"count(t.{n})" for n in names] + [f"max(length(t.{n}))" for n in text_names]
+    row = connection.execute(text(f"SELECT {', '.join(expressions)} FROM {source}")).one()
+    total, counts, widths = row[0], row[1:1 + len(names)], row[1 + len(names):]
+    nullable = {name for name, n in zip(names, counts) if n < total}
+    return total, nullable, {name: width or 0 for name, width in zip(text_names, widths)}
+
+
+def _export_rows(connection, writer_cls, path, kinds, source, chunk_size):
+    """Write the rows of source ("<table> t WHERE ...") to path in rowid order, a chunk at a time."""
+    profile = _profile(connection, source, kinds) if writer_cls.needs_profile else None
+    writer = writer_cls(path, kinds, profile)
+    columns = ", ".join(f"t.{name}" for name, _ in kinds)
+    statement = text(f"SELECT {columns} FROM {source} AND t.rowid > :after ORDER BY t.rowid LIMIT :limit")
+    after = 0
+    exported = 0
+    try:
+        while True:
+            rows = connection.execute(statement, {'after': after, 'limit': chunk_size}).all()
+            if not rows:
+                break
+            writer.write(rows)
+            exported += len(rows)
+            after = rows[-1][0]
+    finally:
+        writer.close()
+    return exported
+
+
+def _export_changes(connection, writer_cls, path, table, kinds, since, upto, chunk_size):
+    """Write rows of table changed after since, and the rowids of deleted ones to path.deleted."""
+    connection.execute(text("DROP TABLE IF EXISTS temp.export_changed"))
+    connection.execute(text("CREATE TEMP TABLE export_changed (row_id INTEGER PRIMARY KEY)"))
+    connection.execute(text(
+        "INSERT OR IGNORE INTO export_changed (row_id) "
+        "SELECT row_id FROM change_log WHERE table_name = :table AND seq > :since AND seq <= :upto"
+    ), {'table': table, 'since': since, 'upto': upto})
+    changed = _export_rows(connection, writer_cls, path, kinds,
+                           f"{table} t WHERE t.rowid IN (SELECT row_id FROM export_changed)", chunk_size)
+    # row_id is export_changed's rowid, so the same chunked reader works.
+    deleted = _export_rows(connection, writer_cls, path + '.deleted', [('rowid', 'int')],
+                           f"export_changed t WHERE NOT EXISTS (SELECT 1 FROM {table} x WHERE x.rowid = t.rowid)", chunk_size)
+    connection.execute(text("DROP TABLE temp.export_changed"))
+    return changed, deleted
+
+
+def export_tables(engine, out_dir, fmt='auto', incremental=False, chunk_size=CHUNK_SIZE, prune=False):
+    """Write the exported tables into a new run directory under out_dir.
+
+    A full export writes every row; an incremental one writes only rows
+    inserted or updated since the watermark left by the previous export, plus
+    the rowids of deleted rows, using the change_log table. Everything is
+    read in one transaction, chunk_size rows at a time, and the watermark is
+    only advanced once all files are written. With prune, change_log entries
+    up to the new watermark are deleted once the watermark has been saved.
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be a positive integer")
+    fmt = resolve_format(fmt)
+    writer_cls = WRITERS[fmt]
+    previous = read_watermark(out_dir)
+    since = previous['seq'] if incremental and previous else None
+    start = time.perf_counter()
+
+    with engine.connect() as connection:
+        with connection.begin():
+            upto = last_change(connection)
+            run = f"full-{upto:012d}" if since is None else f"changes-{since:012d}-{upto:012d}"
+            result = ExportResult(fmt, os.path.join(out_dir, run), since, upto)
+            if since == upto:
+                result.elapsed = time.perf_counter() - start
+                return result
+            os.makedirs(result.path, exist_ok=True)
+            for table in EXPORT_TABLES:
+                kinds = _column_kinds(table)
+                path = os.path.join(result.path, table)
+                if since is None:
+                    result.rows[table] = _export_rows(
+                        connection, writer_cls, path, kinds, f"{table} t WHERE 1", chunk_size)
+                else:
+                    result.rows[table], result.deleted[table] = _export_changes(
+                        connection, writer_cls, path, table, kinds, since, upto, chunk_size)
+        # The watermark goes first: if it can't be written, the entries the
+        # next incremental export needs are still there.
+        _write_watermark(out_dir, {
+            'seq': upto,
+            'run': run,
+            'format': fmt,
+            'exported_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        })
+        if prune:
+            with connection.begin():
+                connection.execute(change_log.delete().where(change_log.c.seq <= upto))
+
+    result.elapsed = time.perf_counter() - start
+    return result
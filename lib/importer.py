@@ -0,0 +1,123 @@
+import csv
+import datetime
+import json
+import time
+
+from sqlalchemy import insert, select
+
+from lib.models import Player, Stat
+from lib.models.player_total import apply_stat_deltas, stat_deltas
+from lib.models.stat import season_for
+
+
+# SQLite caps the number of bound parameters per statement, so player ID
+# lookups are split into chunks comfortably below the historical limit of 999.
+ID_LOOKUP_CHUNK = 900
+
+
+class ImportResult:
+    """Summary of a bulk stat import."""
+
+    def __init__(self, inserted=0, rejected=0, elapsed=0.0):
+        self.inserted = inserted
+        self.rejected = rejected
+        self.elapsed = elapsed
+
+    @property
+    def rows_per_sec(self):
+        return self.inserted / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"<ImportResult(inserted={self.inserted}, rejected={self.rejected}, "
+                f"elapsed={self.elapsed:.3f})>")
+
+
+def read_rows(path):
+    """Yield one dict per record from a CSV (with header) or JSONL file."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith(('.jsonl', '.ndjson')):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield row
+        else:
+            yield from csv.DictReader(f)
+
+
+def _to_int(value):
+    if isinstance(value, str):
+        return int(value.strip())
+    return value
+
+
+def parse_stat_row(row):
+    """Turn a raw record into validated stat values, raising ValueError if invalid."""
+    if not isinstance(row, dict) or row.get('player_id') in (None, ''):
+        raise ValueError("Row must have a player_id")
+    player_id = _to_int(row['player_id'])
+    goals = _to_int(row.get('goals') or 0)
+    assists = _to_int(row.get('assists') or 0)
+    if not isinstance(player_id, int):
+        raise ValueError("Player ID must be an integer")
+    Stat.validate_stats(goals, assists)
+    match_date = row.get('match_date') or None
+    if match_date is not None:
+        match_date = datetime.date.fromisoformat(match_date)
+    return {'player_id': player_id, 'goals': goals, 'assists': assists, 'match_date': match_date,
+            'season': season_for(match_date) if match_date else None}
+
+
+def existing_player_ids(session, player_ids):
+    """Return the subset of player_ids that exist, using chunked IN lookups."""
+    ids = list(set(player_ids))
+    found = set()
+    for i in range(0, len(ids), ID_LOOKUP_CHUNK):
+        chunk = ids[i:i + ID_LOOKUP_CHUNK]
+        found.update(session.execute(select(Player.id).where(Player.id.in_(chunk))).scalars())
+    return found
+
+
+def _write_batch(session, batch):
+    known = existing_player_ids(session, (r['player_id'] for r in batch))
+    rows = [r for r in batch if r['player_id'] in known]
+    if rows:
+        session.execute(insert(Stat), rows)
+        apply_stat_deltas(session.connection(), stat_deltas(rows))
+    session.commit()
+    return len(rows), len(batch) - len(rows)
+
+
+def import_stats(session, path, batch_size=1000):
+    """Stream stat rows from path and insert them in batches of batch_size.
+
+    Rows that fail validation or reference a missing player are counted as
+    rejected; each batch is written with a single executemany and commit.
+    """
+    if batch_size < 1:
+        raise ValueError("Batch size must be a positive integer")
+
+    result = ImportResult()
+    start = time.perf_counter()
+    batch = []
+    for row in read_rows(path):
+        try:
+            batch.append(parse_stat_row(row))
+        except (ValueError, TypeError):
+            result.rejected += 1
+            continue
+        if len(batch) >= batch_size:
+            inserted, rejected = _write_batch(session, batch)
+            result.inserted += inserted
+            result.rejected += rejected
+            batch = []
+    if batch:
+        inserted, rejected = _write_batch(session, batch)
+        result.inserted += inserted
+        result.rejected += rejected
+    result.elapsed = time.perf_counter() - start
+    return result
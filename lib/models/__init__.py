@@ -1,30 +1,42 @@
-# from sqlalchemy import create_engine
-# from sqlalchemy.orm import sessionmaker
-# from .base import Base
+# The models, engine and Session are loaded on first use rather than at import
+# time, so commands that never touch the database (--help, Exit) don't pay for
+# importing SQLAlchemy. `from lib.models import Player, Session` still works.
 
-# from .player_team import player_teams
-# from .player import Player
-# from .team import Team
-# from .stat import Stat
-# from .boot_color import BootColor
+import importlib
 
-# engine = create_engine('sqlite:///football.db')
-# # Base = declarative_base()
-# Session = sessionmaker(bind=engine)
+# Exported name -> module that defines it
+_MODELS = {
+    'Base': '.base',
+    'player_teams': '.player_team',
+    'Player': '.player',
+    'Team': '.team',
+    'Stat': '.stat',
+    'BootColor': '.boot_color',
+    'PlayerTotal': '.player_total',
+    'SearchResult': '.search',
+    'change_log': '.change_log',
+}
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
-from .base import Base # Correctly import Base from .base
-from .player_team import player_teams # Correctly import player_teams from .player_team
+def load_models():
+    """Import every model module so their mappers can resolve each other."""
+    for name, module in _MODELS.items():
+        globals()[name] = getattr(importlib.import_module(module, __name__), name)
 
-# These imports are good, as they define your models and register them with Base.metadata
-from .player import Player
-from .team import Team
-from .stat import Stat
-from .boot_color import BootColor
 
-engine = create_engine('sqlite:///football.db')
-Session = sessionmaker(bind=engine)
+def __getattr__(name):
+    global engine, Session
+    if name in _MODELS:
+        load_models()
+    elif name in ('engine', 'Session'):
+        from sqlalchemy.orm import sessionmaker
+        from .database import make_engine
 
-# Base.metadata.create_all(engine) # You usually do this via Alembic migrations
\ No newline at end of file
+        load_models()
+        engine = make_engine() # Tuned by $FOOTBALL_DB_PROFILE, see database.py
+        Session = sessionmaker(bind=engine)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return globals()[name]
+
+# Base.metadata.create_all(engine) # You usually do this via Alembic migrations
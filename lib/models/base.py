@@ -1,3 +1,12 @@
+from sqlalchemy import event
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import Mapper
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+
+@event.listens_for(Mapper, 'before_configured')
+def _load_all_models():
+    """Declare every model before relationships like "Stat" are resolved by name."""
+    from . import load_models
+    load_models()
@@ -8,7 +8,7 @@ class BootColor(Base):
 
     id = Column(Integer, primary_key=True)
     color = Column(String, nullable=False)
-    player_id = Column(Integer, ForeignKey('players.id'), unique=True)
+    player_id = Column(Integer, ForeignKey('players.id', ondelete='CASCADE'), unique=True)
 
     player = relationship("Player", back_populates="boot_color")
 
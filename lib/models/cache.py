@@ -0,0 +1,187 @@
+import functools
+import os
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as _OrmSession
+from sqlalchemy.sql.elements import TextClause
+
+from .change_log import last_change
+
+DEFAULT_MAXSIZE = 256
+
+# Tables whose rows are maintained from, or cascade-deleted by, another table's writes.
+DERIVED_TABLES = {
+    'stats': {'player_totals'},
+    'players': {'player_totals', 'stats', 'boot_colors', 'player_teams'},
+    'teams': {'player_teams'},
+}
+
+_READ_ONLY_SQL = ('SELECT', 'WITH', 'PRAGMA', 'EXPLAIN', 'VALUES')
+
+
+class QueryCache:
+    """Bounded LRU cache of query results, each tagged with the tables it read.
+
+    Entries may also carry the database version they were read at; an entry
+    asked for at another version is dropped and recomputed.
+
+    Safe to share between threads: the entries are only touched under a lock,
+    which is not held while a missing value is computed. A value whose
+    computation overlapped an invalidation is returned but not stored, since
+    it may have read rows from before the write.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, tables, compute, version=None):
+        """Return the cached value for key, computing and storing it on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                del self._entries[key]
+                self.invalidations += 1
+            self.misses += 1
+            generation = self._generation
+        value = compute()
+        if self.maxsize > 0:
+            with self._lock:
+                if generation != self._generation:
+                    return value
+                self._entries[key] = (frozenset(tables), version, value)
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, tables):
+        """Drop every entry that read from any of the given tables."""
+        tables = set(tables)
+        for table in list(tables):
+            tables.update(DERIVED_TABLES.get(table, ()))
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, (read, _, _) in self._entries.items() if read & tables]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+query_cache = QueryCache(int(os.environ.get('FOOTBALL_CACHE_SIZE', DEFAULT_MAXSIZE)))
+
+
+def cached(*tables):
+    """Cache a query function(session, *args) by its arguments until one of tables is written.
+
+    Writes made through this process's sessions drop entries straight away.
+    Every entry also records the change_log sequence it was read at, and is
+    only served to a transaction that sees the same sequence, so commits from
+    other processes and connections are seen too. The sequence is looked up
+    once per transaction.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(session, *args, **kwargs):
+            key = (fn.__qualname__, session.get_bind(), args, tuple(sorted(kwargs.items())))
+            version = _seen_change(session) if query_cache.maxsize > 0 else None
+            return query_cache.get_or_compute(key, tables, lambda: fn(session, *args, **kwargs), version)
+        wrapper.uncached = fn
+        return wrapper
+    return decorate
+
+
+def _seen_change(session):
+    # Dropped when the transaction ends (below), so each transaction reads it afresh.
+    if 'seen_change' not in session.info:
+        session.info['seen_change'] = last_change(session.connection())
+    return session.info['seen_change']
+
+
+def _changed_tables(obj, deleted):
+    state = inspect(obj)
+    tables = {table.name for table in state.mapper.tables}
+    for relationship in state.mapper.relationships:
+        if relationship.secondary is None:
+            continue
+        if deleted or state.attrs[relationship.key].history.has_changes():
+            tables.add(relationship.secondary.name)
+    return tables
+
+
+def _mark_written(session, tables):
+    # Invalidate now so the writing session never reads its own stale entries,
+    # and again when the transaction ends, since other readers may have cached
+    # the old rows in between.
+    session.info.setdefault('written_tables', set()).update(tables)
+    query_cache.invalidate(tables)
+
+
+@event.listens_for(_OrmSession, 'after_flush')
+def _invalidate_flushed(session, flush_context):
+    tables = set()
+    for obj in list(session.new) + list(session.dirty):
+        tables |= _changed_tables(obj, deleted=False)
+    for obj in session.deleted:
+        tables |= _changed_tables(obj, deleted=True)
+    if tables:
+        _mark_written(session, tables)
+
+
+@event.listens_for(_OrmSession, 'do_orm_execute')
+def _invalidate_executed(orm_execute_state):
+    statement = orm_execute_state.statement
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_written(orm_execute_state.session, {statement.table.name})
+    elif isinstance(statement, TextClause):
+        words = statement.text.split(None, 1)
+        if words and words[0].upper() not in _READ_ONLY_SQL:
+            # Arbitrary SQL (run-sql) could have written to anything.
+            orm_execute_state.session.info['written_tables'] = {'*'}
+            query_cache.clear()
+
+
+@event.listens_for(_OrmSession, 'after_transaction_end')
+def _invalidate_on_transaction_end(session, transaction):
+    if transaction.parent is not None:
+        return
+    session.info.pop('seen_change', None)
+    tables = session.info.pop('written_tables', None)
+    if not tables:
+        return
+    if '*' in tables:
+        query_cache.clear()
+    else:
+        query_cache.invalidate(tables)
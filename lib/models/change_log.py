@@ -0,0 +1,46 @@
+from sqlalchemy import Column, DDL, Index, Integer, String, Table, event, text
+from .base import Base
+
+# Tables whose row changes are recorded, for incremental exports.
+LOGGED_TABLES = ('players', 'teams', 'player_teams', 'stats', 'boot_colors')
+
+# One row per insert, update or delete on a logged table, written by triggers.
+# seq only ever grows (AUTOINCREMENT), so "everything after seq N" is a stable
+# way for a consumer to ask what changed since it last looked.
+change_log = Table(
+    'change_log',
+    Base.metadata,
+    Column('seq', Integer, primary_key=True),
+    Column('table_name', String, nullable=False),
+    Column('row_id', Integer, nullable=False),
+    Column('op', String(1), nullable=False),
+    Index('ix_change_log_table_name_seq', 'table_name', 'seq'),
+    sqlite_autoincrement=True,
+)
+
+
+def trigger_statements(table):
+    """CREATE TRIGGER statements logging every change to table."""
+    return [
+        f"CREATE TRIGGER {table}_log_{name} AFTER {op_name} ON {table} BEGIN "
+        f"INSERT INTO change_log (table_name, row_id, op) VALUES ('{table}', {row}.rowid, '{op_name[0]}'); END"
+        for name, op_name, row in (('insert', 'INSERT', 'new'), ('update', 'UPDATE', 'new'), ('delete', 'DELETE', 'old'))
+    ]
+
+
+# After the whole metadata, since the triggers need the logged tables to exist.
+for table in LOGGED_TABLES:
+    for statement in trigger_statements(table):
+        event.listen(Base.metadata, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+
+
+LAST_CHANGE_SQL = "SELECT coalesce((SELECT seq FROM sqlite_sequence WHERE name = 'change_log'), 0)"
+
+
+def last_change(connection):
+    """Return the highest change sequence number handed out so far (0 before any change).
+
+    Read from sqlite_sequence rather than max(seq), so it still holds after
+    old entries have been pruned.
+    """
+    return connection.execute(text(LAST_CHANGE_SQL)).scalar()
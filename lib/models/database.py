@@ -0,0 +1,136 @@
+import os
+import random
+import sqlite3
+import time
+
+from sqlalchemy import create_engine, event
+
+DEFAULT_URL = 'sqlite:///football.db'
+DEFAULT_PROFILE = 'default'
+
+# How long (ms) a connection waits on another's lock before SQLite gives up
+# with "database is locked"; $FOOTBALL_DB_BUSY_TIMEOUT overrides it.
+DEFAULT_BUSY_TIMEOUT = 5000
+
+# Transactions begin DEFERRED unless a connection asks otherwise with the
+# sqlite_begin execution option. IMMEDIATE takes the write lock up front,
+# which is what writers want: a deferred transaction that reads first and
+# then writes can't wait for the lock (its snapshot would be stale) and fails
+# at once if another process committed meanwhile.
+BEGIN_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+# Lock contention that outlasts the busy timeout is retried this many times
+# in all, sleeping an exponentially growing, jittered delay in between.
+RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.05
+RETRY_MAX_DELAY = 2.0
+
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+# PRAGMA settings applied to every new SQLite connection, by profile name.
+#   default: WAL so readers don't block the writer, fsync only at checkpoints,
+#            64 MiB page cache and 256 MiB of memory-mapped reads.
+#   safe:    WAL with a full fsync on every commit; survives power loss.
+#   bulk:    for large imports on a database that can be rebuilt; commits are
+#            not synced at all and the cache is much larger.
+#   legacy:  SQLite's own defaults (rollback journal, no FK enforcement).
+PROFILES = {
+    'default': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,
+        'cache_size': -65536,
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON',
+    },
+    'safe': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON',
+    },
+    'bulk': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'mmap_size': 1073741824,
+        'cache_size': -524288,
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON',
+    },
+    'legacy': {},
+}
+
+
+def is_lock_error(error):
+    """True if error (SQLAlchemy's or sqlite3's) means another connection held a lock we needed."""
+    error = getattr(error, 'orig', error)
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, 'sqlite_errorcode', None)
+    if code is None:
+        return 'locked' in str(error)
+    return code & 0xff in (SQLITE_BUSY, SQLITE_LOCKED)
+
+
+def run_with_retry(unit, attempts=RETRY_ATTEMPTS, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+    """Call unit() and return its result, calling it again if it fails on a database lock.
+
+    unit must be a whole unit of work: it starts its own transaction and
+    leaves nothing behind when it raises, so running it again is safe. Other
+    errors, and the last lock error, are raised as they are.
+    """
+    for attempt in range(attempts):
+        try:
+            return unit()
+        except Exception as e:
+            if attempt == attempts - 1 or not is_lock_error(e):
+                raise
+        time.sleep(min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.0))
+
+
+def make_engine(url=None, profile=None, busy_timeout=None):
+    """Create an engine for url (or $FOOTBALL_DB_URL) tuned by the named profile.
+
+    The profile defaults to $FOOTBALL_DB_PROFILE, then 'default'; the busy
+    timeout (ms) to $FOOTBALL_DB_BUSY_TIMEOUT, then DEFAULT_BUSY_TIMEOUT.
+    """
+    url = url or os.environ.get('FOOTBALL_DB_URL', DEFAULT_URL)
+    return tune_engine(create_engine(url), profile, busy_timeout)
+
+
+def tune_engine(engine, profile=None, busy_timeout=None):
+    """Apply a profile's pragmas, the busy timeout and our BEGIN handling to engine's SQLite connections.
+
+    Returns engine. For an AsyncEngine, pass its sync_engine.
+    """
+    profile = profile or os.environ.get('FOOTBALL_DB_PROFILE', DEFAULT_PROFILE)
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown database profile '{profile}'. Choose one of: {', '.join(PROFILES)}")
+    if busy_timeout is None:
+        busy_timeout = int(os.environ.get('FOOTBALL_DB_BUSY_TIMEOUT', DEFAULT_BUSY_TIMEOUT))
+    if engine.dialect.name != 'sqlite':
+        return engine
+    pragmas = PROFILES[profile]
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout)}")
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+        # Stop the sqlite3 module from managing transactions itself so SAVEPOINTs
+        # nest inside the BEGIN emitted below instead of committing early.
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def begin_sqlite_transaction(connection):
+        mode = connection.get_execution_options().get('sqlite_begin', 'DEFERRED').upper()
+        if mode not in BEGIN_MODES:
+            raise ValueError(f"sqlite_begin must be one of: {', '.join(BEGIN_MODES)}")
+        # Nothing has run in the transaction yet, so retrying the BEGIN is
+        # retrying the whole unit of work from its start.
+        run_with_retry(lambda: connection.exec_driver_sql(f"BEGIN {mode}"))
+
+    return engine
@@ -0,0 +1,85 @@
+from collections import namedtuple
+
+from sqlalchemy import func, null, select
+from .cache import cached
+from .player_team import player_teams
+from .player_total import PlayerTotal
+from .queries import players, read_rows, teams
+from .stat import Stat
+
+LeaderboardEntry = namedtuple('LeaderboardEntry', 'rank team_name name value')
+
+# Each metric is computed from a totals selectable with player_id, goals,
+# assists and appearances columns.
+METRICS = {
+    'goals': lambda totals: totals.c.goals,
+    'assists': lambda totals: totals.c.assists,
+    'contributions': lambda totals: totals.c.goals + totals.c.assists,
+}
+
+
+def leaderboard(session, metric='goals', limit=3, team_id=None, per_team=False, season=None):
+    """Return the top `limit` players by metric, ties included.
+
+    With team_id, only that team's players are ranked; with per_team, every
+    team gets its own ranking. Either way the ranking is one windowed query.
+    Rankings come from the all-time totals unless a season is given, in which
+    case that season's stats are summed through the season index.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Metric must be one of: {', '.join(METRICS)}")
+    if limit < 1:
+        raise ValueError("Limit must be a positive integer")
+    if season is None:
+        return _ranking(session, metric, limit, team_id, per_team)
+    return _season_ranking(session, metric, limit, team_id, per_team, season)
+
+
+@cached('player_totals', 'players', 'player_teams', 'teams')
+def _ranking(session, metric, limit, team_id, per_team):
+    return _rank(session, PlayerTotal.__table__, metric, limit, team_id, per_team)
+
+
+@cached('stats', 'players', 'player_teams', 'teams')
+def _season_ranking(session, metric, limit, team_id, per_team, season):
+    stats = Stat.__table__
+    totals = (
+        select(
+            stats.c.player_id.label('player_id'),
+            func.sum(stats.c.goals).label('goals'),
+            func.sum(stats.c.assists).label('assists'),
+            func.count().label('appearances'),
+        )
+        .where(stats.c.season == season)
+        .group_by(stats.c.player_id)
+        .subquery()
+    )
+    return _rank(session, totals, metric, limit, team_id, per_team)
+
+
+def _rank(session, totals, metric, limit, team_id, per_team):
+    value = METRICS[metric](totals)
+    by_team = per_team or team_id is not None
+    partition_by = player_teams.c.team_id if by_team else None
+    columns = [
+        players.c.name.label('name'),
+        value.label('value'),
+        func.rank().over(partition_by=partition_by, order_by=value.desc()).label('rank'),
+    ]
+    ranked = select(*columns).join(totals, totals.c.player_id == players.c.id).where(totals.c.appearances > 0)
+    if by_team:
+        ranked = ranked.add_columns(player_teams.c.team_id).join(player_teams, player_teams.c.player_id == players.c.id)
+        if team_id is not None:
+            ranked = ranked.where(player_teams.c.team_id == team_id)
+    ranked = ranked.subquery()
+
+    if by_team:
+        statement = (
+            select(ranked.c.rank, teams.c.name, ranked.c.name, ranked.c.value)
+            .join(teams, teams.c.id == ranked.c.team_id)
+            .order_by(teams.c.name, ranked.c.rank, ranked.c.name)
+        )
+    else:
+        statement = select(ranked.c.rank, null(), ranked.c.name, ranked.c.value).order_by(ranked.c.rank, ranked.c.name)
+    statement = statement.where(ranked.c.rank <= limit)
+    return read_rows(session, statement, LeaderboardEntry)
@@ -8,11 +8,14 @@ class Player(Base):
     __tablename__ = 'players'
 
     id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, unique=True, index=True)
 
-    stats = relationship("Stat", back_populates="player")
-    boot_color = relationship("BootColor", uselist=False, back_populates="player")
-    teams = relationship("Team", secondary=player_teams, back_populates="players")
+    # Dependent rows are removed by ON DELETE CASCADE; passive_deletes stops the
+    # ORM from loading them just to delete them one by one.
+    stats = relationship("Stat", back_populates="player", cascade="all, delete-orphan", passive_deletes=True)
+    boot_color = relationship("BootColor", uselist=False, back_populates="player",
+                              cascade="all, delete-orphan", passive_deletes=True)
+    teams = relationship("Team", secondary=player_teams, back_populates="players", passive_deletes=True)
 
     def __init__(self, name):
         self.validate_name(name) 
@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, ForeignKey, Table
+from sqlalchemy import Column, Integer, ForeignKey, Index, Table
 from .base import Base
 
 
 player_teams = Table(
     'player_teams',
     Base.metadata,
-    Column('player_id', Integer, ForeignKey('players.id'), primary_key=True),
-    Column('team_id', Integer, ForeignKey('teams.id'), primary_key=True)
+    Column('player_id', Integer, ForeignKey('players.id', ondelete='CASCADE'), primary_key=True),
+    Column('team_id', Integer, ForeignKey('teams.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key already serves lookups by player; rosters go by team.
+    Index('ix_player_teams_team_id_player_id', 'team_id', 'player_id')
 )
\ No newline at end of file
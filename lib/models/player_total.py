@@ -0,0 +1,71 @@
+from collections import defaultdict
+
+from sqlalchemy import Column, Integer, ForeignKey, event
+from sqlalchemy.dialects.sqlite import insert
+from .base import Base
+from .player import Player
+from .stat import Stat
+
+class PlayerTotal(Base):
+    """Running goal, assist and appearance totals for a player, maintained from stats."""
+    __tablename__ = 'player_totals'
+
+    player_id = Column(Integer, ForeignKey('players.id', ondelete='CASCADE'), primary_key=True)
+    goals = Column(Integer, nullable=False, default=0, index=True)
+    assists = Column(Integer, nullable=False, default=0)
+    appearances = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<PlayerTotal(goals={self.goals}, assists={self.assists}, appearances={self.appearances})>"
+
+
+def stat_deltas(rows, sign=1):
+    """Fold stat rows (dicts with player_id, goals, assists) into per-player deltas."""
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for row in rows:
+        if row['player_id'] is None:
+            continue
+        delta = deltas[row['player_id']]
+        delta[0] += sign * (row.get('goals') or 0)
+        delta[1] += sign * (row.get('assists') or 0)
+        delta[2] += sign
+    return deltas
+
+
+def apply_stat_deltas(connection, deltas):
+    """Add per-player deltas to player_totals with a single upsert executemany."""
+    if not deltas:
+        return
+    table = PlayerTotal.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.player_id],
+        set_={
+            'goals': table.c.goals + stmt.excluded.goals,
+            'assists': table.c.assists + stmt.excluded.assists,
+            'appearances': table.c.appearances + stmt.excluded.appearances,
+        },
+    )
+    connection.execute(stmt, [
+        {'player_id': player_id, 'goals': goals, 'assists': assists, 'appearances': appearances}
+        for player_id, (goals, assists, appearances) in deltas.items()
+    ])
+
+
+def _stat_values(target):
+    return {'player_id': target.player_id, 'goals': target.goals, 'assists': target.assists}
+
+
+@event.listens_for(Stat, 'after_insert')
+def _stat_inserted(mapper, connection, target):
+    apply_stat_deltas(connection, stat_deltas([_stat_values(target)]))
+
+
+@event.listens_for(Stat, 'after_delete')
+def _stat_deleted(mapper, connection, target):
+    apply_stat_deltas(connection, stat_deltas([_stat_values(target)], sign=-1))
+
+
+@event.listens_for(Player, 'before_delete')
+def _player_deleted(mapper, connection, target):
+    connection.execute(PlayerTotal.__table__.delete().where(PlayerTotal.player_id == target.id))
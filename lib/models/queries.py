@@ -0,0 +1,136 @@
+from collections import namedtuple
+
+from sqlalchemy import func, select
+from .cache import cached
+from .player import Player
+from .player_team import player_teams
+from .player_total import PlayerTotal
+from .boot_color import BootColor
+from .team import Team
+
+# The read functions below are what the list and report commands print from.
+# They run Core select()s against the tables rather than ORM queries, so no
+# mapped instances, identity map entries or instance state are built: each
+# row comes back as one of these namedtuples (tuples, so no per-row __dict__).
+PlayerProfile = namedtuple('PlayerProfile', 'id name goals assists appearances boot_color teams')
+BootColorEntry = namedtuple('BootColorEntry', 'id color player_name')
+TeamPlayer = namedtuple('TeamPlayer', 'id name')
+
+PAGE_SIZE = 500
+
+players = Player.__table__
+teams = Team.__table__
+boot_colors = BootColor.__table__
+player_totals = PlayerTotal.__table__
+
+
+def read_rows(session, statement, row_type):
+    """Run a Core select in the session's transaction and return its rows as row_type tuples."""
+    return list(map(row_type._make, session.execute(statement)))
+
+
+@cached('players', 'player_totals', 'boot_colors', 'player_teams', 'teams')
+def get_player_profile(session, player_id):
+    """Return a player's totals, boot color and teams in two statements, or None."""
+    row = session.execute(
+        select(
+            players.c.id,
+            players.c.name,
+            func.coalesce(player_totals.c.goals, 0),
+            func.coalesce(player_totals.c.assists, 0),
+            func.coalesce(player_totals.c.appearances, 0),
+            boot_colors.c.color,
+        )
+        .outerjoin(player_totals, player_totals.c.player_id == players.c.id)
+        .outerjoin(boot_colors, boot_colors.c.player_id == players.c.id)
+        .where(players.c.id == player_id)
+    ).first()
+    if row is None:
+        return None
+    names = session.execute(
+        select(teams.c.name)
+        .join(player_teams, player_teams.c.team_id == teams.c.id)
+        .where(player_teams.c.player_id == player_id)
+    ).scalars()
+    return PlayerProfile(*row, teams=tuple(names))
+
+
+@cached('players')
+def get_player_name(session, player_id):
+    """Return a player's name, or None if they don't exist."""
+    return session.execute(select(players.c.name).where(players.c.id == player_id)).scalar()
+
+
+def player_names(session, ids):
+    """Return {id: name} for the players among ids."""
+    return dict(session.execute(select(players.c.id, players.c.name).where(players.c.id.in_(list(ids)))).all())
+
+
+def team_names(session, ids):
+    """Return {id: name} for the teams among ids."""
+    return dict(session.execute(select(teams.c.id, teams.c.name).where(teams.c.id.in_(list(ids)))).all())
+
+
+def _keyset_pages(fetch_page, after_id, limit, page_size):
+    """Yield rows from fetch_page(after_id, size) until exhausted or limit rows are seen.
+
+    Each page starts after the last id of the previous one, so every query is an
+    index range scan no matter how deep into the results we are.
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        rows = fetch_page(after_id, size)
+        yield from rows
+        if len(rows) < size:
+            return
+        after_id = rows[-1].id
+        if remaining is not None:
+            remaining -= len(rows)
+
+
+@cached('boot_colors', 'players')
+def _boot_colors_page(session, after_id, size):
+    return read_rows(session, (
+        select(boot_colors.c.id, boot_colors.c.color, players.c.name)
+        .outerjoin(players, players.c.id == boot_colors.c.player_id)
+        .where(boot_colors.c.id > after_id)
+        .order_by(boot_colors.c.id)
+        .limit(size)
+    ), BootColorEntry)
+
+
+def iter_boot_colors(session, after_id=0, limit=None, page_size=PAGE_SIZE):
+    """Yield boot colors with their player's name in id order, a page at a time."""
+    def fetch_page(after, size):
+        return _boot_colors_page(session, after, size)
+    return _keyset_pages(fetch_page, after_id, limit, page_size)
+
+
+def list_boot_colors(session):
+    """Return every boot color with its player's name; small tables take a single statement."""
+    return list(iter_boot_colors(session))
+
+
+@cached('teams')
+def get_team_name(session, team_id):
+    """Return a team's name, or None if it doesn't exist."""
+    return session.execute(select(teams.c.name).where(teams.c.id == team_id)).scalar()
+
+
+@cached('players', 'player_teams')
+def _team_players_page(session, team_id, after_id, size):
+    return read_rows(session, (
+        select(players.c.id, players.c.name)
+        .join(player_teams, player_teams.c.player_id == players.c.id)
+        .where(player_teams.c.team_id == team_id, player_teams.c.player_id > after_id)
+        .order_by(player_teams.c.player_id)
+        .limit(size)
+    ), TeamPlayer)
+
+
+def iter_team_players(session, team_id, after_id=0, limit=None, page_size=PAGE_SIZE):
+    """Yield a team's players in id order, a page at a time."""
+    def fetch_page(after, size):
+        return _team_players_page(session, team_id, after, size)
+    return _keyset_pages(fetch_page, after_id, limit, page_size)
@@ -0,0 +1,151 @@
+import re
+from collections import namedtuple
+
+from sqlalchemy import DDL, event, text
+from .base import Base
+from .cache import cached
+
+SearchResult = namedtuple('SearchResult', 'kind id name match')
+
+# Two FTS5 indexes over player and team names, kept in sync by triggers:
+# name_search matches whole words and prefixes (accents folded), and
+# name_trigrams matches any three-letter run, which catches substrings and
+# near-misses. Players are stored at rowid 2 * id and teams at 2 * id + 1,
+# plus the name's length shifted above the id, so a trigger can find a name's
+# entry by rowid instead of scanning, and FTS5, which returns matches in rowid
+# order, returns the shortest names first.
+SEARCH_TABLES = ('name_search', 'name_trigrams')
+KINDS = {'player': ('players', 0), 'team': ('teams', 1)}
+LENGTH_SHIFT = 32
+
+# Each FTS5 query reads at most this many matches, shortest names first, and
+# only those are ranked, so a one- or two-letter query over a million names
+# still answers in milliseconds. When more names match, a longer name can lose
+# its place to a shorter, weaker one.
+CANDIDATES = 200
+
+# The trigram index can't match words shorter than a trigram.
+TRIGRAM = 3
+
+
+def _sync_statements(table, offset):
+    """Triggers keeping both indexes in step with table, then a backfill of its rows."""
+    def rowid(row):
+        return f"(length({row}.name) << {LENGTH_SHIFT}) + 2 * {row}.id + {offset}"
+    insert = "".join(f" INSERT INTO {fts} (rowid, name) VALUES ({rowid('new')}, new.name);" for fts in SEARCH_TABLES)
+    delete = "".join(f" DELETE FROM {fts} WHERE rowid = {rowid('old')};" for fts in SEARCH_TABLES)
+    return [
+        f"CREATE TRIGGER {table}_search_insert AFTER INSERT ON {table} BEGIN{insert} END",
+        f"CREATE TRIGGER {table}_search_delete AFTER DELETE ON {table} BEGIN{delete} END",
+        f"CREATE TRIGGER {table}_search_update AFTER UPDATE OF id, name ON {table} BEGIN{delete}{insert} END",
+    ] + [f"INSERT INTO {fts} (rowid, name) SELECT (length(name) << {LENGTH_SHIFT}) + 2 * id + {offset}, name FROM {table}"
+         for fts in SEARCH_TABLES]
+
+
+CREATE_STATEMENTS = [
+    "CREATE VIRTUAL TABLE name_search USING fts5(name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "CREATE VIRTUAL TABLE name_trigrams USING fts5(name, tokenize = 'trigram')",
+] + [statement for table, offset in KINDS.values() for statement in _sync_statements(table, offset)]
+
+DROP_STATEMENTS = [f"DROP TABLE IF EXISTS {fts}" for fts in SEARCH_TABLES] + [
+    f"DROP TRIGGER IF EXISTS {table}_search_{op}" for table, _ in KINDS.values() for op in ('insert', 'delete', 'update')
+]
+
+
+# Databases built from the metadata (tests, benchmark datasets) get the index
+# too; migrated databases get it from the search migration.
+for statement in CREATE_STATEMENTS:
+    event.listen(Base.metadata, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in DROP_STATEMENTS:
+    event.listen(Base.metadata, 'before_drop', DDL(statement).execute_if(dialect='sqlite'))
+
+
+def _words(query):
+    return re.findall(r"\w+", query.lower())
+
+
+def _prefix_query(words):
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def _trigrams(word):
+    return [word[i:i + TRIGRAM] for i in range(len(word) - TRIGRAM + 1)]
+
+
+def _close_queries(words):
+    """One query per word for names with all its trigrams, then one per letter
+    of it for names with all trigrams not covering that letter, so a name with
+    one letter wrong, missing or extra still matches."""
+    queries = []
+    for word in words:
+        runs = _trigrams(word)
+        for typo in [None, *range(len(word))]:
+            kept = [run for i, run in enumerate(runs) if typo is None or not i <= typo < i + TRIGRAM]
+            query = " AND ".join(f'"{run}"' for run in kept)
+            if query and query not in queries:
+                queries.append(query)
+    return queries
+
+
+def _like_pattern(word):
+    # Words are runs of \w, so '_' is the only LIKE wildcard they can contain.
+    return "%" + word.replace("_", "\\_") + "%"
+
+
+def _candidates(session, table, match, kind, count, contains=(), columns="rowid, name"):
+    """Up to count rows of columns matching match, shortest names first."""
+    where = f"{table} MATCH :match"
+    params = {'match': match, 'count': count}
+    if kind is not None:
+        where += " AND rowid % 2 = :parity"
+        params['parity'] = KINDS[kind][1]
+    for i, word in enumerate(contains):
+        where += f" AND name LIKE :contains_{i} ESCAPE '\\'"
+        params[f'contains_{i}'] = _like_pattern(word)
+    # No ORDER BY: FTS5 then stops after :count matches and computes rank (if
+    # asked for) for those alone, where ORDER BY rank would score every match.
+    return session.execute(text(f"SELECT {columns} FROM {table} WHERE {where} LIMIT :count"), params).all()
+
+
+@cached('players', 'teams')
+def search_names(session, query, kind=None, limit=10):
+    """Return players and teams whose names best match query, best first.
+
+    Every word of the query must start a word of the name ('lio mes' finds
+    Lionel Messi, 'mbappe' finds Mbappé). If that leaves fewer than limit
+    results, names sharing the most three-letter runs with the query fill the
+    rest, so substrings and small typos ('essi', 'mesi') still match. Words
+    shorter than three letters have no three-letter runs, so in those close
+    matches they must appear in the name as typed ('lu modrc' finds Luka
+    Modric); a query of only such words gets prefix matches alone.
+    """
+    if kind is not None and kind not in KINDS:
+        raise ValueError(f"Kind must be one of: {', '.join(KINDS)}")
+    if limit < 1:
+        raise ValueError("Limit must be a positive integer")
+    words = _words(query)
+    if not words:
+        return []
+
+    count = max(CANDIDATES, limit)
+    rows = _candidates(session, 'name_search', _prefix_query(words), kind, count, columns="rowid, name, rank")
+    found = [(rowid, name, 'prefix') for rowid, name, _ in sorted(rows, key=lambda row: (row[2], row[0]))[:limit]]
+    queries = _close_queries(words)
+    if len(found) < limit and queries:
+        seen = {rowid for rowid, _, _ in found}
+        short = [word for word in words if len(word) < TRIGRAM]
+        close = {}
+        for query in queries:
+            for rowid, name in _candidates(session, 'name_trigrams', query, kind, count + len(seen), contains=short):
+                if rowid not in seen:
+                    close[rowid] = name
+        runs = {run for word in words for run in _trigrams(word)}
+
+        def shared(rowid):
+            name = close[rowid].lower()
+            return sum(run in name for run in runs)
+        found += [(rowid, close[rowid], 'fuzzy') for rowid in
+                  sorted(close, key=lambda rowid: (-shared(rowid), rowid))[:limit - len(found)]]
+    kinds = {offset: label for label, (_, offset) in KINDS.items()}
+    ids = (1 << LENGTH_SHIFT) - 1
+    return [SearchResult(kinds[rowid % 2], (rowid & ids) // 2, name, match) for rowid, name, match in found]
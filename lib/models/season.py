@@ -0,0 +1,116 @@
+import datetime
+from collections import namedtuple
+
+from sqlalchemy import create_engine, func, select
+from .cache import cached, query_cache
+from .database import run_with_retry
+from .queries import players, read_rows
+from .stat import Stat, season_for
+
+SeasonTotal = namedtuple('SeasonTotal', 'season goals assists appearances')
+RangeTotal = namedtuple('RangeTotal', 'player_id name goals assists appearances')
+
+ARCHIVE_SCHEMA = 'archive'
+_ARCHIVE_DDL = (
+    "CREATE TABLE IF NOT EXISTS archive.stats ("
+    "id INTEGER PRIMARY KEY, goals INTEGER, assists INTEGER, player_id INTEGER, match_date DATE, season INTEGER)",
+    "CREATE INDEX IF NOT EXISTS archive.ix_stats_season_player_id ON stats (season, player_id)",
+)
+
+
+def _season_rows(session_or_connection, stats, player_id):
+    statement = (
+        select(stats.c.season, func.sum(stats.c.goals), func.sum(stats.c.assists), func.count())
+        .where(stats.c.player_id == player_id, stats.c.season.is_not(None))
+        .group_by(stats.c.season)
+        .order_by(stats.c.season)
+    )
+    return list(map(SeasonTotal._make, session_or_connection.execute(statement)))
+
+
+@cached('stats')
+def player_seasons(session, player_id):
+    """Return a player's goals, assists and appearances per season, oldest first."""
+    return _season_rows(session, Stat.__table__, player_id)
+
+
+def archived_player_seasons(path, player_id):
+    """Like player_seasons, but read from an archive file written by archive_season."""
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        with engine.connect() as connection:
+            if not engine.dialect.has_table(connection, 'stats'):
+                return []
+            return _season_rows(connection, Stat.__table__, player_id)
+    finally:
+        engine.dispose()
+
+
+@cached('stats', 'players')
+def totals_between(session, start, end, player_id=None, limit=10):
+    """Sum stats for matches from start to end inclusive, best goal scorers first.
+
+    Only rows with a match date in the range are read, through the match date
+    index (or the player/date index when player_id is given).
+    """
+    stats = Stat.__table__
+    statement = (
+        select(stats.c.player_id, players.c.name, func.sum(stats.c.goals).label('goals'),
+               func.sum(stats.c.assists), func.count())
+        .join(players, players.c.id == stats.c.player_id)
+        .where(stats.c.match_date.between(start, end))
+        .group_by(stats.c.player_id, players.c.name)
+        .order_by(func.sum(stats.c.goals).desc(), players.c.name)
+        .limit(limit)
+    )
+    if player_id is not None:
+        statement = statement.where(stats.c.player_id == player_id)
+    return read_rows(session, statement, RangeTotal)
+
+
+def archive_season(engine, season, path, today=None):
+    """Move one closed season's stats from the database into an archive file.
+
+    The archive is ATTACHed to a raw connection, since SQLite can't ATTACH
+    inside a transaction, so this must not be run while the caller holds a
+    transaction of its own (it would wait on its own write lock). Rows are
+    copied in one transaction and removed from the hot table in a second;
+    SQLite only makes a multi-database commit atomic outside WAL mode, so
+    this order means a crash can at worst leave rows in both files, and
+    running it again finishes the move. Each BEGIN IMMEDIATE is retried on
+    lock contention like the engine's own. Player totals are all-time and are
+    left as they are. Returns the number of rows moved.
+    """
+    if season >= season_for(today or datetime.date.today()):
+        raise ValueError(f"Season {season} is not closed yet")
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (path,))
+        try:
+            for ddl in _ARCHIVE_DDL:
+                cursor.execute(ddl)
+            run_with_retry(lambda: cursor.execute("BEGIN IMMEDIATE"))
+            cursor.execute(
+                "INSERT OR IGNORE INTO archive.stats (id, goals, assists, player_id, match_date, season) "
+                "SELECT id, goals, assists, player_id, match_date, season FROM main.stats WHERE season = ?",
+                (season,),
+            )
+            cursor.execute("COMMIT")
+            run_with_retry(lambda: cursor.execute("BEGIN IMMEDIATE"))
+            cursor.execute(
+                "DELETE FROM main.stats WHERE season = ? AND id IN (SELECT id FROM archive.stats WHERE season = ?)",
+                (season, season),
+            )
+            moved = cursor.rowcount
+            cursor.execute("COMMIT")
+        except Exception:
+            if raw.in_transaction:
+                cursor.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.execute(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+    finally:
+        raw.close()
+    query_cache.invalidate({'stats'})
+    return moved
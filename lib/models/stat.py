@@ -1,28 +1,58 @@
-from sqlalchemy import Column, Integer, ForeignKey
+import datetime
+
+from sqlalchemy import Column, Date, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 
+
+def season_for(match_date):
+    """Return the season a match date falls in, as its starting year (July to June)."""
+    return match_date.year if match_date.month >= 7 else match_date.year - 1
+
+
+def season_label(season):
+    return f"{season}/{(season + 1) % 100:02d}"
+
+
 class Stat(Base):
     """Represents a player's performance stats."""
     __tablename__ = 'stats'
+    __table_args__ = (
+        # Covers "all stats for player X" including the summed columns.
+        Index('ix_stats_player_id_goals_assists', 'player_id', 'goals', 'assists'),
+        # Season aggregates and a player's matches in a date range only read
+        # their slice of the table.
+        Index('ix_stats_season_player_id_goals_assists', 'season', 'player_id', 'goals', 'assists'),
+        Index('ix_stats_player_id_match_date', 'player_id', 'match_date'),
+        Index('ix_stats_match_date', 'match_date'),
+    )
 
     id = Column(Integer, primary_key=True)
     goals = Column(Integer, default=0)
     assists = Column(Integer, default=0)
-    player_id = Column(Integer, ForeignKey('players.id'))
+    player_id = Column(Integer, ForeignKey('players.id', ondelete='CASCADE'))
+    # Optional: stats recorded without a match date have no season either.
+    match_date = Column(Date)
+    season = Column(Integer)
 
     player = relationship("Player", back_populates="stats")
 
-    def __init__(self, player_id, goals=0, assists=0):
+    def __init__(self, player_id, goals=0, assists=0, match_date=None):
         self.validate_stats(goals, assists) 
         self.player_id = player_id
         self.goals = goals
         self.assists = assists
+        if match_date is not None:
+            if not isinstance(match_date, datetime.date):
+                raise ValueError("Match date must be a date")
+            self.match_date = match_date
+            self.season = season_for(match_date)
 
     def __repr__(self):
         return f"<Stat(goals={self.goals}, assists={self.assists})>"
 
-    def validate_stats(self, goals, assists): 
+    @staticmethod
+    def validate_stats(goals, assists):
         """Validate goals and assists."""
         if not isinstance(goals, int) or goals < 0:
             raise ValueError("Goals must be a non-negative integer")
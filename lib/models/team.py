@@ -8,9 +8,9 @@ class Team(Base):
     __tablename__ = 'teams'
 
     id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, unique=True, index=True)
 
-    players = relationship("Player", secondary=player_teams, back_populates="teams")
+    players = relationship("Player", secondary=player_teams, back_populates="teams", passive_deletes=True)
 
     def __init__(self, name):
         self.validate_name(name) 
@@ -0,0 +1,101 @@
+from contextlib import contextmanager
+
+_active = None
+# Set while a single_transaction() block is running.
+_single_transaction = False
+
+
+class UnitOfWork:
+    """Keeps one session open across many commands, e.g. the interactive menu.
+
+    The session is only created when a command first asks for it.
+    """
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory
+        self._session = None
+        self._previous = None
+
+    @property
+    def session(self):
+        if self._session is None:
+            factory = self.session_factory
+            if factory is None:
+                from . import Session
+                factory = Session
+            self._session = factory()
+        return self._session
+
+    def __enter__(self):
+        global _active
+        self._previous, _active = _active, self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _active
+        _active = self._previous
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+@contextmanager
+def session_scope(write=False):
+    """Yield the session a command should use.
+
+    Inside a UnitOfWork this is the shared session, otherwise a fresh one. The
+    session is closed when the block exits either way: anything the command
+    left uncommitted is rolled back and loaded objects are discarded, so the
+    next command sees changes made by other processes. A closed session is
+    reusable, so the shared one stays valid for the next command.
+
+    Commands that write pass write=True: their transactions then begin
+    IMMEDIATE, taking the write lock (waiting and retrying if another process
+    has it) before anything is read, so they can't fail halfway on a lock.
+    """
+    if _active:
+        session = _active.session
+    else:
+        from . import Session
+        session = Session()
+    bind = session.bind
+    if write:
+        from sqlalchemy.engine import Engine
+        # Inside single_transaction the bind is a connection that already began IMMEDIATE.
+        if isinstance(bind, Engine):
+            session.bind = bind.execution_options(sqlite_begin='IMMEDIATE')
+    try:
+        yield session
+    finally:
+        session.close()
+        session.bind = bind
+
+
+@contextmanager
+def single_transaction(engine=None):
+    """Run every session_scope() in the block inside one database transaction.
+
+    Commands' commits and rollbacks apply to a SAVEPOINT of their own, so a
+    failed command is undone without losing the others; the whole batch is
+    committed when the block exits normally and rolled back if it raises.
+    The transaction begins IMMEDIATE, holding the write lock throughout.
+    """
+    global _single_transaction
+    from . import Session
+    from .cache import query_cache
+    engine = engine or Session.kw['bind']
+    previous, _single_transaction = _single_transaction, True
+    try:
+        with engine.connect() as connection, connection.execution_options(sqlite_begin='IMMEDIATE').begin():
+            with UnitOfWork(lambda: Session(bind=connection, join_transaction_mode='create_savepoint')):
+                yield
+    finally:
+        _single_transaction = previous
+        # Results cached mid-batch may include writes that were just rolled back.
+        query_cache.clear()
+
+
+def in_single_transaction():
+    """True inside single_transaction(), where work done on a connection of
+    its own would not see the shared transaction and would wait on its lock."""
+    return _single_transaction
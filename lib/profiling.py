@@ -0,0 +1,214 @@
+"""Opt-in per-command profiling for the CLI handlers.
+
+Enabled with ``--profile`` or FOOTBALL_PROFILE=1. Every ``*_func`` handler is
+wrapped to record its wall time, the time spent writing output, and each SQL
+statement it ran (via the engine's cursor events) with its duration and row
+count. A summary goes to stderr after each command; with ``--profile-log`` or
+FOOTBALL_PROFILE_LOG the same record is appended to a JSON lines file.
+"""
+import functools
+import json
+import sys
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SLOWEST = 3
+SQL_PREVIEW = 120
+
+
+class CommandProfile:
+    """Measurements for a single handler call."""
+
+    def __init__(self, command):
+        self.command = command
+        self.started_at = time.time()
+        self.wall = 0.0
+        self.output = 0.0
+        self.statements = []
+
+    @property
+    def sql(self):
+        return sum(s['seconds'] for s in self.statements)
+
+    @property
+    def rows(self):
+        return sum(s['rows'] for s in self.statements)
+
+    def slowest(self, n=SLOWEST):
+        return sorted(self.statements, key=lambda s: s['seconds'], reverse=True)[:n]
+
+    def as_dict(self):
+        def ms(seconds):
+            return round(seconds * 1000, 3)
+        return {
+            'command': self.command,
+            'started_at': self.started_at,
+            'wall_ms': ms(self.wall),
+            'sql_ms': ms(self.sql),
+            'output_ms': ms(self.output),
+            'statements': len(self.statements),
+            'rows': self.rows,
+            'errors': sum(1 for s in self.statements if s.get('error')),
+            'slowest': [{'sql': s['sql'], 'ms': ms(s['seconds']), 'rows': s['rows']} for s in self.slowest()],
+        }
+
+    def summary(self):
+        lines = [
+            f"[profile] {self.command}: {self.wall * 1000:.1f} ms total, "
+            f"{len(self.statements)} statements in {self.sql * 1000:.1f} ms, "
+            f"{self.rows} rows, {self.output * 1000:.1f} ms printing"
+        ]
+        for s in self.slowest():
+            sql = ' '.join(s['sql'].split())
+            if len(sql) > SQL_PREVIEW:
+                sql = sql[:SQL_PREVIEW - 3] + '...'
+            lines.append(f"[profile]   {s['seconds'] * 1000:8.2f} ms {s['rows']:>7} rows  {sql}")
+        return "\n".join(lines)
+
+
+class _CountingCursor:
+    """Passes fetches through to the DBAPI cursor, counting the rows returned."""
+
+    def __init__(self, cursor, statement):
+        self._cursor = cursor
+        self._statement = statement
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._statement['rows'] += 1
+            yield row
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._statement['rows'] += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._statement['rows'] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._statement['rows'] += len(rows)
+        return rows
+
+
+class _TimedOutput:
+    """Wraps a stream to add the time spent in write() to a profile."""
+
+    def __init__(self, stream, profile):
+        self._stream = stream
+        self._profile = profile
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def write(self, s):
+        start = time.perf_counter()
+        try:
+            return self._stream.write(s)
+        finally:
+            self._profile.output += time.perf_counter() - start
+
+
+class Profiler:
+    """Collects a CommandProfile for each wrapped handler call, innermost first."""
+
+    def __init__(self, log_path=None, stream=None):
+        self.log_path = log_path
+        self.stream = stream
+        self.profiles = []
+        self._active = []
+
+    def start(self):
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(Engine, 'handle_error', self._handle_error)
+
+    def stop(self):
+        event.remove(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.remove(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.remove(Engine, 'handle_error', self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('profile_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['profile_start'].pop()
+        if not self._active:
+            return
+        # SQLite reports rowcount only for DML; SELECT rows are counted as fetched.
+        record = {'sql': statement, 'seconds': elapsed, 'rows': max(cursor.rowcount, 0)}
+        self._active[-1].statements.append(record)
+        if context is not None and cursor.description is not None:
+            context.cursor = _CountingCursor(cursor, record)
+
+    def _handle_error(self, context):
+        # A failed statement never reaches after_cursor_execute.
+        starts = context.connection.info.get('profile_start') if context.connection is not None else None
+        if not starts or context.statement is None:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        if self._active:
+            self._active[-1].statements.append(
+                {'sql': context.statement, 'seconds': elapsed, 'rows': 0, 'error': True})
+
+    def wrap(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profile = CommandProfile(fn.__name__)
+            self._active.append(profile)
+            stdout = sys.stdout
+            sys.stdout = _TimedOutput(stdout, profile)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profile.wall = time.perf_counter() - start
+                sys.stdout = stdout
+                self._active.pop()
+                self.report(profile)
+        wrapper.profiled = fn
+        return wrapper
+
+    def report(self, profile):
+        self.profiles.append(profile)
+        print(profile.summary(), file=self.stream or sys.stderr)
+        if self.log_path:
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(profile.as_dict()) + "\n")
+
+
+def instrument(namespace, log_path=None):
+    """Start profiling and wrap every ``*_func`` in namespace; returns the Profiler.
+
+    Calling it again on an instrumented namespace returns None and changes nothing.
+    """
+    if namespace.get('_profiler') is not None:
+        return None
+    profiler = Profiler(log_path)
+    profiler.start()
+    for name, value in list(namespace.items()):
+        if name.endswith('_func') and callable(value):
+            namespace[name] = profiler.wrap(value)
+    namespace['_profiler'] = profiler
+    return profiler
+
+
+def uninstrument(namespace):
+    """Undo instrument(), restoring the original handlers."""
+    profiler = namespace.get('_profiler')
+    if profiler is None:
+        return
+    profiler.stop()
+    for name, value in list(namespace.items()):
+        if hasattr(value, 'profiled'):
+            namespace[name] = value.profiled
+    namespace['_profiler'] = None
@@ -0,0 +1,130 @@
+import math
+import multiprocessing
+import os
+import pathlib
+import sqlite3
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+# Only the standard library is imported here: workers are spawned, so every
+# one of them imports this module before it can start reading.
+
+TeamReport = namedtuple('TeamReport', 'team_id players matches goals assists mean std min max')
+ReportResult = namedtuple('ReportResult', 'teams ranges workers elapsed')
+
+# Ranges per worker: more, smaller ranges than workers, so a worker that
+# drew a busy range doesn't leave the others idle at the end.
+RANGES_PER_WORKER = 4
+
+# Per team, one row per range: each member's totals come from the stats of
+# that range's players only, and a player lies in exactly one range, so the
+# partials can simply be added up (min/max combined) afterwards. Members with
+# no stats count as 0. Both scans are index range scans: stats through
+# (player_id, goals, assists) or (season, player_id, goals, assists), and
+# player_teams through its primary key; "+pt.team_id" stops SQLite from
+# reading every membership through the team index to save the GROUP BY sort.
+_PARTIAL_SQL = """
+SELECT pt.team_id, count(*), sum(coalesce(t.matches, 0)), sum(coalesce(t.goals, 0)),
+       sum(coalesce(t.assists, 0)), sum(coalesce(t.goals, 0) * coalesce(t.goals, 0)),
+       min(coalesce(t.goals, 0)), max(coalesce(t.goals, 0))
+FROM player_teams pt LEFT JOIN (
+    SELECT player_id, count(*) AS matches, sum(coalesce(goals, 0)) AS goals, sum(coalesce(assists, 0)) AS assists
+    FROM stats WHERE {where} GROUP BY player_id
+) t ON t.player_id = pt.player_id
+WHERE pt.player_id BETWEEN :low AND :high
+GROUP BY +pt.team_id
+"""
+
+
+def read_only_uri(path):
+    """A SQLite URI opening the database file at path read-only."""
+    return pathlib.Path(path).resolve().as_uri() + '?mode=ro'
+
+
+def database_path(engine):
+    """The file behind a SQLite engine, or ValueError if it has none other processes could open."""
+    path = engine.url.database
+    if engine.dialect.name != 'sqlite' or not path or path == ':memory:' or path.startswith('file:'):
+        raise ValueError("Parallel reports need a SQLite database file")
+    return path
+
+
+def player_ranges(path, count):
+    """Split the player ids in the database into at most count (low, high) ranges of similar width."""
+    connection = sqlite3.connect(read_only_uri(path), uri=True)
+    try:
+        low, high = connection.execute("SELECT min(id), max(id) FROM players").fetchone()
+    finally:
+        connection.close()
+    if low is None:
+        return []
+    width = max(-(-(high - low + 1) // count), 1)
+    return [(start, min(start + width - 1, high)) for start in range(low, high + 1, width)]
+
+
+def team_partials(path, low, high, season=None):
+    """Partial team aggregates over the players with ids from low to high.
+
+    Runs in a worker process on its own read-only connection. Returns
+    [(team_id, players, matches, goals, assists, goals_squared, min, max), ...].
+    """
+    where = "player_id BETWEEN :low AND :high"
+    if season is not None:
+        where = "season = :season AND " + where
+    connection = sqlite3.connect(read_only_uri(path), uri=True)
+    try:
+        return connection.execute(_PARTIAL_SQL.format(where=where),
+                                  {'low': low, 'high': high, 'season': season}).fetchall()
+    finally:
+        connection.close()
+
+
+def merge_partials(partials):
+    """Combine team_partials results into one TeamReport per team, in team id order."""
+    merged = {}
+    for rows in partials:
+        for team_id, players, matches, goals, assists, squares, least, most in rows:
+            total = merged.get(team_id)
+            if total is None:
+                merged[team_id] = [players, matches, goals, assists, squares, least, most]
+            else:
+                total[0] += players
+                total[1] += matches
+                total[2] += goals
+                total[3] += assists
+                total[4] += squares
+                total[5] = min(total[5], least)
+                total[6] = max(total[6], most)
+    reports = []
+    for team_id in sorted(merged):
+        players, matches, goals, assists, squares, least, most = merged[team_id]
+        mean = goals / players
+        std = math.sqrt(max(squares / players - mean * mean, 0.0))
+        reports.append(TeamReport(team_id, players, matches, goals, assists, mean, std, least, most))
+    return reports
+
+
+def team_report(path, workers=None, season=None):
+    """Per-team totals and the spread of goals across each team's players, read in parallel.
+
+    Player ids are split into ranges that a pool of worker processes reads on
+    their own read-only connections; their partial aggregates are merged here.
+    workers defaults to the number of CPUs; with 1 every range is read in this
+    process. Each range is read in one transaction, but ranges are read at
+    different moments, so a write committed mid-report may show up in some
+    ranges and not others.
+    """
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("Workers must be at least 1")
+    ranges = player_ranges(path, workers * RANGES_PER_WORKER if workers > 1 else 1)
+    if workers == 1 or len(ranges) <= 1:
+        partials = [team_partials(path, low, high, season) for low, high in ranges]
+    else:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=context) as pool:
+            futures = [pool.submit(team_partials, path, low, high, season) for low, high in ranges]
+            partials = [future.result() for future in futures]
+    return ReportResult(merge_partials(partials), len(ranges), workers, time.perf_counter() - start)
@@ -0,0 +1,130 @@
+import time
+
+from sqlalchemy import text
+
+from lib.importer import read_rows
+
+
+class RosterResult:
+    """Memberships changed by a bulk roster operation."""
+
+    def __init__(self, added=0, skipped=0, removed=0, rejected=0, elapsed=0.0):
+        self.added = added
+        self.skipped = skipped
+        self.removed = removed
+        self.rejected = rejected
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return (f"<RosterResult(added={self.added}, skipped={self.skipped}, removed={self.removed}, "
+                f"rejected={self.rejected}, elapsed={self.elapsed:.3f})>")
+
+
+def parse_pair_row(row):
+    """Turn a raw record into (player_id, team_id, from_team_id), raising ValueError if invalid.
+
+    from_team_id is optional and None when absent.
+    """
+    if not isinstance(row, dict):
+        raise ValueError("Row must have player_id and team_id")
+    values = []
+    for key in ('player_id', 'team_id', 'from_team_id'):
+        value = row.get(key)
+        if value in (None, ''):
+            if key != 'from_team_id':
+                raise ValueError(f"Row must have a {key}")
+            value = None
+        else:
+            value = int(value.strip()) if isinstance(value, str) else value
+            if not isinstance(value, int):
+                raise ValueError(f"{key} must be an integer")
+        values.append(value)
+    return tuple(values)
+
+
+def read_pairs(path):
+    """Return the valid (player_id, team_id, from_team_id) rows of a CSV or JSONL file, and how many were invalid."""
+    pairs = []
+    invalid = 0
+    for row in read_rows(path):
+        try:
+            pairs.append(parse_pair_row(row))
+        except (ValueError, TypeError):
+            invalid += 1
+    return pairs, invalid
+
+
+def _load_moves(session, pairs):
+    """Fill temp.roster_moves with pairs and drop those naming a missing player or team.
+
+    Returns how many were dropped.
+    """
+    session.execute(text("DROP TABLE IF EXISTS temp.roster_moves"))
+    session.execute(text(
+        "CREATE TEMP TABLE roster_moves (player_id INTEGER NOT NULL, team_id INTEGER NOT NULL, from_team_id INTEGER)"
+    ))
+    if pairs:
+        session.execute(text("INSERT INTO roster_moves VALUES (:player_id, :team_id, :from_team_id)"), [
+            {'player_id': p, 'team_id': t, 'from_team_id': f} for p, t, f in pairs
+        ])
+    missing = session.execute(text(
+        "DELETE FROM roster_moves WHERE player_id NOT IN (SELECT id FROM players) "
+        "OR team_id NOT IN (SELECT id FROM teams) "
+        "OR (from_team_id IS NOT NULL AND from_team_id NOT IN (SELECT id FROM teams))"
+    )).rowcount
+    session.execute(text("CREATE INDEX temp.ix_roster_moves ON roster_moves (player_id, team_id)"))
+    return missing
+
+
+def _add_memberships(session):
+    """Insert every (player_id, team_id) in roster_moves.
+
+    Returns how many memberships were added and how many rows were skipped
+    because the membership already existed or the row was repeated.
+    """
+    rows = session.execute(text("SELECT count(*) FROM roster_moves")).scalar()
+    # "WHERE true" keeps SQLite from reading ON CONFLICT as a join constraint.
+    added = session.execute(text(
+        "INSERT INTO player_teams (player_id, team_id) "
+        "SELECT DISTINCT player_id, team_id FROM roster_moves WHERE true ON CONFLICT DO NOTHING"
+    )).rowcount
+    return added, rows - added
+
+
+def assign_roster(session, pairs):
+    """Add players to teams from (player_id, team_id[, from_team_id]) pairs in a few set-based statements.
+
+    Pairs that are already memberships (or repeated) are skipped, and pairs
+    naming a missing player or team are rejected. from_team_id is ignored.
+    Nothing is committed; the caller decides whether to keep the result.
+    """
+    start = time.perf_counter()
+    result = RosterResult(rejected=_load_moves(session, pairs))
+    result.added, result.skipped = _add_memberships(session)
+    session.execute(text("DROP TABLE temp.roster_moves"))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def transfer_players(session, pairs):
+    """Move players to new teams from (player_id, team_id[, from_team_id]) pairs.
+
+    With from_team_id the player leaves only that team; without it they
+    leave every team not named for them in pairs (a player listed with two
+    teams ends up in exactly those two). Then they join team_id, skipping
+    memberships that already exist. Nothing is committed.
+    """
+    start = time.perf_counter()
+    result = RosterResult(rejected=_load_moves(session, pairs))
+    # Driven from the moves, so each player's memberships are found through
+    # the player_teams primary key rather than by scanning every roster.
+    result.removed = session.execute(text(
+        "DELETE FROM player_teams WHERE rowid IN ("
+        "SELECT pt.rowid FROM roster_moves m JOIN player_teams pt ON pt.player_id = m.player_id "
+        "WHERE (m.from_team_id IS NULL OR pt.team_id = m.from_team_id) "
+        "AND NOT EXISTS (SELECT 1 FROM roster_moves k WHERE k.player_id = pt.player_id AND k.team_id = pt.team_id))"
+    )).rowcount
+    result.added, result.skipped = _add_memberships(session)
+    session.execute(text("DROP TABLE temp.roster_moves"))
+    result.elapsed = time.perf_counter() - start
+    return result
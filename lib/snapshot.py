@@ -0,0 +1,546 @@
+import datetime
+import itertools
+import json
+import mmap
+import os
+import re
+import struct
+import time
+import unicodedata
+
+import numpy
+
+from lib.models.change_log import LAST_CHANGE_SQL
+from lib.models.leaderboard import LeaderboardEntry
+from lib.models.queries import BootColorEntry, PlayerProfile, TeamPlayer
+from lib.models.search import KINDS, SearchResult
+from lib.models.season import RangeTotal, SeasonTotal
+
+# Stored in place of a missing season or match date.
+NO_SEASON = -1
+NO_DAY = numpy.iinfo(numpy.int32).min
+EPOCH = datetime.date(1970, 1, 1)
+
+# Snapshot files (see Snapshot.save): MAGIC, the format version and the
+# length of a JSON header as little-endian uint32s, the header, then each
+# array's raw bytes at an ALIGNMENT-aligned offset the header records. Bump
+# FORMAT_VERSION whenever the arrays or their meaning change, so files
+# written by older code are rebuilt instead of misread.
+MAGIC = b'FBSNAP\r\n'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct('<8sII')
+
+# The arrays a snapshot file holds, besides the NAME_TABLES' data and offsets.
+ARRAYS = (
+    'player_ids', 'goals', 'assists', 'appearances', 'player_colors', 'stat_offsets',
+    'team_ids', 'player_team_offsets', 'player_teams', 'team_player_offsets', 'team_players',
+    'stat_player', 'stat_goals', 'stat_assists', 'stat_season', 'stat_day',
+    'boot_color_ids', 'boot_color_players', 'boot_color_codes',
+)
+NAME_TABLES = ('player_names', 'player_folded', 'team_names', 'team_folded')
+
+# Metrics as functions of (goals, assists) arrays, as in lib/models/leaderboard.py.
+METRICS = {
+    'goals': lambda goals, assists: goals,
+    'assists': lambda goals, assists: assists,
+    'contributions': lambda goals, assists: goals + assists,
+}
+
+
+def _narrow(values):
+    """values as the smallest signed integer dtype that holds them all."""
+    for dtype in (numpy.int8, numpy.int16, numpy.int32):
+        info = numpy.iinfo(dtype)
+        if not len(values) or (values.min() >= info.min and values.max() <= info.max):
+            return values.astype(dtype)
+    return values.astype(numpy.int64)
+
+
+def _fold(name):
+    """name lowercased with accents removed, as the search index's tokenizer sees it."""
+    return "".join(c for c in unicodedata.normalize('NFKD', name) if not unicodedata.combining(c)).lower()
+
+
+def _aligned(size):
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+def _day(date):
+    return (date - EPOCH).days
+
+
+class NameTable:
+    """Names interned into one UTF-8 buffer, with the byte offset where each one starts.
+
+    Name i is data[offsets[i]:offsets[i + 1] - 1]; every name is followed by a
+    newline, so a regular expression can scan all of them in one pass. Both
+    arrays may be mapped from a snapshot file.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, names):
+        encoded = [name.encode() + b"\n" for name in names]
+        offsets = numpy.zeros(len(encoded) + 1, dtype=numpy.int64)
+        numpy.cumsum([len(name) for name in encoded], out=offsets[1:])
+        return cls(numpy.frombuffer(b"".join(encoded), dtype=numpy.uint8), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.encoded(i).decode()
+
+    def encoded(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1] - 1].tobytes()
+
+    def at(self, positions):
+        """Indexes of the names containing each of the byte positions."""
+        return numpy.searchsorted(self.offsets, positions, side='right') - 1
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.offsets.nbytes
+
+
+def _csr(groups, members, size):
+    """(offsets, members) adjacency arrays: group g's members are members[offsets[g]:offsets[g + 1]], in input order."""
+    order = numpy.argsort(groups, kind='stable')
+    offsets = numpy.zeros(size + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.bincount(groups, minlength=size), out=offsets[1:])
+    return offsets, members[order].astype(numpy.int32)
+
+
+def _index(ids, values):
+    """Positions of values in the sorted ids array, -1 where a value isn't there."""
+    if not len(ids):
+        return numpy.full(len(values), -1, dtype=numpy.int64)
+    positions = numpy.searchsorted(ids, values)
+    positions[positions == len(ids)] = 0
+    return numpy.where(ids[positions] == values, positions, -1)
+
+
+def _columns(cursor, sql, width, count):
+    """Run sql and return its integer columns as a list of width arrays, without per-row objects."""
+    cursor.execute(sql)
+    data = numpy.fromiter(itertools.chain.from_iterable(cursor), dtype=numpy.int64, count=count * width)
+    return list(data.reshape(count, width).T)
+
+
+def _top_with_ties(values, limit):
+    """Positions of values whose rank (1 + number of larger values) is at most limit."""
+    if len(values) <= limit:
+        return numpy.arange(len(values))
+    kth = numpy.partition(values, len(values) - limit)[len(values) - limit]
+    return numpy.flatnonzero(values >= kth)
+
+
+def _ranks(values):
+    """SQL rank() of each value, largest first."""
+    ordered = numpy.sort(-values)
+    return numpy.searchsorted(ordered, -values, side='left') + 1
+
+
+class Snapshot:
+    """The players, teams, rosters, stats and boot colors held in memory as NumPy columns.
+
+    Built once from the database with load(), then answers the same read
+    queries as lib/models (same names, arguments and result namedtuples,
+    without the session) from arrays: rows are addressed by their position in
+    the sorted id columns, player<->team memberships are kept as CSR
+    adjacency in both directions and names are interned in NameTables.
+    A snapshot does not see later writes; is_stale() tells when it should be
+    reloaded. save() writes one to a file that open() maps back without
+    copying or parsing the arrays.
+    """
+
+    path = None
+
+    @classmethod
+    def load(cls, engine):
+        """Read every table in one read transaction and build a snapshot from it."""
+        start = time.perf_counter()
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            cursor.execute("BEGIN")
+            try:
+                snapshot = cls._read(cursor)
+            finally:
+                cursor.execute("COMMIT")
+        finally:
+            raw.close()
+        snapshot.load_time = time.perf_counter() - start
+        return snapshot
+
+    @classmethod
+    def _read(cls, cursor):
+        self = cls()
+        self.change = cursor.execute(LAST_CHANGE_SQL).fetchone()[0]
+
+        rows = cursor.execute("SELECT id, name FROM players ORDER BY id").fetchall()
+        self.player_ids = numpy.array([row[0] for row in rows], dtype=numpy.int64)
+        self.player_names = NameTable.build([row[1] for row in rows])
+        self.player_folded = NameTable.build([_fold(row[1]) for row in rows])
+        rows = cursor.execute("SELECT id, name FROM teams ORDER BY id").fetchall()
+        self.team_ids = numpy.array([row[0] for row in rows], dtype=numpy.int64)
+        self.team_names = NameTable.build([row[1] for row in rows])
+        self.team_folded = NameTable.build([_fold(row[1]) for row in rows])
+        del rows
+        players, teams = len(self.player_ids), len(self.team_ids)
+
+        count = cursor.execute("SELECT count(*) FROM player_teams").fetchone()[0]
+        player_id, team_id = _columns(cursor, "SELECT player_id, team_id FROM player_teams ORDER BY player_id, team_id",
+                                      2, count)
+        player, team = _index(self.player_ids, player_id), _index(self.team_ids, team_id)
+        known = (player >= 0) & (team >= 0)
+        player, team = player[known], team[known]
+        self.player_team_offsets, self.player_teams = _csr(player, team, players)
+        self.team_player_offsets, self.team_players = _csr(team, player, teams)
+
+        # All-time totals come from player_totals, which also counts archived seasons.
+        self.goals = numpy.zeros(players, dtype=numpy.int32)
+        self.assists = numpy.zeros(players, dtype=numpy.int32)
+        self.appearances = numpy.zeros(players, dtype=numpy.int32)
+        count = cursor.execute("SELECT count(*) FROM player_totals").fetchone()[0]
+        player_id, goals, assists, appearances = _columns(
+            cursor, "SELECT player_id, goals, assists, appearances FROM player_totals", 4, count)
+        player = _index(self.player_ids, player_id)
+        known = player >= 0
+        self.goals[player[known]] = goals[known]
+        self.assists[player[known]] = assists[known]
+        self.appearances[player[known]] = appearances[known]
+
+        # Stats are sorted by player, so stat_offsets gives each player's rows.
+        where = "WHERE player_id IS NOT NULL"
+        count = cursor.execute(f"SELECT count(*) FROM stats {where}").fetchone()[0]
+        player_id, goals, assists, season, day = _columns(cursor, (
+            f"SELECT player_id, coalesce(goals, 0), coalesce(assists, 0), coalesce(season, {NO_SEASON}), "
+            f"coalesce(CAST(julianday(match_date) - 2440587.5 AS INTEGER), {NO_DAY}) FROM stats {where}"
+        ), 5, count)
+        player = _index(self.player_ids, player_id)
+        order = numpy.argsort(player, kind='stable')
+        order = order[player[order] >= 0]
+        self.stat_player = player[order].astype(numpy.int32)
+        self.stat_goals = _narrow(goals[order])
+        self.stat_assists = _narrow(assists[order])
+        self.stat_season = _narrow(season[order])
+        self.stat_day = day[order].astype(numpy.int32)
+        self.stat_offsets = numpy.zeros(players + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(self.stat_player, minlength=players), out=self.stat_offsets[1:])
+        del player_id, goals, assists, season, day, player, order
+
+        rows = cursor.execute("SELECT id, player_id, color FROM boot_colors ORDER BY id").fetchall()
+        self.colors = tuple(sorted({row[2] for row in rows if row[2] is not None}))
+        codes = {color: code for code, color in enumerate(self.colors)}
+        self.boot_color_ids = numpy.array([row[0] for row in rows], dtype=numpy.int64)
+        self.boot_color_players = _index(self.player_ids, numpy.array([-1 if row[1] is None else row[1]
+                                                                       for row in rows], dtype=numpy.int64))
+        self.boot_color_players = self.boot_color_players.astype(numpy.int32)
+        self.boot_color_codes = numpy.array([codes.get(row[2], -1) for row in rows], dtype=numpy.int8)
+        # A player's color is their first boot color's.
+        self.player_colors = numpy.full(players, -1, dtype=numpy.int8)
+        known = numpy.flatnonzero(self.boot_color_players >= 0)[::-1]
+        self.player_colors[self.boot_color_players[known]] = self.boot_color_codes[known]
+
+        self._season_totals = {}
+        return self
+
+    def save(self, path, database):
+        """Write the snapshot to path in the snapshot file format, replacing any file there atomically.
+
+        database identifies the database file it was read from, so open_snapshot()
+        won't use it for another.
+        """
+        arrays = {name: getattr(self, name) for name in ARRAYS}
+        for name in NAME_TABLES:
+            table = getattr(self, name)
+            arrays[f'{name}.data'], arrays[f'{name}.offsets'] = table.data, table.offsets
+        layout, size = {}, 0
+        for name, array in arrays.items():
+            layout[name] = (array.dtype.str, len(array), size)
+            size += _aligned(array.nbytes)
+        header = json.dumps({'database': database, 'change': self.change, 'colors': self.colors,
+                             'arrays': layout}).encode()
+        start = _aligned(_PREAMBLE.size + len(header))
+        temporary = f"{path}.tmp"
+        with open(temporary, 'wb') as f:
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(start + layout[name][2])
+                f.write(numpy.ascontiguousarray(array).data)
+            f.truncate(start + size)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+
+    @classmethod
+    def open(cls, path):
+        """Map a file written by save(). Its arrays are views of the mapping, paged in as queries touch them."""
+        start = time.perf_counter()
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < _PREAMBLE.size:
+            raise ValueError(f"{path} is not a snapshot file")
+        magic, version, length = _PREAMBLE.unpack_from(mapped)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} is a version {version} snapshot file; this version reads {FORMAT_VERSION}")
+        header = json.loads(mapped[_PREAMBLE.size:_PREAMBLE.size + length])
+        offset = _aligned(_PREAMBLE.size + length)
+        arrays = {name: numpy.frombuffer(mapped, dtype=dtype, count=count, offset=offset + at)
+                  for name, (dtype, count, at) in header['arrays'].items()}
+
+        self = cls()
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        for name in NAME_TABLES:
+            setattr(self, name, NameTable(arrays[f'{name}.data'], arrays[f'{name}.offsets']))
+        self.colors = tuple(header['colors'])
+        self.change = header['change']
+        self.database = header['database']
+        self.path = path
+        self._season_totals = {}
+        self.load_time = time.perf_counter() - start
+        return self
+
+    def is_stale(self, engine):
+        """True if a logged table has been written since the snapshot was loaded."""
+        raw = engine.raw_connection()
+        try:
+            return raw.cursor().execute(LAST_CHANGE_SQL).fetchone()[0] != self.change
+        finally:
+            raw.close()
+
+    def row_counts(self):
+        return {
+            'players': len(self.player_ids),
+            'teams': len(self.team_ids),
+            'player_teams': len(self.player_teams),
+            'stats': len(self.stat_player),
+            'boot_colors': len(self.boot_color_ids),
+        }
+
+    def memory_usage(self):
+        """Bytes held by each part of the snapshot."""
+        def size(*arrays):
+            return sum(array.nbytes for array in arrays)
+        return {
+            'players': size(self.player_ids, self.player_names, self.goals, self.assists, self.appearances,
+                            self.player_colors, self.stat_offsets),
+            'teams': size(self.team_ids, self.team_names),
+            'player_teams': size(self.player_team_offsets, self.player_teams, self.team_player_offsets,
+                                 self.team_players),
+            'stats': size(self.stat_player, self.stat_goals, self.stat_assists, self.stat_season, self.stat_day),
+            'boot_colors': size(self.boot_color_ids, self.boot_color_players, self.boot_color_codes),
+            'search': size(self.player_folded, self.team_folded),
+            'season_totals': sum(size(*totals) for totals in self._season_totals.values()),
+        }
+
+    # --- Lookups -------------------------------------------------------------
+
+    def _player(self, player_id):
+        i = numpy.searchsorted(self.player_ids, player_id)
+        return int(i) if i < len(self.player_ids) and self.player_ids[i] == player_id else None
+
+    def _team(self, team_id):
+        i = numpy.searchsorted(self.team_ids, team_id)
+        return int(i) if i < len(self.team_ids) and self.team_ids[i] == team_id else None
+
+    def get_player_name(self, player_id):
+        i = self._player(player_id)
+        return None if i is None else self.player_names[i]
+
+    def get_team_name(self, team_id):
+        i = self._team(team_id)
+        return None if i is None else self.team_names[i]
+
+    def get_player_profile(self, player_id):
+        i = self._player(player_id)
+        if i is None:
+            return None
+        color = self.player_colors[i]
+        teams = self.player_teams[self.player_team_offsets[i]:self.player_team_offsets[i + 1]]
+        return PlayerProfile(int(self.player_ids[i]), self.player_names[i], int(self.goals[i]), int(self.assists[i]),
+                             int(self.appearances[i]), self.colors[color] if color >= 0 else None,
+                             tuple(self.team_names[t] for t in teams))
+
+    def iter_boot_colors(self, after_id=0, limit=None):
+        start = int(numpy.searchsorted(self.boot_color_ids, after_id, side='right'))
+        end = len(self.boot_color_ids) if limit is None else min(start + limit, len(self.boot_color_ids))
+        for i in range(start, end):
+            player, code = self.boot_color_players[i], self.boot_color_codes[i]
+            yield BootColorEntry(int(self.boot_color_ids[i]), self.colors[code] if code >= 0 else None,
+                                 self.player_names[player] if player >= 0 else None)
+
+    def iter_team_players(self, team_id, after_id=0, limit=None):
+        t = self._team(team_id)
+        if t is None:
+            return
+        members = self.team_players[self.team_player_offsets[t]:self.team_player_offsets[t + 1]]
+        ids = self.player_ids[members]
+        start = int(numpy.searchsorted(ids, after_id, side='right'))
+        end = len(ids) if limit is None else min(start + limit, len(ids))
+        for i in range(start, end):
+            yield TeamPlayer(int(ids[i]), self.player_names[members[i]])
+
+    # --- Rankings and totals -------------------------------------------------
+
+    def _totals(self, season):
+        """(goals, assists, appearances) per player, all-time or for one season (computed once per season)."""
+        if season is None:
+            return self.goals, self.assists, self.appearances
+        totals = self._season_totals.get(season)
+        if totals is None:
+            rows = self.stat_season == season
+            players, size = self.stat_player[rows], len(self.player_ids)
+            totals = (numpy.bincount(players, weights=self.stat_goals[rows], minlength=size).astype(numpy.int32),
+                      numpy.bincount(players, weights=self.stat_assists[rows], minlength=size).astype(numpy.int32),
+                      numpy.bincount(players, minlength=size).astype(numpy.int32))
+            self._season_totals[season] = totals
+        return totals
+
+    def leaderboard(self, metric='goals', limit=3, team_id=None, per_team=False, season=None):
+        if metric not in METRICS:
+            raise ValueError(f"Metric must be one of: {', '.join(METRICS)}")
+        if limit < 1:
+            raise ValueError("Limit must be a positive integer")
+        goals, assists, appearances = self._totals(season)
+        values = METRICS[metric](goals.astype(numpy.int64), assists)
+
+        if not per_team and team_id is None:
+            players = numpy.flatnonzero(appearances > 0)
+            kept = _top_with_ties(values[players], limit)
+            players, ranks = players[kept], _ranks(values[players[kept]])
+            entries = [LeaderboardEntry(int(rank), None, self.player_names[p], int(values[p]))
+                       for p, rank in zip(players, ranks)]
+            return sorted(entries, key=lambda entry: (entry.rank, entry.name))
+
+        if team_id is not None:
+            t = self._team(team_id)
+            if t is None:
+                return []
+            players = self.team_players[self.team_player_offsets[t]:self.team_player_offsets[t + 1]]
+            teams = numpy.full(len(players), t)
+        else:
+            players = self.team_players
+            teams = numpy.repeat(numpy.arange(len(self.team_ids)), numpy.diff(self.team_player_offsets))
+        played = appearances[players] > 0
+        players, teams = players[played], teams[played]
+        member_values = values[players]
+        order = numpy.lexsort((-member_values, teams))
+        players, teams, member_values = players[order], teams[order], member_values[order]
+        # Within each team (sorted by value, largest first) a player's rank is
+        # one more than the position of the first player with the same value.
+        position = numpy.arange(len(players))
+        new_team = numpy.ones(len(players), dtype=bool)
+        new_team[1:] = teams[1:] != teams[:-1]
+        new_value = new_team.copy()
+        new_value[1:] |= member_values[1:] != member_values[:-1]
+        team_start = numpy.maximum.accumulate(numpy.where(new_team, position, 0))
+        value_start = numpy.maximum.accumulate(numpy.where(new_value, position, 0))
+        ranks = value_start - team_start + 1
+        kept = numpy.flatnonzero(ranks <= limit)
+        entries = [LeaderboardEntry(int(ranks[i]), self.team_names[teams[i]], self.player_names[players[i]],
+                                    int(member_values[i])) for i in kept]
+        return sorted(entries, key=lambda entry: (entry.team_name, entry.rank, entry.name))
+
+    def _player_stats(self, player_id):
+        """The slice of the stat columns holding a player's rows (empty if they don't exist)."""
+        i = self._player(player_id)
+        if i is None:
+            return slice(0, 0)
+        return slice(self.stat_offsets[i], self.stat_offsets[i + 1])
+
+    def player_seasons(self, player_id):
+        rows = self._player_stats(player_id)
+        seasons = self.stat_season[rows]
+        dated = seasons != NO_SEASON
+        found, group = numpy.unique(seasons[dated], return_inverse=True)
+        goals = numpy.bincount(group, weights=self.stat_goals[rows][dated], minlength=len(found))
+        assists = numpy.bincount(group, weights=self.stat_assists[rows][dated], minlength=len(found))
+        matches = numpy.bincount(group, minlength=len(found))
+        return [SeasonTotal(int(s), int(g), int(a), int(m)) for s, g, a, m in zip(found, goals, assists, matches)]
+
+    def totals_between(self, start, end, player_id=None, limit=10):
+        rows = self._player_stats(player_id) if player_id is not None else slice(None)
+        days = self.stat_day[rows]
+        chosen = (days >= _day(start)) & (days <= _day(end))
+        players, size = self.stat_player[rows][chosen], len(self.player_ids)
+        matches = numpy.bincount(players, minlength=size)
+        found = numpy.flatnonzero(matches)
+        goals = numpy.bincount(players, weights=self.stat_goals[rows][chosen], minlength=size).astype(numpy.int64)
+        assists = numpy.bincount(players, weights=self.stat_assists[rows][chosen], minlength=size).astype(numpy.int64)
+        found = found[_top_with_ties(goals[found], limit)]
+        totals = [RangeTotal(int(self.player_ids[p]), self.player_names[p], int(goals[p]), int(assists[p]),
+                             int(matches[p])) for p in found]
+        return sorted(totals, key=lambda total: (-total.goals, total.name))[:limit]
+
+    # --- Search --------------------------------------------------------------
+
+    def search_names(self, query, kind=None, limit=10):
+        """Like lib.models.search.search_names, but the close matches are names containing every query word."""
+        if kind is not None and kind not in KINDS:
+            raise ValueError(f"Kind must be one of: {', '.join(KINDS)}")
+        if limit < 1:
+            raise ValueError("Limit must be a positive integer")
+        words = re.findall(r"\w+", _fold(query))
+        if not words:
+            return []
+        tables = [(label, ids, names, folded) for label, ids, names, folded in (
+            ('player', self.player_ids, self.player_names, self.player_folded),
+            ('team', self.team_ids, self.team_names, self.team_folded),
+        ) if kind in (None, label)]
+
+        def matches(pattern, exclude):
+            need = limit - len(exclude)
+            found = []
+            for label, ids, names, folded in tables:
+                patterns = [re.compile(pattern + re.escape(word.encode())) for word in words]
+                positions = [m.start() for m in patterns[0].finditer(memoryview(folded.data))]
+                candidates = numpy.unique(folded.at(positions))
+                # Shortest names first (then by id), so the scan can stop at the first ones matching every word.
+                taken = 0
+                for i in candidates[numpy.argsort(numpy.diff(folded.offsets)[candidates], kind='stable')]:
+                    name = folded.encoded(i)
+                    if (label, i) not in exclude and all(p.search(name) for p in patterns[1:]):
+                        found.append((len(name), KINDS[label][1], int(ids[i]), label, i))
+                        taken += 1
+                        if taken == need:
+                            break
+            return [(label, i) for *_, label, i in sorted(found)[:need]]
+
+        # Names are searched as UTF-8 bytes, so every non-ASCII byte counts as part of a word.
+        found = matches(rb"(?<![\w\x80-\xff])", ())
+        prefix = len(found)
+        if len(found) < limit:
+            found += matches(b"", set(found))
+        return [SearchResult(label, int(self.player_ids[i] if label == 'player' else self.team_ids[i]),
+                             (self.player_names if label == 'player' else self.team_names)[i],
+                             'prefix' if n < prefix else 'fuzzy')
+                for n, (label, i) in enumerate(found)]
+
+
+def open_snapshot(path, engine):
+    """Map the snapshot file at path, first rebuilding it from engine's database if it can't be used as it is.
+
+    A file is rebuilt when it is missing, unreadable, from another format
+    version, for another database file, or older than the database's last
+    change. Returns (snapshot, rebuilt).
+    """
+    from lib.reports import database_path
+    database = os.path.abspath(database_path(engine))
+    try:
+        snapshot = Snapshot.open(path)
+        if snapshot.database == database and not snapshot.is_stale(engine):
+            return snapshot, False
+    except (OSError, ValueError):
+        pass
+    Snapshot.load(engine).save(path, database)
+    return Snapshot.open(path), True
@@ -0,0 +1,69 @@
+import datetime
+import pytest
+from lib.models import Session, Player, Team, Stat
+from lib.models.base import Base
+from sqlalchemy import create_engine
+
+numpy = pytest.importorskip('numpy')
+from lib import analytics
+
+@pytest.fixture
+def setup_db():
+    engine = create_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    messi, neymar, suarez = Player(name="Lionel Messi"), Player(name="Neymar"), Player(name="Luis Suarez")
+    barcelona, psg = Team(name="Barcelona"), Team(name="PSG")
+    barcelona.players.extend([messi, neymar, suarez])
+    psg.players.append(neymar)
+    session.add_all([barcelona, psg])
+    session.flush()
+    session.add_all([
+        Stat(messi.id, goals=0, assists=1),
+        Stat(messi.id, goals=1),
+        Stat(messi.id, goals=2, assists=1),
+        Stat(messi.id, goals=5, match_date=datetime.date(2024, 10, 1)),
+        Stat(neymar.id, goals=1, assists=3),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def test_player_analytics(setup_db):
+    stats = analytics.load_stats(setup_db.get_bind())
+    assert len(stats.player_id) == 5 and stats.goals.dtype == numpy.int64
+    result = analytics.player_analytics(stats)
+    assert list(result.player_id) == [1, 2]
+    assert list(result.matches) == [4, 1]
+    assert list(result.goals) == [8, 1]
+    assert list(result.contributions_per_match) == [2.5, 4.0]
+    assert list(result.goals_p50) == [1.5, 1.0]
+    assert result.goals_p90[0] == pytest.approx(numpy.percentile([0, 1, 2, 5], 90))
+    assert list(result.player_id[analytics.top(result, 'goals_per_match', 1)]) == [1]
+
+    assert list(analytics.player_analytics(stats, min_matches=2).player_id) == [1]
+    season = analytics.player_analytics(analytics.load_stats(setup_db.get_bind(), season=2024))
+    assert list(season.goals) == [5]
+
+def test_grouped_percentiles_match_numpy():
+    rng = numpy.random.default_rng(0)
+    groups = rng.integers(0, 50, 5000)
+    values = rng.integers(0, 7, 5000)
+    result = analytics.grouped_percentiles(groups, values, (10, 50, 90), 51)
+    for group in (0, 17, 49):
+        expected = numpy.percentile(values[groups == group], [10, 50, 90])
+        assert result[:, group] == pytest.approx(expected)
+    assert numpy.isnan(result[:, 50]).all()
+
+def test_team_analytics(setup_db):
+    engine = setup_db.get_bind()
+    result = analytics.team_analytics(analytics.load_stats(engine), analytics.load_memberships(engine))
+    assert list(result.team_id) == [1, 2]
+    assert list(result.players) == [3, 1]
+    assert list(result.goals) == [9, 1]
+    assert result.mean[0] == 3.0
+    assert result.std[0] == pytest.approx(numpy.std([8, 1, 0]))
+    assert list(result.max) == [8, 1]
+    assert result.top_share[0] == pytest.approx(8 / 9)
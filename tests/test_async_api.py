@@ -0,0 +1,86 @@
+import asyncio
+import sqlite3
+import pytest
+from lib import async_api
+from lib.async_api import AsyncStore
+from lib.models import Session, Player, Team, Stat, BootColor
+from lib.models.base import Base
+from lib.models.cache import query_cache
+from lib.models.database import make_engine
+
+URL = 'sqlite:///test.db'
+
+@pytest.fixture
+def setup_db():
+    engine = make_engine(URL)
+    Base.metadata.create_all(engine)
+    with Session(bind=engine) as session:
+        barcelona = Team(name="Barcelona")
+        messi, neymar = Player(name="Lionel Messi"), Player(name="Neymar")
+        barcelona.players.extend([messi, neymar])
+        session.add(barcelona)
+        session.flush()
+        session.add_all([Stat(messi.id, goals=3), Stat(neymar.id, goals=1), BootColor(messi.id, "Gold")])
+        session.commit()
+    query_cache.clear()
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+@pytest.mark.parametrize('backend', ['threads', 'aiosqlite'])
+def test_backends(setup_db, backend):
+    if backend == 'aiosqlite':
+        pytest.importorskip('aiosqlite')
+        pytest.importorskip('greenlet', reason="SQLAlchemy's asyncio engine needs sqlalchemy[asyncio]")
+
+    async def main():
+        async with AsyncStore(URL, backend=backend, workers=4) as store:
+            profile, roster, missing, colors, board = await asyncio.gather(
+                store.player_profile(1),
+                store.team_roster(1),
+                store.team_roster(99),
+                store.boot_colors(),
+                store.leaderboard(limit=1),
+            )
+            many = await asyncio.gather(*(store.player_profile(2) for _ in range(50)))
+        return profile, roster, missing, colors, board, many
+
+    profile, roster, missing, colors, board, many = asyncio.run(main())
+    assert (profile.name, profile.goals, profile.teams) == ("Lionel Messi", 3, ("Barcelona",))
+    assert roster[0] == "Barcelona" and [p.name for p in roster[1]] == ["Lionel Messi", "Neymar"]
+    assert missing is None
+    assert [(c.player_name, c.color) for c in colors] == [("Lionel Messi", "Gold")]
+    assert [(e.name, e.value) for e in board] == [("Lionel Messi", 3)]
+    assert {p.name for p in many} == {"Neymar"}
+
+def test_sees_writes_from_another_connection(setup_db):
+    async def main():
+        async with AsyncStore(URL, backend='threads', workers=2) as store:
+            before = await store.player_profile(1), await store.team_roster(1)
+            # As the CLI in another process would: this process's sessions never see the write.
+            other = sqlite3.connect('test.db')
+            with other:
+                other.execute("UPDATE players SET name = 'Leo Messi' WHERE id = 1")
+                other.execute("DELETE FROM player_teams WHERE player_id = 2")
+            other.close()
+            return before, (await store.player_profile(1), await store.team_roster(1))
+
+    (profile, roster), (profile_after, roster_after) = asyncio.run(main())
+    assert profile.name == "Lionel Messi" and len(roster[1]) == 2
+    assert profile_after.name == "Leo Messi"
+    assert [p.name for p in roster_after[1]] == ["Leo Messi"]
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        AsyncStore(URL, backend='gevent')
+
+def test_unusable_aiosqlite_says_why(monkeypatch):
+    error = ImportError("The SQLAlchemy asyncio module requires that the Python 'greenlet' library is installed.")
+    monkeypatch.setattr(async_api, 'aiosqlite', None)
+    monkeypatch.setattr(async_api, '_aiosqlite_error', error)
+    with pytest.raises(ValueError, match="greenlet"):
+        AsyncStore(URL, backend='aiosqlite')
+    with pytest.warns(UserWarning, match="greenlet"):
+        store = AsyncStore(URL)
+    assert store.backend == 'threads'
+    asyncio.run(store.close())
@@ -0,0 +1,79 @@
+import pytest
+from lib.bulk_delete import count_players, delete_players
+from lib.models import Session, Player, Team, Stat, BootColor, PlayerTotal, player_teams
+from lib.models.base import Base
+from lib.models.database import make_engine
+from sqlalchemy import create_engine, func, select
+
+def make_session(engine):
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    team = Team(name="Barcelona")
+    for name in ("Lionel Messi", "Neymar", "Luis Suarez"):
+        player = Player(name=name)
+        player.teams.append(team)
+        session.add(player)
+        session.flush()
+        session.add_all([Stat(player.id, goals=2), BootColor(player.id, "Gold")])
+    session.commit()
+    return session
+
+@pytest.fixture(params=['enforced', 'unenforced'])
+def setup_db(request):
+    # make_engine turns on foreign key enforcement; a plain engine leaves it off.
+    engine = make_engine('sqlite:///test.db') if request.param == 'enforced' else create_engine('sqlite:///test.db')
+    session = make_session(engine)
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def count(session, table):
+    return session.execute(select(func.count()).select_from(table)).scalar()
+
+def test_delete_by_ids_removes_dependents(setup_db):
+    session = setup_db
+    result = delete_players(session, ids=[1, 2, 99])
+    session.commit()
+    assert result.players == 2
+    assert result.counts['stats'] == 2
+    assert count(session, Player) == 1
+    for table in (Stat, BootColor, PlayerTotal, player_teams):
+        assert count(session, table) == 1
+    assert count(session, Team) == 1
+
+def test_count_matches_delete(setup_db):
+    session = setup_db
+    counted = count_players(session, where="name LIKE 'L%'")
+    assert count(session, Player) == 3
+    assert counted.counts == delete_players(session, where="name LIKE 'L%'").counts
+    assert count_players(session, ids=[2, 99]).players == 1
+    assert count_players(session, ids=[]).players == 0
+
+def test_delete_by_where(setup_db):
+    session = setup_db
+    result = delete_players(session, where="name LIKE 'L%'")
+    session.commit()
+    assert result.players == 2
+    assert session.execute(select(Player.name)).scalars().all() == ["Neymar"]
+
+def test_delete_requires_one_selector(setup_db):
+    with pytest.raises(ValueError):
+        delete_players(setup_db)
+    with pytest.raises(ValueError):
+        delete_players(setup_db, ids=[1], where="1")
+
+def test_orm_delete_cascades_in_database():
+    engine = make_engine('sqlite:///test.db')
+    session = make_session(engine)
+    try:
+        session.delete(session.get(Player, 1))
+        session.delete(session.get(Team, 1))
+        session.commit()
+        assert count(session, Stat) == 2
+        assert count(session, BootColor) == 2
+        assert count(session, player_teams) == 0
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+        engine.dispose()
@@ -0,0 +1,112 @@
+import sqlite3
+import pytest
+from lib.models import Session, Player, Team, Stat
+from lib.models.base import Base
+from lib.models.cache import QueryCache, query_cache
+from lib.models.queries import get_player_profile, get_team_name, list_boot_colors
+from sqlalchemy import create_engine, insert, text
+
+@pytest.fixture
+def setup_db():
+    engine = create_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    query_cache.clear()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def test_lru_eviction_and_counters():
+    cache = QueryCache(maxsize=2)
+    for key in ('a', 'b', 'a', 'c', 'b'):
+        cache.get_or_compute(key, {'players'}, lambda: key.upper())
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 4, 2)
+    assert stats['size'] == 2
+
+def test_invalidation_by_table():
+    cache = QueryCache()
+    cache.get_or_compute('roster', {'players', 'player_teams'}, lambda: 1)
+    cache.get_or_compute('teams', {'teams'}, lambda: 2)
+    cache.get_or_compute('totals', {'player_totals'}, lambda: 3)
+    cache.invalidate({'stats'})
+    assert len(cache) == 2
+    cache.invalidate({'player_teams'})
+    assert len(cache) == 1
+
+def test_value_computed_across_a_write_is_not_stored():
+    cache = QueryCache()
+
+    def compute():
+        # Another thread writes to players while this value is being read.
+        cache.invalidate({'players'})
+        return 'old'
+
+    assert cache.get_or_compute('profile', {'players'}, compute) == 'old'
+    assert len(cache) == 0
+    assert cache.get_or_compute('profile', {'players'}, lambda: 'new') == 'new'
+    assert len(cache) == 1
+
+def test_profile_cached_until_player_changes(setup_db):
+    session = setup_db
+    player = Player(name="Lionel Messi")
+    session.add(player)
+    session.commit()
+    assert get_player_profile(session, player.id).goals == 0
+    hits = query_cache.hits
+    assert get_player_profile(session, player.id).goals == 0
+    assert query_cache.hits == hits + 1
+    session.add(Stat(player_id=player.id, goals=3))
+    session.commit()
+    assert get_player_profile(session, player.id).goals == 3
+
+def test_roster_change_invalidates_profile(setup_db):
+    session = setup_db
+    player, team = Player(name="Lionel Messi"), Team(name="Inter Miami")
+    session.add_all([player, team])
+    session.commit()
+    assert get_player_profile(session, player.id).teams == ()
+    player.teams.append(team)
+    session.commit()
+    assert get_player_profile(session, player.id).teams == ("Inter Miami",)
+
+def test_bulk_and_raw_sql_writes_invalidate(setup_db):
+    session = setup_db
+    session.execute(insert(Team), [{'name': "Barcelona"}])
+    session.commit()
+    assert get_team_name(session, 1) == "Barcelona"
+    session.execute(text("UPDATE teams SET name = 'FC Barcelona'"))
+    session.commit()
+    assert get_team_name(session, 1) == "FC Barcelona"
+
+def test_rollback_discards_uncommitted_reads(setup_db):
+    session = setup_db
+    assert list_boot_colors(session) == []
+    player = Player(name="Lionel Messi")
+    session.add(player)
+    session.flush()
+    assert get_team_name(session, 1) is None
+    session.execute(text("INSERT INTO teams (name) VALUES ('Ghost FC')"))
+    assert get_team_name(session, 1) == "Ghost FC"
+    session.rollback()
+    assert get_team_name(session, 1) is None
+
+def test_write_from_another_connection_is_seen(setup_db):
+    session = setup_db
+    session.add(Player(name="Lionel Messi"))
+    session.commit()
+    assert get_player_profile(session, 1).goals == 0
+    session.commit()
+    # As if another process wrote: no ORM session of this one sees the change.
+    other = sqlite3.connect('test.db')
+    with other:
+        other.execute("UPDATE players SET name = 'Leo Messi' WHERE id = 1")
+        other.execute("INSERT INTO teams (name) VALUES ('Inter Miami')")
+        other.execute("INSERT INTO player_teams (player_id, team_id) VALUES (1, 1)")
+    other.close()
+    profile = get_player_profile(session, 1)
+    assert (profile.name, profile.teams) == ("Leo Messi", ("Inter Miami",))
+    hits = query_cache.hits
+    assert get_player_profile(session, 1).name == "Leo Messi"
+    assert query_cache.hits == hits + 1
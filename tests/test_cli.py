@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import pytest
+from lib import cli
+from lib.models import Session, Player, Stat, engine as default_engine
+from lib.models.base import Base
+from lib.models.database import make_engine
+from sqlalchemy import event
+
+@pytest.fixture
+def engine():
+    engine = make_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    Session.configure(bind=engine)
+    yield engine
+    Session.configure(bind=default_engine)
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def test_subcommand(engine, capsys):
+    cli.cli.main(['add-player', 'Lionel Messi'], standalone_mode=False)
+    assert "Added player: Lionel Messi" in capsys.readouterr().out
+    with Session() as session:
+        assert session.query(Player).count() == 1
+
+def test_batch_runs_in_one_transaction(engine, capsys):
+    commits = []
+    event.listen(engine, 'commit', lambda conn: commits.append(conn))
+    cli.run_batch_func([
+        'add-player "Lionel Messi"',
+        'add-player "Lionel Messi"',  # duplicate only rolls back its own savepoint
+        '# comment',
+        'add-stat 1 2 1',
+        'add-stat 1 two 1',
+    ])
+    out = capsys.readouterr().out
+    assert "Error on line 2: 'add-player \"Lionel Messi\"' failed" in out
+    assert "Error on line 5" in out
+    assert "Batch committed: 2 commands run, 2 failed (lines 2, 5)" in out
+    assert len(commits) == 1
+    with Session() as session:
+        assert session.query(Player).count() == 1
+        assert session.query(Stat).count() == 1
+
+def test_failed_commands_exit_non_zero(engine, tmp_path, capsys):
+    assert cli.cli.main(['add-stat', '999', '1', '1'], standalone_mode=False) == 1
+    assert "Error: Player not found." in capsys.readouterr().out
+    assert not cli.cli.main(['add-player', 'Neymar'], standalone_mode=False)
+    commands = tmp_path / 'commands.txt'
+    commands.write_text('add-player Messi\nadd-stat 999 1 1\n')
+    assert cli.cli.main(['batch', str(commands)], standalone_mode=False) == 1
+    assert "Batch committed: 1 commands run, 1 failed (line 2)" in capsys.readouterr().out
+    with Session() as session:
+        assert session.query(Player).count() == 2
+
+def test_batch_refuses_commands_with_their_own_connection(engine, tmp_path, capsys):
+    assert cli.run_batch_func([
+        'add-player Neymar',
+        f'archive-season 2020 --to {tmp_path / "archive.db"}',
+        f'export {tmp_path / "export"}',
+    ]) is False
+    out = capsys.readouterr().out
+    assert "archive-season commits on its own connection and can't run inside a batch" in out
+    assert "Batch committed: 1 commands run, 2 failed (lines 2, 3)" in out
+    assert not (tmp_path / "export").exists()
+
+def test_batch_lines_must_name_a_command(engine, capsys, monkeypatch):
+    monkeypatch.setattr(cli, 'display_main_menu', lambda: pytest.fail("the menu started inside a batch"))
+    assert cli.run_batch_func(['--profile', 'add-player Neymar', 'no-such-command']) is False
+    out = capsys.readouterr().out
+    assert "Error on line 1: each line must start with a command, not '--profile'" in out
+    assert "Batch committed: 1 commands run, 2 failed (lines 1, 3)" in out
+
+def test_batch_commands_never_prompt(engine, capsys, monkeypatch):
+    monkeypatch.setattr('builtins.input', lambda prompt: pytest.fail("prompted inside a batch"))
+    assert cli.run_batch_func(['add-player Neymar', 'delete-player 1', 'delete-players --ids 1']) is False
+    out = capsys.readouterr().out
+    assert out.count("can't prompt; pass all arguments and --yes") == 2
+    assert "Batch committed: 1 commands run, 2 failed (lines 2, 3)" in out
+    with pytest.raises(cli.PromptInBatch), cli.single_transaction():
+        cli._ask(None, "Enter player ID: ")
+
+def test_delete_with_confirmation_flag(engine, capsys):
+    cli.run_batch_func(['add-player Neymar', 'delete-player 1 --yes'])
+    assert "Deleted player: Neymar" in capsys.readouterr().out
+    with Session() as session:
+        assert session.query(Player).count() == 0
+
+def test_delete_players_confirms_without_the_write_lock(engine, capsys, monkeypatch):
+    cli.run_batch_func(['add-player Neymar', 'add-player Messi'])
+
+    def answer(prompt):
+        # Another process can still write while the user decides.
+        other = sqlite3.connect('test.db', timeout=0)
+        other.execute("BEGIN IMMEDIATE")
+        other.rollback()
+        other.close()
+        return "yes"
+
+    monkeypatch.setattr('builtins.input', answer)
+    cli.cli.main(['delete-players', '--where', "name LIKE 'N%'"], standalone_mode=False)
+    assert "Deleted 1 players" in capsys.readouterr().out
+    with Session() as session:
+        assert session.query(Player).count() == 1
+
+def test_run_sql_limit_and_offset(engine, capsys):
+    cli.run_batch_func([f'add-player "Player {i}"' for i in range(5)])
+    capsys.readouterr()
+    cli.cli.main(['run-sql', 'SELECT name FROM players ORDER BY id', '--limit', '2', '--offset', '1'],
+                 standalone_mode=False)
+    lines = capsys.readouterr().out.splitlines()
+    assert "Player 1" in lines and "Player 2" in lines
+    assert "Player 0" not in lines and "Player 3" not in lines
+
+def test_snapshot_mode_reads_from_memory(engine, capsys, monkeypatch):
+    pytest.importorskip('numpy')
+    monkeypatch.setattr(cli, '_snapshot', None)
+    monkeypatch.setattr(cli, '_snapshot_pending', False)
+    cli.run_batch_func(['add-player "Lionel Messi"', 'add-stat 1 2 1'])
+    cli.cli.main(['--snapshot', 'add-stat', '1', '0', '0'], standalone_mode=False)
+    assert cli._snapshot is None and "Snapshot loaded" not in capsys.readouterr().out
+    cli.cli.main(['--snapshot', 'list-player-stats', '1'], standalone_mode=False)
+    cli.add_stat_func(1, 3, 0)
+    cli.list_player_stats_func(1)
+    out = capsys.readouterr().out
+    assert "Snapshot loaded" in out and out.count("Total Goals: 2") == 2
+    cli.show_snapshot_stats_func()
+    assert "run snapshot-refresh" in capsys.readouterr().out
+    cli.cli.main(['snapshot-refresh'], standalone_mode=False)
+    cli.list_player_stats_func(1)
+    assert "Total Goals: 5" in capsys.readouterr().out
+
+def test_snapshot_file_is_rebuilt_when_stale(engine, tmp_path, capsys, monkeypatch):
+    pytest.importorskip('numpy')
+    monkeypatch.setattr(cli, '_snapshot', None)
+    monkeypatch.setattr(cli, '_snapshot_pending', False)
+    monkeypatch.setattr(cli, '_snapshot_file', None)
+    path = str(tmp_path / 'football.snapshot')
+    cli.run_batch_func(['add-player "Lionel Messi"', 'add-stat 1 2 1'])
+    cli.cli.main(['--snapshot-file', path, 'add-stat', '1', '0', '0'], standalone_mode=False)
+    assert not os.path.exists(path) and cli._snapshot is None
+    cli.cli.main(['snapshot-save', path], standalone_mode=False)
+    cli.cli.main(['--snapshot-file', path, 'list-player-stats', '1'], standalone_mode=False)
+    out = capsys.readouterr().out
+    assert "(up to date)" in out and "Total Goals: 2" in out
+    cli.add_stat_func(1, 3, 0)
+    cli.refresh_snapshot_func()
+    cli.list_player_stats_func(1)
+    out = capsys.readouterr().out
+    assert "rebuilt in" in out and "Total Goals: 5" in out
@@ -0,0 +1,64 @@
+import contextlib
+import io
+import multiprocessing
+import sqlite3
+import pytest
+from lib import cli
+from lib.models import Session, Player, PlayerTotal, Stat, engine as default_engine
+from lib.models.base import Base
+from lib.models.database import make_engine
+from sqlalchemy import func
+
+URL = 'sqlite:///test.db'
+WRITERS = 4
+WRITES = 25
+
+def write_stats(player_id, count):
+    """Runs in a child process: add count stats through the CLI handler and return its output."""
+    Session.configure(bind=make_engine(URL))
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        for _ in range(count):
+            cli.add_stat_func(player_id, 1, 1)
+    return out.getvalue()
+
+@pytest.fixture
+def engine():
+    engine = make_engine(URL)
+    Base.metadata.create_all(engine)
+    with Session(bind=engine) as session:
+        session.add_all([Player(name=f"Player {i}") for i in range(WRITERS)])
+        session.commit()
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def test_concurrent_writers_lose_nothing(engine):
+    with multiprocessing.get_context('spawn').Pool(WRITERS) as pool:
+        outputs = pool.starmap(write_stats, [(i + 1, WRITES) for i in range(WRITERS)])
+    for out in outputs:
+        assert "error" not in out.lower()
+        assert out.count("Added stat") == WRITES
+    with Session(bind=engine) as session:
+        assert session.query(func.count(Stat.id)).scalar() == WRITERS * WRITES
+        assert [t.goals for t in session.query(PlayerTotal).order_by(PlayerTotal.player_id)] == [WRITES] * WRITERS
+
+def test_lock_at_commit_is_reported_as_busy(tmp_path, capsys):
+    # Under the legacy (rollback journal) profile a reader blocks COMMIT, after
+    # the BEGIN that is retried has already succeeded.
+    path = tmp_path / 'legacy.db'
+    engine = make_engine(f'sqlite:///{path}', profile='legacy', busy_timeout=50)
+    Base.metadata.create_all(engine)
+    Session.configure(bind=engine)
+    reader = sqlite3.connect(path, isolation_level=None)
+    try:
+        reader.execute("BEGIN")
+        reader.execute("SELECT count(*) FROM players").fetchall()
+        assert cli.add_player_func("Neymar") is False
+        assert "Error: the database is busy" in capsys.readouterr().out
+        reader.execute("COMMIT")
+        assert cli.add_player_func("Neymar") is None
+    finally:
+        reader.close()
+        Session.configure(bind=default_engine)
+        engine.dispose()
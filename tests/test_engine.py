@@ -0,0 +1,79 @@
+import sqlite3
+import pytest
+from lib.models.database import is_lock_error, make_engine, run_with_retry
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+def pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+def test_default_profile(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'test.db'}", profile='default')
+    assert pragma(engine, 'journal_mode') == 'wal'
+    assert pragma(engine, 'synchronous') == 1
+    assert pragma(engine, 'foreign_keys') == 1
+    assert pragma(engine, 'temp_store') == 2
+    engine.dispose()
+
+def test_profile_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv('FOOTBALL_DB_PROFILE', 'safe')
+    engine = make_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    assert pragma(engine, 'synchronous') == 2
+    engine.dispose()
+
+def test_legacy_profile_leaves_defaults(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'test.db'}", profile='legacy')
+    assert pragma(engine, 'journal_mode') == 'delete'
+    assert pragma(engine, 'foreign_keys') == 0
+    engine.dispose()
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        make_engine('sqlite://', profile='turbo')
+
+def test_busy_timeout(tmp_path, monkeypatch):
+    engine = make_engine(f"sqlite:///{tmp_path / 'test.db'}", busy_timeout=1234)
+    assert pragma(engine, 'busy_timeout') == 1234
+    engine.dispose()
+    monkeypatch.setenv('FOOTBALL_DB_BUSY_TIMEOUT', '250')
+    engine = make_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    assert pragma(engine, 'busy_timeout') == 250
+    engine.dispose()
+
+def test_immediate_begin_waits_then_gives_up(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    holder, waiter = make_engine(url, busy_timeout=10), make_engine(url, busy_timeout=10)
+    with holder.connect() as first, waiter.connect() as second:
+        first.execution_options(sqlite_begin='IMMEDIATE').begin()
+        second.execution_options(sqlite_begin='IMMEDIATE')
+        with pytest.raises(OperationalError) as error:
+            second.begin()
+        assert is_lock_error(error.value)
+        first.commit()
+        with second.begin():
+            assert second.execute(text("SELECT 1")).scalar() == 1
+    holder.dispose()
+    waiter.dispose()
+
+def test_run_with_retry():
+    calls = []
+
+    def locked_twice():
+        calls.append(1)
+        if len(calls) < 3:
+            raise sqlite3.OperationalError("database is locked")
+        return 'done'
+
+    def always_locked():
+        calls.append(1)
+        raise sqlite3.OperationalError("database is locked")
+
+    assert run_with_retry(locked_twice, base_delay=0) == 'done'
+    assert len(calls) == 3
+    calls.clear()
+    with pytest.raises(sqlite3.OperationalError):
+        run_with_retry(always_locked, attempts=2, base_delay=0)
+    assert len(calls) == 2
+    with pytest.raises(ValueError):
+        run_with_retry(lambda: int('x'), base_delay=0)
@@ -0,0 +1,85 @@
+import csv
+import datetime
+import pytest
+from lib import exporter
+from lib.exporter import export_tables, read_watermark, resolve_format
+from lib.models import Session, Player, Stat, change_log
+from lib.models.base import Base
+from sqlalchemy import create_engine, func, select
+
+@pytest.fixture
+def setup_db():
+    engine = create_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    messi = Player(name="Lionel Messi")
+    session.add_all([messi, Player(name="Neymar")])
+    session.flush()
+    session.add_all([Stat(messi.id, goals=2), Stat(messi.id, goals=1, match_date=datetime.date(2024, 10, 1))])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def read_csv(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+def test_full_then_incremental_csv(setup_db, tmp_path):
+    session = setup_db
+    engine = session.get_bind()
+    full = export_tables(engine, str(tmp_path), fmt='csv', chunk_size=1)
+    assert full.rows['players'] == 2 and full.rows['stats'] == 2
+    stats = read_csv(f"{full.path}/stats.csv")
+    assert [(s['goals'], s['match_date']) for s in stats] == [('2', ''), ('1', '2024-10-01')]
+    assert read_watermark(str(tmp_path))['seq'] == full.upto
+
+    assert export_tables(engine, str(tmp_path), fmt='csv', incremental=True).rows == {}
+
+    neymar = session.query(Player).filter_by(name="Neymar").one()
+    neymar.name = "Neymar Jr"
+    session.delete(session.get(Stat, 1))
+    session.add(Stat(neymar.id, goals=3))
+    session.commit()
+    changes = export_tables(engine, str(tmp_path), fmt='csv', incremental=True)
+    assert changes.since == full.upto
+    assert [p['name'] for p in read_csv(f"{changes.path}/players.csv")] == ["Neymar Jr"]
+    assert [s['goals'] for s in read_csv(f"{changes.path}/stats.csv")] == ['3']
+    assert read_csv(f"{changes.path}/stats.deleted.csv") == [{'rowid': '1'}]
+    assert changes.deleted['players'] == 0
+
+def test_prune_keeps_sequence(setup_db, tmp_path):
+    session = setup_db
+    result = export_tables(session.get_bind(), str(tmp_path), fmt='csv', prune=True)
+    assert session.execute(select(func.count()).select_from(change_log)).scalar() == 0
+    session.add(Player(name="Luis Suarez"))
+    session.commit()
+    changes = export_tables(session.get_bind(), str(tmp_path), fmt='csv', incremental=True)
+    assert changes.upto == result.upto + 1
+    assert changes.rows['players'] == 1
+
+def test_prune_waits_for_the_watermark(setup_db, tmp_path, monkeypatch):
+    session = setup_db
+
+    def fail(out_dir, state):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(exporter, '_write_watermark', fail)
+    with pytest.raises(OSError):
+        export_tables(session.get_bind(), str(tmp_path), fmt='csv', prune=True)
+    assert session.execute(select(func.count()).select_from(change_log)).scalar() > 0
+
+def test_npy_columns(setup_db, tmp_path):
+    numpy = pytest.importorskip('numpy')
+    result = export_tables(setup_db.get_bind(), str(tmp_path), fmt='npy')
+    names = numpy.load(f"{result.path}/players/name.npy")
+    assert list(names) == ["Lionel Messi", "Neymar"]
+    dates = numpy.load(f"{result.path}/stats/match_date.npy")
+    assert numpy.isnat(dates[0]) and str(dates[1]) == '2024-10-01'
+    assert numpy.load(f"{result.path}/stats/goals.npy").dtype == numpy.int64
+    assert numpy.isnan(numpy.load(f"{result.path}/stats/season.npy")[0])
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        resolve_format('xlsx')
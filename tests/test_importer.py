@@ -0,0 +1,73 @@
+import pytest
+from lib.models import Session, Player, Stat, PlayerTotal
+from lib.models.base import Base
+from lib.importer import import_stats
+from sqlalchemy import create_engine
+
+@pytest.fixture
+def setup_db():
+    engine = create_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+def test_import_stats_csv(setup_db, tmp_path):
+    session = setup_db
+    player = Player(name="Lionel Messi")
+    session.add(player)
+    session.commit()
+    path = tmp_path / "stats.csv"
+    path.write_text(
+        "player_id,goals,assists\n"
+        f"{player.id},2,1\n"
+        f"{player.id},1,0\n"
+        "999,3,3\n"
+        f"{player.id},-1,0\n"
+    )
+    result = import_stats(session, str(path), batch_size=2)
+    assert result.inserted == 2
+    assert result.rejected == 2
+    assert sum(s.goals for s in session.query(Stat).all()) == 3
+
+def test_import_stats_jsonl(setup_db, tmp_path):
+    session = setup_db
+    player = Player(name="Lionel Messi")
+    session.add(player)
+    session.commit()
+    path = tmp_path / "stats.jsonl"
+    path.write_text(
+        f'{{"player_id": {player.id}, "goals": 2, "assists": 1}}\n'
+        '{"player_id": "not a number"}\n'
+        'not json\n'
+    )
+    result = import_stats(session, str(path))
+    assert result.inserted == 1
+    assert result.rejected == 2
+
+def test_import_stats_invalid_batch_size(setup_db, tmp_path):
+    with pytest.raises(ValueError):
+        import_stats(setup_db, str(tmp_path / "stats.csv"), batch_size=0)
+
+def test_import_stats_updates_totals(setup_db, tmp_path):
+    session = setup_db
+    player = Player(name="Lionel Messi")
+    session.add(player)
+    session.commit()
+    path = tmp_path / "stats.csv"
+    path.write_text(f"player_id,goals,assists\n{player.id},2,1\n{player.id},1,0\n")
+    import_stats(session, str(path))
+    totals = session.get(PlayerTotal, player.id)
+    assert (totals.goals, totals.assists, totals.appearances) == (3, 1, 2)
+
+def test_import_match_dates(setup_db, tmp_path):
+    session = setup_db
+    player = Player(name="Lionel Messi")
+    session.add(player)
+    session.commit()
+    path = tmp_path / 'dated.csv'
+    path.write_text(f"player_id,goals,assists,match_date\n{player.id},1,0,2024-10-01\n{player.id},1,0,\n{player.id},1,0,not-a-date\n")
+    result = import_stats(session, str(path))
+    assert (result.inserted, result.rejected) == (2, 1)
+    assert sorted(s.season or 0 for s in session.query(Stat)) == [0, 2024]
@@ -0,0 +1,75 @@
+import pytest
+from lib.models import Session, Player, Team, Stat
+from lib.models.base import Base
+from lib.models.leaderboard import leaderboard
+from sqlalchemy import create_engine, event
+
+@pytest.fixture
+def setup_db():
+    engine = create_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def add_player(session, name, team, goals, assists):
+    player = Player(name=name)
+    player.teams.append(team)
+    session.add(player)
+    session.flush()
+    session.add(Stat(player_id=player.id, goals=goals, assists=assists))
+    session.commit()
+    return player
+
+@pytest.fixture
+def squads(setup_db):
+    session = setup_db
+    barcelona, madrid = Team(name="Barcelona"), Team(name="Real Madrid")
+    session.add_all([barcelona, madrid])
+    add_player(session, "Lionel Messi", barcelona, 5, 2)
+    add_player(session, "Pedri", barcelona, 1, 6)
+    add_player(session, "Lamine Yamal", barcelona, 1, 3)
+    add_player(session, "Kylian Mbappe", madrid, 7, 0)
+    add_player(session, "Jude Bellingham", madrid, 3, 4)
+    return session, barcelona, madrid
+
+def test_overall_leaderboards(squads):
+    session, _, _ = squads
+    assert [e.name for e in leaderboard(session, 'goals', 2)] == ["Kylian Mbappe", "Lionel Messi"]
+    assert [e.name for e in leaderboard(session, 'assists', 1)] == ["Pedri"]
+    contributions = leaderboard(session, 'contributions', 2)
+    assert [(e.rank, e.value) for e in contributions] == [(1, 7)] * 4
+
+def test_per_team_ranking_with_ties(squads):
+    session, _, _ = squads
+    entries = leaderboard(session, 'goals', 2, per_team=True)
+    assert [(e.team_name, e.rank, e.name) for e in entries] == [
+        ("Barcelona", 1, "Lionel Messi"),
+        ("Barcelona", 2, "Lamine Yamal"),
+        ("Barcelona", 2, "Pedri"),
+        ("Real Madrid", 1, "Kylian Mbappe"),
+        ("Real Madrid", 2, "Jude Bellingham"),
+    ]
+
+def test_single_team(squads):
+    session, _, madrid = squads
+    assert [e.name for e in leaderboard(session, 'assists', 1, team_id=madrid.id)] == ["Jude Bellingham"]
+
+def test_cached_until_stats_change(squads):
+    session, barcelona, _ = squads
+    statements = []
+    event.listen(session.get_bind(), 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    first = leaderboard(session, 'goals', 1)
+    count = len(statements)
+    assert leaderboard(session, 'goals', 1) == first
+    assert len(statements) == count
+    pedri = session.query(Player).filter_by(name="Pedri").one()
+    session.add(Stat(player_id=pedri.id, goals=10))
+    session.commit()
+    assert [e.name for e in leaderboard(session, 'goals', 1)] == ["Pedri"]
+
+def test_invalid_metric(setup_db):
+    with pytest.raises(ValueError):
+        leaderboard(setup_db, 'tackles')
@@ -0,0 +1,49 @@
+import pytest
+from lib.models import Session, Player, Stat, PlayerTotal
+from lib.models.base import Base
+from sqlalchemy import create_engine
+
+@pytest.fixture
+def setup_db():
+    engine = create_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+def test_totals_follow_added_stats(setup_db):
+    session = setup_db
+    player = Player(name="Lionel Messi")
+    session.add(player)
+    session.commit()
+    session.add_all([Stat(player_id=player.id, goals=2, assists=1), Stat(player_id=player.id, goals=1)])
+    session.commit()
+    totals = session.get(PlayerTotal, player.id)
+    assert (totals.goals, totals.assists, totals.appearances) == (3, 1, 2)
+
+def test_totals_follow_deleted_stats(setup_db):
+    session = setup_db
+    player = Player(name="Lionel Messi")
+    session.add(player)
+    session.commit()
+    stat = Stat(player_id=player.id, goals=2, assists=1)
+    session.add(stat)
+    session.commit()
+    session.delete(stat)
+    session.commit()
+    session.expire_all()
+    totals = session.get(PlayerTotal, player.id)
+    assert (totals.goals, totals.assists, totals.appearances) == (0, 0, 0)
+
+def test_totals_removed_with_player(setup_db):
+    session = setup_db
+    player = Player(name="Lionel Messi")
+    session.add(player)
+    session.commit()
+    session.add(Stat(player_id=player.id, goals=2))
+    session.commit()
+    player_id = player.id
+    session.delete(player)
+    session.commit()
+    assert session.get(PlayerTotal, player_id) is None
@@ -0,0 +1,67 @@
+import io
+import json
+import pytest
+from sqlalchemy import create_engine, text
+from lib.models import Session, Player
+from lib.models.base import Base
+from lib.profiling import instrument, uninstrument
+
+@pytest.fixture
+def setup_db():
+    engine = create_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    session.add_all([Player(name="Lionel Messi"), Player(name="Neymar")])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def test_profiles_wrapped_handlers(setup_db, tmp_path):
+    session = setup_db
+    log = tmp_path / 'profile.jsonl'
+
+    def list_players_func():
+        for (name,) in session.execute(text("SELECT name FROM players")):
+            print(name)
+
+    def not_a_handler():
+        return session.execute(text("SELECT 1")).scalar()
+
+    namespace = {'list_players_func': list_players_func, 'not_a_handler': not_a_handler}
+    profiler = instrument(namespace, str(log))
+    profiler.stream = io.StringIO()
+    try:
+        assert instrument(namespace) is None
+        namespace['list_players_func']()
+        namespace['not_a_handler']()
+    finally:
+        uninstrument(namespace)
+    assert namespace['list_players_func'] is list_players_func
+
+    profile, = profiler.profiles
+    assert profile.command == 'list_players_func'
+    assert profile.rows == 2
+    assert any(s['sql'] == "SELECT name FROM players" for s in profile.statements)
+    assert "[profile] list_players_func" in profiler.stream.getvalue()
+    record = json.loads(log.read_text())
+    assert record['command'] == 'list_players_func'
+    assert record['statements'] == len(profile.statements)
+    assert record['rows'] == 2
+
+def test_failed_statements_are_recorded(setup_db):
+    session = setup_db
+
+    def broken_func():
+        session.execute(text("SELECT * FROM nope"))
+
+    namespace = {'broken_func': broken_func}
+    profiler = instrument(namespace)
+    profiler.stream = io.StringIO()
+    try:
+        with pytest.raises(Exception):
+            namespace['broken_func']()
+    finally:
+        uninstrument(namespace)
+    assert profiler.profiles[0].as_dict()['errors'] == 1
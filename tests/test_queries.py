@@ -0,0 +1,94 @@
+import pytest
+from lib.models import Session, Player, Team, Stat, BootColor
+from lib.models.base import Base
+from lib.models.change_log import LAST_CHANGE_SQL
+from lib.models.queries import get_player_profile, list_boot_colors, iter_boot_colors, iter_team_players
+from sqlalchemy import create_engine, event
+
+@pytest.fixture
+def setup_db():
+    engine = create_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture
+def statements(setup_db):
+    engine = setup_db.get_bind()
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # The read cache's once-per-transaction change_log lookup isn't part of the query.
+        if statement != LAST_CHANGE_SQL:
+            executed.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', record)
+
+def add_players(session, count):
+    teams = [Team(name="Barcelona"), Team(name="Inter Miami")]
+    session.add_all(teams)
+    for i in range(count):
+        player = Player(name=f"Player {i}")
+        player.teams.extend(teams)
+        session.add(player)
+        session.flush()
+        session.add(Stat(player_id=player.id, goals=i, assists=1))
+        session.add(BootColor(player_id=player.id, color="Gold"))
+    session.commit()
+    session.expunge_all()
+
+def test_player_profile(setup_db, statements):
+    session = setup_db
+    add_players(session, 3)
+    player_id = session.query(Player.id).filter_by(name="Player 2").scalar()
+    statements.clear()
+    profile = get_player_profile(session, player_id)
+    assert profile.goals == 2
+    assert profile.assists == 1
+    assert profile.boot_color == "Gold"
+    assert sorted(profile.teams) == ["Barcelona", "Inter Miami"]
+    assert len(statements) <= 2
+
+def test_player_profile_missing(setup_db):
+    assert get_player_profile(setup_db, 42) is None
+
+def test_list_boot_colors_single_statement(setup_db, statements):
+    session = setup_db
+    add_players(session, 5)
+    statements.clear()
+    boot_colors = list_boot_colors(session)
+    assert [bc.player_name for bc in boot_colors] == [f"Player {i}" for i in range(5)]
+    assert len(statements) == 1
+
+def test_team_players_keyset_pages(setup_db, statements):
+    session = setup_db
+    add_players(session, 5)
+    team_id = session.query(Team.id).filter_by(name="Barcelona").scalar()
+    statements.clear()
+    players = list(iter_team_players(session, team_id, page_size=2))
+    assert [p.name for p in players] == [f"Player {i}" for i in range(5)]
+    assert len(statements) == 3
+    after = players[1].id
+    page = list(iter_team_players(session, team_id, after_id=after, limit=2, page_size=2))
+    assert [p.name for p in page] == ["Player 2", "Player 3"]
+
+def test_boot_colors_limit(setup_db):
+    session = setup_db
+    add_players(session, 5)
+    assert len(list(iter_boot_colors(session, limit=3, page_size=2))) == 3
+
+def test_reads_build_no_orm_instances(setup_db):
+    session = setup_db
+    add_players(session, 3)
+    player_id = session.query(Player.id).filter_by(name="Player 1").scalar()
+    team_id = session.query(Team.id).filter_by(name="Barcelona").scalar()
+    profile = get_player_profile(session, player_id)
+    boot_colors = list_boot_colors(session)
+    players = list(iter_team_players(session, team_id))
+    assert type(profile).__name__ == 'PlayerProfile' and profile.name == "Player 1"
+    assert len(boot_colors) == 3 and len(players) == 3
+    assert len(session.identity_map) == 0
@@ -0,0 +1,56 @@
+import datetime
+import sqlite3
+import pytest
+from lib import reports
+from lib.models import Session, Player, Team, Stat
+from lib.models.base import Base
+from lib.models.database import make_engine
+
+@pytest.fixture
+def setup_db():
+    engine = make_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    messi, neymar, suarez = Player(name="Lionel Messi"), Player(name="Neymar"), Player(name="Luis Suarez")
+    barcelona, psg = Team(name="Barcelona"), Team(name="PSG")
+    barcelona.players.extend([messi, neymar, suarez])
+    psg.players.append(neymar)
+    session.add_all([barcelona, psg])
+    session.flush()
+    session.add_all([
+        Stat(messi.id, goals=3, assists=1),
+        Stat(messi.id, goals=5, match_date=datetime.date(2024, 10, 1)),
+        Stat(neymar.id, goals=1, assists=3),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def test_team_report_merges_ranges(setup_db):
+    path = reports.database_path(setup_db.get_bind())
+    assert reports.player_ranges(path, 2) == [(1, 2), (3, 3)]
+    partials = [reports.team_partials(path, low, high) for low, high in reports.player_ranges(path, 3)]
+    barcelona, psg = reports.merge_partials(partials)
+    assert (barcelona.players, barcelona.matches, barcelona.goals, barcelona.assists) == (3, 3, 9, 4)
+    assert (barcelona.min, barcelona.max, barcelona.mean) == (0, 8, 3.0)
+    assert barcelona.std == pytest.approx((((8 - 3) ** 2 + (1 - 3) ** 2 + 3 ** 2) / 3) ** 0.5)
+    assert (psg.team_id, psg.players, psg.goals) == (2, 1, 1)
+    assert reports.merge_partials(partials) == reports.team_report(path, workers=1).teams
+
+def test_team_report_workers_and_season(setup_db):
+    path = reports.database_path(setup_db.get_bind())
+    result = reports.team_report(path, workers=2)
+    assert result.ranges == 3 and [team.goals for team in result.teams] == [9, 1]
+    season = reports.team_report(path, workers=1, season=2024).teams
+    assert [(team.team_id, team.goals, team.matches) for team in season] == [(1, 5, 1), (2, 0, 0)]
+
+def test_workers_cannot_write(setup_db):
+    path = reports.database_path(setup_db.get_bind())
+    connection = sqlite3.connect(reports.read_only_uri(path), uri=True)
+    with pytest.raises(sqlite3.OperationalError):
+        connection.execute("DELETE FROM stats")
+    connection.close()
+    with pytest.raises(ValueError):
+        reports.database_path(make_engine('sqlite://'))
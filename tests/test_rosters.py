@@ -0,0 +1,46 @@
+import pytest
+from lib.models import Session, Player, Team, player_teams
+from lib.models.base import Base
+from lib.rosters import assign_roster, read_pairs, transfer_players
+from sqlalchemy import create_engine, select
+
+@pytest.fixture
+def setup_db():
+    engine = create_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    barcelona, psg, miami = Team(name="Barcelona"), Team(name="PSG"), Team(name="Inter Miami")
+    messi, neymar = Player(name="Lionel Messi"), Player(name="Neymar")
+    barcelona.players.extend([messi, neymar])
+    session.add_all([barcelona, psg, miami])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def memberships(session):
+    return sorted(session.execute(select(player_teams.c.player_id, player_teams.c.team_id)).all())
+
+def test_assign_skips_duplicates_and_rejects_unknown(setup_db):
+    session = setup_db
+    result = assign_roster(session, [(1, 1, None), (1, 2, None), (1, 2, None), (2, 3, None), (9, 1, None), (1, 9, None)])
+    session.commit()
+    assert (result.added, result.skipped, result.rejected) == (2, 2, 2)
+    assert memberships(session) == [(1, 1), (1, 2), (2, 1), (2, 3)]
+
+def test_transfer(setup_db):
+    session = setup_db
+    assign_roster(session, [(1, 3, None)])
+    # Messi leaves every other team for PSG; Neymar leaves only Barcelona.
+    result = transfer_players(session, [(1, 2, None), (2, 2, 1), (2, 2, 1)])
+    session.commit()
+    assert (result.added, result.removed, result.skipped) == (2, 3, 1)
+    assert memberships(session) == [(1, 2), (2, 2)]
+
+def test_read_pairs(tmp_path):
+    path = tmp_path / "moves.csv"
+    path.write_text("player_id,team_id,from_team_id\n1,2,\n2, 3,1\nx,1,\n3,,\n")
+    pairs, invalid = read_pairs(str(path))
+    assert pairs == [(1, 2, None), (2, 3, 1)]
+    assert invalid == 2
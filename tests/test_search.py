@@ -0,0 +1,65 @@
+import pytest
+from lib.models import Session, Player, Team
+from lib.models.base import Base
+from lib.models.search import search_names
+from sqlalchemy import create_engine, text
+
+@pytest.fixture
+def setup_db():
+    engine = create_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    session.add_all([Player(name=n) for n in ("Lionel Messi", "Kylian Mbappé", "Luka Modric", "Eduardo Camavinga")])
+    session.add_all([Team(name="Real Madrid"), Team(name="Inter Miami")])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def names(results):
+    return [(r.kind, r.name, r.match) for r in results]
+
+def test_prefix_and_accent_folding(setup_db):
+    assert names(search_names(setup_db, "mbappe")) == [('player', "Kylian Mbappé", 'prefix')]
+    assert names(search_names(setup_db, "Lu Mod", limit=1)) == [('player', "Luka Modric", 'prefix')]
+
+def test_ids_and_kinds(setup_db):
+    team, = search_names(setup_db, "real", limit=1)
+    assert (team.kind, team.id) == ('team', 1)
+    assert names(search_names(setup_db, "mi", kind='team', limit=1)) == [('team', "Inter Miami", 'prefix')]
+    with pytest.raises(ValueError):
+        search_names(setup_db, "messi", kind='coach')
+
+def test_fuzzy_matches(setup_db):
+    assert names(search_names(setup_db, "camavnga", limit=1)) == [('player', "Eduardo Camavinga", 'fuzzy')]
+    assert names(search_names(setup_db, "essi", limit=1)) == [('player', "Lionel Messi", 'fuzzy')]
+    assert search_names(setup_db, "zzz") == []
+    assert search_names(setup_db, "  ") == []
+
+def test_index_follows_writes(setup_db):
+    session = setup_db
+    messi = session.query(Player).filter_by(name="Lionel Messi").one()
+    messi.name = "Leo Messi"
+    session.commit()
+    assert names(search_names(session, "leo")) == [('player', "Leo Messi", 'prefix')]
+    session.delete(messi)
+    session.commit()
+    assert search_names(session, "messi") == []
+    session.execute(text("INSERT INTO teams (name) VALUES ('Barcelona')"))
+    session.commit()
+    assert names(search_names(session, "barc")) == [('team', "Barcelona", 'prefix')]
+
+def test_best_match_ranked_among_many(setup_db):
+    session = setup_db
+    # Thousands of weaker matches with lower ids than the best one.
+    session.execute(text("INSERT INTO players (name) VALUES (:name)"),
+                    [{'name': f"Silva Junior Filho Neto {i}"} for i in range(2500)])
+    session.execute(text("INSERT INTO players (name) VALUES ('Silva')"))
+    session.commit()
+    assert [r.name for r in search_names(session, "silva", limit=1)] == ["Silva"]
+    assert [r.name for r in search_names(session, "silv", limit=1)] == ["Silva"]
+
+def test_short_words_still_count_in_close_matches(setup_db):
+    assert names(search_names(setup_db, "lu modrc", limit=1)) == [('player', "Luka Modric", 'fuzzy')]
+    assert search_names(setup_db, "xq modrc") == []
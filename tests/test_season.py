@@ -0,0 +1,78 @@
+import datetime
+import sqlite3
+import pytest
+from lib.models import Session, Player, Stat, PlayerTotal
+from lib.models.base import Base
+from lib.models.leaderboard import leaderboard
+from lib.models.season import archive_season, archived_player_seasons, player_seasons, totals_between
+from lib.models.stat import season_for, season_label
+from sqlalchemy import create_engine
+
+D = datetime.date
+
+@pytest.fixture
+def setup_db():
+    engine = create_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    messi, neymar = Player(name="Lionel Messi"), Player(name="Neymar")
+    session.add_all([messi, neymar])
+    session.flush()
+    session.add_all([
+        Stat(messi.id, goals=2, assists=1, match_date=D(2023, 9, 10)),
+        Stat(messi.id, goals=1, match_date=D(2024, 3, 2)),
+        Stat(messi.id, goals=1, match_date=D(2024, 10, 1)),
+        Stat(neymar.id, goals=3, assists=2, match_date=D(2024, 10, 5)),
+        Stat(neymar.id, goals=5),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def test_season_for_splits_in_july():
+    assert season_for(D(2024, 6, 30)) == 2023
+    assert season_for(D(2024, 7, 1)) == 2024
+    assert season_label(2024) == "2024/25"
+    assert season_label(1999) == "1999/00"
+
+def test_stat_rejects_non_date():
+    with pytest.raises(ValueError):
+        Stat(1, match_date="2024-01-01")
+
+def test_player_seasons(setup_db):
+    assert [tuple(r) for r in player_seasons(setup_db, 1)] == [(2023, 3, 1, 2), (2024, 1, 0, 1)]
+    # Undated stats belong to no season.
+    assert [tuple(r) for r in player_seasons(setup_db, 2)] == [(2024, 3, 2, 1)]
+
+def test_totals_between(setup_db):
+    rows = totals_between(setup_db, D(2024, 1, 1), D(2024, 12, 31))
+    assert [(r.name, r.goals, r.appearances) for r in rows] == [("Neymar", 3, 1), ("Lionel Messi", 2, 2)]
+    rows = totals_between(setup_db, D(2024, 1, 1), D(2024, 12, 31), player_id=1)
+    assert [(r.name, r.goals) for r in rows] == [("Lionel Messi", 2)]
+
+def test_season_leaderboard(setup_db):
+    assert [(e.name, e.value) for e in leaderboard(setup_db, season=2023)] == [("Lionel Messi", 3)]
+    assert [(e.name, e.value) for e in leaderboard(setup_db)] == [("Neymar", 8), ("Lionel Messi", 4)]
+
+def test_archive_season(setup_db, tmp_path):
+    session = setup_db
+    engine = session.get_bind()
+    path = str(tmp_path / 'archive.db')
+    today = D(2025, 1, 1)
+    assert [tuple(r) for r in player_seasons(session, 1)][0][0] == 2023
+    assert archive_season(engine, 2023, path, today=today) == 2
+    session.commit()
+    assert [r.season for r in player_seasons(session, 1)] == [2024]
+    assert [tuple(r) for r in archived_player_seasons(path, 1)] == [(2023, 3, 1, 2)]
+    # All-time totals still count archived matches.
+    assert session.get(PlayerTotal, 1).goals == 4
+    # Running it again is harmless.
+    assert archive_season(engine, 2023, path, today=today) == 0
+    with sqlite3.connect(path) as archive:
+        assert archive.execute("SELECT count(*) FROM stats").fetchone() == (2,)
+
+def test_archive_refuses_open_season(setup_db, tmp_path):
+    with pytest.raises(ValueError):
+        archive_season(setup_db.get_bind(), 2024, str(tmp_path / 'archive.db'), today=D(2025, 1, 1))
@@ -0,0 +1,123 @@
+import datetime
+import pytest
+from lib.models import Session, Player, Team, Stat, BootColor
+from lib.models.base import Base
+from lib.models.leaderboard import leaderboard
+from lib.models.queries import get_player_profile, iter_boot_colors, iter_team_players
+from lib.models.season import player_seasons, totals_between
+from lib.models.search import search_names
+from sqlalchemy import create_engine, text
+
+numpy = pytest.importorskip('numpy')
+import lib.snapshot
+from lib.snapshot import Snapshot, open_snapshot
+
+D = datetime.date
+
+@pytest.fixture
+def setup_db():
+    engine = create_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    messi, neymar = Player(name="Lionel Messi"), Player(name="Neymar")
+    suarez, mbappe = Player(name="Luis Suarez"), Player(name="Kylian Mbappé")
+    barcelona, psg = Team(name="Barcelona"), Team(name="PSG")
+    barcelona.players.extend([messi, neymar, suarez])
+    psg.players.extend([neymar, mbappe, messi])
+    session.add_all([barcelona, psg])
+    session.flush()
+    session.add_all([
+        Stat(messi.id, goals=2, assists=1, match_date=D(2023, 9, 10)),
+        Stat(messi.id, goals=1, match_date=D(2024, 3, 2)),
+        Stat(neymar.id, goals=3, assists=2, match_date=D(2024, 10, 5)),
+        Stat(suarez.id, goals=3, match_date=D(2024, 10, 6)),
+        Stat(mbappe.id, goals=1, assists=4),
+        BootColor(messi.id, "Gold"),
+        BootColor(mbappe.id, "White"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def test_snapshot_answers_like_the_database(setup_db):
+    session = setup_db
+    snapshot = Snapshot.load(session.get_bind())
+    for player_id in (1, 2, 4, 99):
+        assert snapshot.get_player_profile(player_id) == get_player_profile.uncached(session, player_id)
+        assert snapshot.player_seasons(player_id) == player_seasons.uncached(session, player_id)
+    assert list(snapshot.iter_boot_colors()) == list(iter_boot_colors(session))
+    assert list(snapshot.iter_boot_colors(after_id=1, limit=1)) == list(iter_boot_colors(session, 1, 1))
+    assert list(snapshot.iter_team_players(2, after_id=1)) == list(iter_team_players(session, 2, after_id=1))
+    assert list(snapshot.iter_team_players(7)) == []
+    for metric in ('goals', 'assists', 'contributions'):
+        for options in ({}, {'per_team': True}, {'team_id': 2}, {'season': 2024}, {'season': 2024, 'per_team': True}):
+            for limit in (1, 2, 10):
+                expected = leaderboard(session, metric=metric, limit=limit, **options)
+                assert snapshot.leaderboard(metric, limit, **options) == expected, (metric, limit, options)
+    for start, end, player_id in ((D(2023, 1, 1), D(2024, 12, 31), None), (D(2024, 1, 1), D(2024, 12, 31), 1)):
+        expected = totals_between.uncached(session, start, end, player_id=player_id, limit=2)
+        assert snapshot.totals_between(start, end, player_id=player_id, limit=2) == expected
+
+def test_snapshot_search(setup_db):
+    snapshot = Snapshot.load(setup_db.get_bind())
+    assert [r.name for r in snapshot.search_names("mbappe")] == ["Kylian Mbappé"]
+    assert [(r.kind, r.name) for r in snapshot.search_names("lu s")] == [('player', "Luis Suarez")]
+    assert [(r.name, r.match) for r in snapshot.search_names("essi")] == [("Lionel Messi", 'fuzzy')]
+    assert [r.kind for r in snapshot.search_names("ps", kind='team')] == ['team']
+    assert [r.name for r in snapshot.search_names("lionel messi")] == [r.name for r in search_names(setup_db, "lionel messi")]
+
+def test_snapshot_footprint_and_staleness(setup_db):
+    session = setup_db
+    snapshot = Snapshot.load(session.get_bind())
+    usage = snapshot.memory_usage()
+    assert usage['stats'] / len(snapshot.stat_player) < 100
+    assert not snapshot.is_stale(session.get_bind())
+    session.add(Stat(1, goals=1))
+    session.commit()
+    assert snapshot.is_stale(session.get_bind())
+    assert Snapshot.load(session.get_bind()).get_player_profile(1).goals == 4
+
+def test_snapshot_file_round_trip(setup_db, tmp_path):
+    session = setup_db
+    engine = session.get_bind()
+    path = str(tmp_path / 'football.snapshot')
+    loaded = Snapshot.load(engine)
+    mapped, rebuilt = open_snapshot(path, engine)
+    assert rebuilt and mapped.path == path
+    assert not mapped.player_ids.flags.writeable
+    for player_id in (1, 2, 3, 4):
+        assert mapped.get_player_profile(player_id) == loaded.get_player_profile(player_id)
+        assert mapped.player_seasons(player_id) == loaded.player_seasons(player_id)
+    assert mapped.leaderboard('contributions', 2, per_team=True) == loaded.leaderboard('contributions', 2, per_team=True)
+    assert list(mapped.iter_boot_colors()) == list(loaded.iter_boot_colors())
+    assert mapped.search_names("mbappe") == loaded.search_names("mbappe")
+    assert open_snapshot(path, engine)[1] is False
+
+    session.add(Stat(1, goals=1))
+    session.commit()
+    snapshot, rebuilt = open_snapshot(path, engine)
+    assert rebuilt and snapshot.get_player_profile(1).goals == 4
+
+def test_snapshot_file_version_mismatch_is_rebuilt(setup_db, tmp_path, monkeypatch):
+    engine = setup_db.get_bind()
+    path = str(tmp_path / 'football.snapshot')
+    open_snapshot(path, engine)
+    monkeypatch.setattr(lib.snapshot, 'FORMAT_VERSION', lib.snapshot.FORMAT_VERSION + 1)
+    with pytest.raises(ValueError, match="version"):
+        Snapshot.open(path)
+    assert open_snapshot(path, engine)[1] is True
+    (tmp_path / 'garbage').write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError):
+        Snapshot.open(str(tmp_path / 'garbage'))
+
+def test_snapshot_search_ranks_every_match(setup_db):
+    session = setup_db
+    session.execute(text("INSERT INTO players (name) VALUES (:name)"),
+                    [{'name': f"Silva Junior Filho Neto {i}"} for i in range(2500)])
+    session.execute(text("INSERT INTO players (name) VALUES ('Silva')"))
+    session.commit()
+    snapshot = Snapshot.load(session.get_bind())
+    assert [r.name for r in snapshot.search_names("silva", limit=1)] == ["Silva"]
+    assert [r.name for r in snapshot.search_names("ilva", limit=2)] == ["Silva", "Silva Junior Filho Neto 0"]
@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CLI = os.path.join(PROJECT_ROOT, 'lib', 'cli.py')
+
+def run_with_importtime(args, stdin=None):
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, input=stdin,
+                            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return result.stderr
+
+def test_help_does_not_load_sqlalchemy():
+    assert 'sqlalchemy' not in run_with_importtime([CLI, '--help'])
+
+def test_menu_exit_does_not_load_sqlalchemy():
+    assert 'sqlalchemy' not in run_with_importtime([CLI], stdin='0\n')
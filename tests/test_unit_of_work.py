@@ -0,0 +1,48 @@
+import pytest
+from lib.models import Session, Player
+from lib.models.base import Base
+from lib.models.unit_of_work import UnitOfWork, session_scope
+from sqlalchemy import create_engine
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite:///test.db')
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+def test_commands_share_session(engine):
+    with UnitOfWork(lambda: Session(bind=engine)):
+        with session_scope() as first:
+            pass
+        with session_scope() as second:
+            pass
+    assert first is second is not None
+
+def test_uncommitted_work_rolled_back(engine):
+    with UnitOfWork(lambda: Session(bind=engine)):
+        with session_scope() as session:
+            session.add(Player(name="Lionel Messi"))
+            session.flush()
+        with session_scope() as session:
+            assert session.query(Player).count() == 0
+
+def test_error_rolls_back_and_session_survives(engine):
+    with UnitOfWork(lambda: Session(bind=engine)):
+        with pytest.raises(RuntimeError):
+            with session_scope() as session:
+                session.add(Player(name="Lionel Messi"))
+                session.flush()
+                raise RuntimeError("boom")
+        with session_scope() as session:
+            session.add(Player(name="Neymar"))
+            session.commit()
+            assert [p.name for p in session.query(Player)] == ["Neymar"]
+
+def test_fresh_session_outside_unit_of_work():
+    with session_scope() as first:
+        pass
+    with session_scope() as second:
+        pass
+    assert first is not second